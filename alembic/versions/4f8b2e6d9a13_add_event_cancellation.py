@@ -0,0 +1,28 @@
+"""Add is_cancelled to events
+
+Revision ID: 4f8b2e6d9a13
+Revises: 9c6e1d4a7b2f
+Create Date: 2025-10-04 15:08:51.630274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f8b2e6d9a13'
+down_revision: Union[str, Sequence[str], None] = '9c6e1d4a7b2f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('events', sa.Column('is_cancelled', sa.Boolean(), nullable=False, server_default=sa.false()))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('events', 'is_cancelled')
@@ -0,0 +1,72 @@
+"""Add archive tables for finished events and cancelled bookings
+
+Revision ID: 5d8e2b7c1f90
+Revises: a3f1c9d2e4b7
+Create Date: 2025-09-24 16:41:09.502117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d8e2b7c1f90'
+down_revision: Union[str, Sequence[str], None] = 'a3f1c9d2e4b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('events_archive',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('venue', sa.String(), nullable=False),
+    sa.Column('start_time', sa.DateTime(), nullable=False),
+    sa.Column('end_time', sa.DateTime(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('seats_archive',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('event_id', sa.Integer(), nullable=False),
+    sa.Column('seat_number', sa.String(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_seats_archive_event_id'), 'seats_archive', ['event_id'], unique=False)
+    op.create_table('bookings_archive',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('event_id', sa.Integer(), nullable=False),
+    sa.Column('seat_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_bookings_archive_event_id'), 'bookings_archive', ['event_id'], unique=False)
+    op.create_index(op.f('ix_bookings_archive_user_id'), 'bookings_archive', ['user_id'], unique=False)
+    op.create_table('waitlist_entries_archive',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('event_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_waitlist_entries_archive_event_id'), 'waitlist_entries_archive', ['event_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_waitlist_entries_archive_event_id'), table_name='waitlist_entries_archive')
+    op.drop_table('waitlist_entries_archive')
+    op.drop_index(op.f('ix_bookings_archive_user_id'), table_name='bookings_archive')
+    op.drop_index(op.f('ix_bookings_archive_event_id'), table_name='bookings_archive')
+    op.drop_table('bookings_archive')
+    op.drop_index(op.f('ix_seats_archive_event_id'), table_name='seats_archive')
+    op.drop_table('seats_archive')
+    op.drop_table('events_archive')
@@ -0,0 +1,32 @@
+"""Add seat layout and version to seats_archive
+
+Revision ID: 6b1d3e8f2a47
+Revises: 4f8b2e6d9a13
+Create Date: 2025-10-06 10:21:37.482915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6b1d3e8f2a47'
+down_revision: Union[str, Sequence[str], None] = '4f8b2e6d9a13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('seats_archive', sa.Column('row_number', sa.Integer(), nullable=True))
+    op.add_column('seats_archive', sa.Column('position', sa.Integer(), nullable=True))
+    op.add_column('seats_archive', sa.Column('version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('seats_archive', 'version')
+    op.drop_column('seats_archive', 'position')
+    op.drop_column('seats_archive', 'row_number')
@@ -0,0 +1,36 @@
+"""Add waitlist queue index and one entry per user and event
+
+Revision ID: 9c6e1d4a7b2f
+Revises: f2a9c7e5b3d1
+Create Date: 2025-10-02 11:42:36.184907
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c6e1d4a7b2f'
+down_revision: Union[str, Sequence[str], None] = 'f2a9c7e5b3d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Duplicates could be created by concurrent requests before the unique index existed;
+    # keep the oldest entry of each user on each waitlist.
+    op.execute(
+        "DELETE FROM waitlist_entries WHERE id NOT IN "
+        "(SELECT MIN(id) FROM waitlist_entries GROUP BY user_id, event_id)"
+    )
+    op.create_index('ix_waitlist_entries_event_id_created_at_id', 'waitlist_entries', ['event_id', 'created_at', 'id'], unique=False)
+    op.create_index('uq_waitlist_entries_user_id_event_id', 'waitlist_entries', ['user_id', 'event_id'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_waitlist_entries_user_id_event_id', table_name='waitlist_entries')
+    op.drop_index('ix_waitlist_entries_event_id_created_at_id', table_name='waitlist_entries')
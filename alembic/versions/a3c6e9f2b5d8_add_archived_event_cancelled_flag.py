@@ -0,0 +1,28 @@
+"""Add is_cancelled to archived events
+
+Revision ID: a3c6e9f2b5d8
+Revises: d5a8c3f1b6e2
+Create Date: 2025-10-09 10:02:47.183920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c6e9f2b5d8'
+down_revision: Union[str, Sequence[str], None] = 'd5a8c3f1b6e2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('events_archive', sa.Column('is_cancelled', sa.Boolean(), nullable=False, server_default=sa.false()))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('events_archive', 'is_cancelled')
@@ -0,0 +1,88 @@
+"""Partition bookings by event on PostgreSQL
+
+Revision ID: a3f1c9d2e4b7
+Revises: 762bc933b94d
+Create Date: 2025-09-20 10:12:44.118203
+
+"""
+import os
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f1c9d2e4b7'
+down_revision: Union[str, Sequence[str], None] = '762bc933b94d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Number of hash partitions created on PostgreSQL. Changing it later requires a new migration.
+BOOKINGS_PARTITIONS = int(os.environ.get("BOOKINGS_PARTITIONS", "16"))
+
+BOOKINGS_COLUMNS = "id, user_id, event_id, seat_id, status, created_at"
+
+
+def _is_postgresql() -> bool:
+    return op.get_bind().dialect.name == 'postgresql'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if _is_postgresql():
+        # The partition key has to be part of the primary key, so the table is rebuilt
+        # with PRIMARY KEY (id, event_id). The id sequence is detached first so that
+        # dropping the old table does not drop it.
+        op.execute("ALTER SEQUENCE bookings_id_seq OWNED BY NONE")
+        op.execute("ALTER TABLE bookings RENAME TO bookings_unpartitioned")
+        op.execute("ALTER TABLE bookings_unpartitioned RENAME CONSTRAINT bookings_pkey TO bookings_unpartitioned_pkey")
+        op.execute("ALTER INDEX ix_bookings_id RENAME TO ix_bookings_unpartitioned_id")
+        op.execute("""
+            CREATE TABLE bookings (
+                id INTEGER NOT NULL DEFAULT nextval('bookings_id_seq'),
+                user_id INTEGER NOT NULL REFERENCES users (id),
+                event_id INTEGER NOT NULL REFERENCES events (id),
+                seat_id INTEGER NOT NULL REFERENCES seats (id),
+                status VARCHAR NOT NULL,
+                created_at TIMESTAMP WITHOUT TIME ZONE,
+                PRIMARY KEY (id, event_id)
+            ) PARTITION BY HASH (event_id)
+        """)
+        for remainder in range(BOOKINGS_PARTITIONS):
+            op.execute(
+                f"CREATE TABLE bookings_p{remainder} PARTITION OF bookings "
+                f"FOR VALUES WITH (MODULUS {BOOKINGS_PARTITIONS}, REMAINDER {remainder})"
+            )
+        op.execute(f"INSERT INTO bookings ({BOOKINGS_COLUMNS}) SELECT {BOOKINGS_COLUMNS} FROM bookings_unpartitioned")
+        op.execute("ALTER SEQUENCE bookings_id_seq OWNED BY bookings.id")
+        op.execute("DROP TABLE bookings_unpartitioned")
+        op.create_index(op.f('ix_bookings_id'), 'bookings', ['id'], unique=False)
+
+    op.create_index('ix_bookings_event_id_status', 'bookings', ['event_id', 'status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_bookings_event_id_status', table_name='bookings')
+
+    if _is_postgresql():
+        op.execute("ALTER SEQUENCE bookings_id_seq OWNED BY NONE")
+        op.drop_index(op.f('ix_bookings_id'), table_name='bookings')
+        op.execute("ALTER TABLE bookings RENAME TO bookings_partitioned")
+        op.execute("ALTER TABLE bookings_partitioned RENAME CONSTRAINT bookings_pkey TO bookings_partitioned_pkey")
+        op.execute("""
+            CREATE TABLE bookings (
+                id INTEGER NOT NULL DEFAULT nextval('bookings_id_seq'),
+                user_id INTEGER NOT NULL REFERENCES users (id),
+                event_id INTEGER NOT NULL REFERENCES events (id),
+                seat_id INTEGER NOT NULL REFERENCES seats (id),
+                status VARCHAR NOT NULL,
+                created_at TIMESTAMP WITHOUT TIME ZONE,
+                PRIMARY KEY (id)
+            )
+        """)
+        op.execute(f"INSERT INTO bookings ({BOOKINGS_COLUMNS}) SELECT {BOOKINGS_COLUMNS} FROM bookings_partitioned")
+        op.execute("ALTER SEQUENCE bookings_id_seq OWNED BY bookings.id")
+        op.execute("DROP TABLE bookings_partitioned")
+        op.create_index(op.f('ix_bookings_id'), 'bookings', ['id'], unique=False)
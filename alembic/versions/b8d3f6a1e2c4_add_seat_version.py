@@ -0,0 +1,28 @@
+"""Add version column to seats
+
+Revision ID: b8d3f6a1e2c4
+Revises: e7b4a2c9d1f3
+Create Date: 2025-09-29 16:42:51.118093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8d3f6a1e2c4'
+down_revision: Union[str, Sequence[str], None] = 'e7b4a2c9d1f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('seats', sa.Column('version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('seats', 'version')
@@ -0,0 +1,28 @@
+"""Add covering index for user booking history
+
+Revision ID: c41e7a9b3d25
+Revises: 5d8e2b7c1f90
+Create Date: 2025-09-27 11:05:32.664810
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41e7a9b3d25'
+down_revision: Union[str, Sequence[str], None] = '5d8e2b7c1f90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_bookings_user_id_status_created_at', 'bookings', ['user_id', 'status', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_bookings_user_id_status_created_at', table_name='bookings')
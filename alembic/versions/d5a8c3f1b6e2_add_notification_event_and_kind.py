@@ -0,0 +1,32 @@
+"""Add event_id and kind to notifications
+
+Revision ID: d5a8c3f1b6e2
+Revises: 6b1d3e8f2a47
+Create Date: 2025-10-08 09:14:22.517306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5a8c3f1b6e2'
+down_revision: Union[str, Sequence[str], None] = '6b1d3e8f2a47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('notifications', sa.Column('event_id', sa.Integer(), nullable=True))
+    op.add_column('notifications', sa.Column('kind', sa.String(), nullable=True))
+    op.create_index('ix_notifications_event_id_kind_user_id', 'notifications', ['event_id', 'kind', 'user_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_notifications_event_id_kind_user_id', table_name='notifications')
+    op.drop_column('notifications', 'kind')
+    op.drop_column('notifications', 'event_id')
@@ -0,0 +1,42 @@
+"""Add indexes for event search
+
+Revision ID: e7b4a2c9d1f3
+Revises: c41e7a9b3d25
+Create Date: 2025-09-28 10:14:08.207431
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b4a2c9d1f3'
+down_revision: Union[str, Sequence[str], None] = 'c41e7a9b3d25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _is_postgresql() -> bool:
+    return op.get_bind().dialect.name == 'postgresql'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_events_start_time'), 'events', ['start_time'], unique=False)
+    op.create_index('ix_events_venue_start_time', 'events', ['venue', 'start_time'], unique=False)
+    op.create_index(op.f('ix_seats_event_id'), 'seats', ['event_id'], unique=False)
+    if _is_postgresql():
+        # Trigram index so that name ILIKE '%...%' does not scan the whole catalog.
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute("CREATE INDEX ix_events_name_trgm ON events USING gin (name gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if _is_postgresql():
+        op.execute("DROP INDEX ix_events_name_trgm")
+    op.drop_index(op.f('ix_seats_event_id'), table_name='seats')
+    op.drop_index('ix_events_venue_start_time', table_name='events')
+    op.drop_index(op.f('ix_events_start_time'), table_name='events')
@@ -0,0 +1,30 @@
+"""Add row and position to seats
+
+Revision ID: f2a9c7e5b3d1
+Revises: b8d3f6a1e2c4
+Create Date: 2025-09-30 09:27:14.550362
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a9c7e5b3d1'
+down_revision: Union[str, Sequence[str], None] = 'b8d3f6a1e2c4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('seats', sa.Column('row_number', sa.Integer(), nullable=True))
+    op.add_column('seats', sa.Column('position', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('seats', 'position')
+    op.drop_column('seats', 'row_number')
@@ -0,0 +1,114 @@
+import bisect
+from typing import Dict, Iterable, List, Optional, Tuple
+
+class FreeIntervalIndex:
+    """
+    Free seats of one event as maximal runs of adjacent free seats (same row, consecutive
+    positions), kept per row and, across rows, in a list sorted by (length, row, start).
+    Finding the best block of N is a bisect on that list; booking or releasing a seat
+    splits or merges at most three runs.
+    """
+
+    def __init__(self, seats: Iterable[Tuple[int, int, int, bool]]):
+        """
+        `seats` yields (seat_id, row, position, free).
+        """
+        self._where: Dict[int, Tuple[int, int]] = {}
+        self._seat_at: Dict[Tuple[int, int], int] = {}
+        # row -> (run starts, run ends), sorted and disjoint, ends inclusive
+        self._rows: Dict[int, Tuple[List[int], List[int]]] = {}
+        self._by_length: List[Tuple[int, int, int]] = []
+
+        free = []
+        for seat_id, row, position, is_free in seats:
+            self._where[seat_id] = (row, position)
+            self._seat_at[(row, position)] = seat_id
+            if is_free:
+                free.append((row, position))
+        free.sort()
+
+        run = None
+        for row, position in free:
+            if run and run[0] == row and run[2] == position - 1:
+                run[2] = position
+                continue
+            if run:
+                self._add_run(*run)
+            run = [row, position, position]
+        if run:
+            self._add_run(*run)
+        self._by_length.sort()
+
+    def best_block(self, count: int) -> Optional[List[int]]:
+        """
+        Returns the seat ids of `count` adjacent free seats taken from the start of the
+        shortest run that fits (lowest row and position first on ties), which keeps long
+        runs intact for larger groups. Returns None when no run is long enough.
+        """
+        i = bisect.bisect_left(self._by_length, (count, -1, -1))
+        if i == len(self._by_length):
+            return None
+        _, row, start = self._by_length[i]
+        return [self._seat_at[(row, start + offset)] for offset in range(count)]
+
+    def occupy(self, seat_id: int):
+        where = self._where.get(seat_id)
+        if where is None:
+            return
+        row, position = where
+        run = self._run_containing(row, position)
+        if run is None:
+            return
+        start, end = run
+        self._remove_run(row, start, end)
+        if start < position:
+            self._insert_run(row, start, position - 1)
+        if position < end:
+            self._insert_run(row, position + 1, end)
+
+    def release(self, seat_id: int):
+        where = self._where.get(seat_id)
+        if where is None:
+            return
+        row, position = where
+        if self._run_containing(row, position) is not None:
+            return
+        start = end = position
+        left = self._run_containing(row, position - 1)
+        if left is not None:
+            self._remove_run(row, *left)
+            start = left[0]
+        right = self._run_containing(row, position + 1)
+        if right is not None:
+            self._remove_run(row, *right)
+            end = right[1]
+        self._insert_run(row, start, end)
+
+    def _run_containing(self, row: int, position: int) -> Optional[Tuple[int, int]]:
+        starts, ends = self._rows.get(row, ((), ()))
+        i = bisect.bisect_right(starts, position) - 1
+        if i >= 0 and ends[i] >= position:
+            return starts[i], ends[i]
+        return None
+
+    def _add_run(self, row: int, start: int, end: int):
+        # Used while building: runs arrive in order, and _by_length is sorted once at the end.
+        starts, ends = self._rows.setdefault(row, ([], []))
+        starts.append(start)
+        ends.append(end)
+        self._by_length.append((end - start + 1, row, start))
+
+    def _insert_run(self, row: int, start: int, end: int):
+        starts, ends = self._rows.setdefault(row, ([], []))
+        i = bisect.bisect_left(starts, start)
+        starts.insert(i, start)
+        ends.insert(i, end)
+        bisect.insort(self._by_length, (end - start + 1, row, start))
+
+    def _remove_run(self, row: int, start: int, end: int):
+        starts, ends = self._rows[row]
+        i = bisect.bisect_left(starts, start)
+        del starts[i]
+        del ends[i]
+        j = bisect.bisect_left(self._by_length, (end - start + 1, row, start))
+        del self._by_length[j]
@@ -0,0 +1,117 @@
+import argparse
+import datetime as dt
+import logging
+from typing import List, Optional
+
+from sqlalchemy import delete, insert, literal, select
+from sqlalchemy.orm import Session
+
+from . import models
+from .availability import mark_seats_changed
+
+logger = logging.getLogger(__name__)
+
+# (hot model, archive model, columns copied) for everything that belongs to an event,
+# in the order rows have to be deleted to satisfy the foreign keys.
+EVENT_CHILDREN = [
+    (models.WaitlistEntry, models.ArchivedWaitlistEntry, ["id", "user_id", "event_id", "created_at"]),
+    (models.Booking, models.ArchivedBooking, ["id", "user_id", "event_id", "seat_id", "status", "created_at"]),
+    (models.Seat, models.ArchivedSeat, ["id", "event_id", "seat_number", "row_number", "position", "version"]),
+]
+EVENT_COLUMNS = ["id", "name", "venue", "start_time", "end_time", "is_cancelled"]
+BOOKING_COLUMNS = ["id", "user_id", "event_id", "seat_id", "status", "created_at"]
+
+def move_rows(db: Session, model, archive_model, columns: List[str], where, archived_at: dt.datetime) -> int:
+    """
+    Copies the rows matching `where` into the archive table with INSERT ... SELECT
+    and deletes them from the hot table. Returns the number of rows moved.
+    """
+    source = select(*[getattr(model, c) for c in columns], literal(archived_at).label("archived_at")).where(where)
+    db.execute(insert(archive_model).from_select(columns + ["archived_at"], source))
+    result = db.execute(delete(model).where(where).execution_options(synchronize_session=False))
+    return result.rowcount
+
+def archive_finished_events(db: Session, finished_before: Optional[dt.datetime] = None, batch_size: int = 50) -> int:
+    """
+    Moves events that ended before `finished_before` (default: now), together with their
+    seats, bookings and waitlist entries, into the archive tables. Each batch of events
+    is moved in its own transaction. Returns the number of events archived.
+    """
+    finished_before = finished_before or dt.datetime.utcnow()
+    archived = 0
+    while True:
+        event_ids = db.scalars(
+            select(models.Event.id)
+            .where(models.Event.end_time < finished_before)
+            .order_by(models.Event.id)
+            .limit(batch_size)
+        ).all()
+        if not event_ids:
+            break
+
+        archived_at = dt.datetime.utcnow()
+        for event_id in event_ids:
+            mark_seats_changed(db, event_id)
+        for model, archive_model, columns in EVENT_CHILDREN:
+            move_rows(db, model, archive_model, columns, model.event_id.in_(event_ids), archived_at)
+        move_rows(db, models.Event, models.ArchivedEvent, EVENT_COLUMNS, models.Event.id.in_(event_ids), archived_at)
+        db.commit()
+
+        archived += len(event_ids)
+        logger.info("Archived %d finished events (last id %d)", len(event_ids), event_ids[-1])
+    return archived
+
+def archive_cancelled_bookings(db: Session, cancelled_before: dt.datetime, batch_size: int = 5000) -> int:
+    """
+    Moves cancelled bookings created before `cancelled_before` into the archive table in
+    batches of `batch_size`, one transaction per batch. Returns the number of bookings archived.
+    """
+    archived = 0
+    last_id = 0
+    while True:
+        booking_ids = db.scalars(
+            select(models.Booking.id)
+            .where(
+                models.Booking.status == 'cancelled',
+                models.Booking.created_at < cancelled_before,
+                models.Booking.id > last_id,
+            )
+            .order_by(models.Booking.id)
+            .limit(batch_size)
+        ).all()
+        if not booking_ids:
+            break
+
+        move_rows(db, models.Booking, models.ArchivedBooking, BOOKING_COLUMNS, models.Booking.id.in_(booking_ids), dt.datetime.utcnow())
+        db.commit()
+
+        archived += len(booking_ids)
+        last_id = booking_ids[-1]
+        logger.info("Archived %d cancelled bookings (last id %d)", len(booking_ids), last_id)
+    return archived
+
+def main():
+    from .database import SessionLocal, get_write_engine
+
+    parser = argparse.ArgumentParser(description="Move finished events and old cancelled bookings to the archive tables.")
+    parser.add_argument("--cancelled-older-than-days", type=int, default=30)
+    parser.add_argument("--event-batch-size", type=int, default=50)
+    parser.add_argument("--booking-batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    db = SessionLocal(bind=get_write_engine())
+    try:
+        now = dt.datetime.utcnow()
+        events = archive_finished_events(db, finished_before=now, batch_size=args.event_batch_size)
+        bookings = archive_cancelled_bookings(
+            db,
+            cancelled_before=now - dt.timedelta(days=args.cancelled_older_than_days),
+            batch_size=args.booking_batch_size,
+        )
+        logger.info("Archived %d events and %d cancelled bookings.", events, bookings)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
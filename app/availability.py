@@ -0,0 +1,260 @@
+import base64
+import bisect
+import json
+import threading
+import time
+import zlib
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from . import models
+from .allocation import FreeIntervalIndex
+from .invalidation import invalidation_bus
+
+# Row of seats created without a layout: they are treated as one row in seat id order.
+UNLAID_ROW = -1
+
+@dataclass
+class SeatMap:
+    """
+    Availability of one event's seats. Seat ordinals are positions in seat id order;
+    bit `i` of `bitmap` (most significant bit first) is set when seat `i` is free.
+    `manifest` is the pre-serialized ordinal -> seat_number JSON, identified by `version`.
+    `rows` and `positions` hold each ordinal's layout; `intervals`, the free-interval
+    index used for group allocation, is built on first use.
+    """
+    event_id: int
+    version: str
+    seat_ids: array
+    bitmap: bytearray
+    available: int
+    manifest: bytes
+    expires_at: float
+    rows: array = field(default_factory=lambda: array("i"))
+    positions: array = field(default_factory=lambda: array("i"))
+    intervals: Optional[FreeIntervalIndex] = None
+
+    @property
+    def seat_count(self) -> int:
+        return len(self.seat_ids)
+
+    def is_free(self, ordinal: int) -> bool:
+        return bool(self.bitmap[ordinal // 8] & (0x80 >> (ordinal % 8)))
+
+    def set_free(self, seat_id: int, free: bool) -> bool:
+        """
+        Flips the bit of a seat. Returns False when the seat is not part of this map.
+        """
+        ordinal = bisect.bisect_left(self.seat_ids, seat_id)
+        if ordinal == len(self.seat_ids) or self.seat_ids[ordinal] != seat_id:
+            return False
+        mask = 0x80 >> (ordinal % 8)
+        was_free = self.is_free(ordinal)
+        if free and not was_free:
+            self.bitmap[ordinal // 8] |= mask
+            self.available += 1
+        elif was_free and not free:
+            self.bitmap[ordinal // 8] &= ~mask
+            self.available -= 1
+        if self.intervals is not None:
+            if free:
+                self.intervals.release(seat_id)
+            else:
+                self.intervals.occupy(seat_id)
+        return True
+
+    def build_intervals(self) -> FreeIntervalIndex:
+        self.intervals = FreeIntervalIndex(
+            (self.seat_ids[i], self.rows[i], self.positions[i], self.is_free(i)) for i in range(self.seat_count)
+        )
+        return self.intervals
+
+def build_seat_map(db: Session, event_id: int, ttl: float) -> Optional[SeatMap]:
+    """
+    Loads an event's seats and active bookings into a SeatMap, or returns None when the
+    event does not exist.
+    """
+    seats = db.execute(
+        select(models.Seat.id, models.Seat.seat_number, models.Seat.row_number, models.Seat.position)
+        .where(models.Seat.event_id == event_id)
+        .order_by(models.Seat.id)
+    ).all()
+    if not seats and db.get(models.Event, event_id) is None:
+        return None
+    booked = set(db.scalars(
+        select(models.Booking.seat_id).where(models.Booking.event_id == event_id, models.Booking.status == 'active')
+    ))
+
+    seat_ids = array("q", (seat.id for seat in seats))
+    bitmap = bytearray(b"\xff" * ((len(seat_ids) + 7) // 8))
+    if len(seat_ids) % 8:
+        bitmap[-1] = (0xff << (8 - len(seat_ids) % 8)) & 0xff
+    seat_map = SeatMap(event_id, "", seat_ids, bitmap, len(seat_ids), b"", time.monotonic() + ttl)
+    seat_map.rows = array("i", (UNLAID_ROW if seat.row_number is None else seat.row_number for seat in seats))
+    seat_map.positions = array("i", (
+        ordinal + 1 if seat.row_number is None else seat.position for ordinal, seat in enumerate(seats)
+    ))
+    for seat_id in booked:
+        seat_map.set_free(seat_id, False)
+
+    seat_numbers = [seat.seat_number for seat in seats]
+    # The version covers seat ids as well as numbers, since ordinals follow the ids.
+    version = format(zlib.crc32(seat_ids.tobytes() + "\0".join(seat_numbers).encode()), "08x")
+    seat_map.version = version
+    seat_map.manifest = json.dumps(
+        {"event_id": event_id, "version": version, "seat_numbers": seat_numbers},
+        separators=(",", ":")
+    ).encode()
+    return seat_map
+
+class SeatMapCache:
+    """
+    Bounded LRU cache of SeatMaps. Bookings committed by this process flip bits in place
+    and seat changes evict the event, so entries stay current without reloading; the TTL
+    bounds staleness from writes made by other workers. A load that overlaps a committed
+    change to the same event is served but not cached, so it cannot overwrite newer state.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[int, SeatMap]" = OrderedDict()
+        # event_id -> [loads in progress, changes seen during them]
+        self._loading: Dict[int, List[int]] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, maxsize: int, ttl: float):
+        with self._lock:
+            self.maxsize = maxsize
+            self.ttl = ttl
+            self._entries.clear()
+
+    def get(self, db: Session, event_id: int) -> Optional[SeatMap]:
+        with self._lock:
+            seat_map = self._entries.get(event_id)
+            if seat_map is not None and seat_map.expires_at > time.monotonic():
+                self._entries.move_to_end(event_id)
+                return seat_map
+            loading = self._loading.setdefault(event_id, [0, 0])
+            loading[0] += 1
+            changes = loading[1]
+
+        try:
+            seat_map = build_seat_map(db, event_id, self.ttl)
+        finally:
+            with self._lock:
+                loading = self._loading[event_id]
+                stale = loading[1] != changes
+                loading[0] -= 1
+                if not loading[0]:
+                    del self._loading[event_id]
+        if seat_map is None or stale:
+            return seat_map
+
+        with self._lock:
+            self._entries[event_id] = seat_map
+            self._entries.move_to_end(event_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return seat_map
+
+    def snapshot(self, db: Session, event_id: int):
+        """
+        Returns (seat_map, bitmap bytes, available count) with the bitmap copied under the
+        lock, or None when the event does not exist.
+        """
+        seat_map = self.get(db, event_id)
+        if seat_map is None:
+            return None
+        with self._lock:
+            return seat_map, bytes(seat_map.bitmap), seat_map.available
+
+    def find_block(self, db: Session, event_id: int, count: int) -> Optional[List[int]]:
+        """
+        Returns the ids of `count` adjacent free seats (see FreeIntervalIndex.best_block),
+        or None when the event has no such block or does not exist. The answer comes from
+        the cache, so callers must still verify the seats in their transaction.
+        """
+        seat_map = self.get(db, event_id)
+        if seat_map is None:
+            return None
+        with self._lock:
+            intervals = seat_map.intervals or seat_map.build_intervals()
+            return intervals.best_block(count)
+
+    def apply(self, event_id: int, seat_id: Optional[int], free: Optional[bool]):
+        """
+        Records a committed change: a seat's new availability, or (seat_id None) a change
+        to the event's seats that requires a reload.
+        """
+        with self._lock:
+            if event_id in self._loading:
+                self._loading[event_id][1] += 1
+            seat_map = self._entries.get(event_id)
+            if seat_map is None:
+                return
+            if seat_id is None or not seat_map.set_free(seat_id, free):
+                del self._entries[event_id]
+
+    def invalidate(self, event_id: int):
+        self.apply(event_id, None, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+def encode_bitmap(bitmap: bytes) -> str:
+    return base64.b64encode(bitmap).decode()
+
+# Sized from settings by app.main.create_app.
+seat_map_cache = SeatMapCache(maxsize=256, ttl=30.0)
+
+def mark_seats_changed(session: Session, event_id: int, seat_id: Optional[int] = None, free: Optional[bool] = None):
+    """
+    Evicts the event's seat map once the session commits, or with `seat_id` only updates
+    that seat's availability to `free`. For writes that bypass the ORM unit of work (bulk
+    inserts and deletes of seats or bookings).
+    """
+    session.info.setdefault("seat_map_changes", []).append((event_id, seat_id, free))
+
+@event.listens_for(Session, "after_flush")
+def _collect_seat_changes(session, flush_context):
+    changes = session.info.setdefault("seat_map_changes", [])
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, models.Booking):
+            changes.append((obj.event_id, obj.seat_id, obj.status != 'active'))
+        elif isinstance(obj, models.Seat):
+            changes.append((obj.event_id, None, None))
+    for obj in session.deleted:
+        if isinstance(obj, (models.Booking, models.Seat)):
+            changes.append((obj.event_id, None, None))
+        elif isinstance(obj, models.Event):
+            changes.append((obj.id, None, None))
+
+@event.listens_for(Session, "after_commit")
+def _apply_seat_changes(session):
+    changes = session.info.pop("seat_map_changes", ())
+    for event_id, seat_id, free in changes:
+        seat_map_cache.apply(event_id, seat_id, free)
+    if changes:
+        invalidation_bus.publish(
+            ("event", event_id, None if seat_id is None else [seat_id, free]) for event_id, seat_id, free in changes
+        )
+
+@event.listens_for(Session, "after_rollback")
+def _discard_seat_changes(session):
+    session.info.pop("seat_map_changes", None)
+
+def _apply_remote_seat_change(event_id: int, detail):
+    # Other workers send a seat's new availability, or None when the event must be reloaded.
+    # States are absolute, so only two changes to the same seat arriving out of order can
+    # leave a stale bit, which the TTL still bounds.
+    seat_map_cache.apply(event_id, *(detail or (None, None)))
+
+invalidation_bus.subscribe("event", _apply_remote_seat_change)
+invalidation_bus.on_reset(seat_map_cache.clear)
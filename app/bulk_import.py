@@ -0,0 +1,210 @@
+import argparse
+import codecs
+import csv
+import json
+import logging
+import sys
+from typing import AsyncIterator, Iterable, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from . import models, schemas
+from .services import seat_layout
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("ndjson", "csv")
+SEAT_INSERT_BATCH = 10000
+
+class EventImporter:
+    """
+    Streams event rows (NDJSON, one record per line, or CSV) into the database. Seats are
+    laid out in rows of `seats_per_row` when a row gives it. A CSV
+    record may span several lines inside a quoted field; errors are reported against
+    the line it starts on.
+
+    Rows are validated as they arrive and buffered into chunks; each chunk is written with
+    Core bulk inserts in its own transaction. Invalid rows, and rows of a chunk the database
+    rejects, are recorded in the report instead of aborting the import.
+    """
+
+    def __init__(self, db: Session, fmt: str = "ndjson", chunk_size: int = 500):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported import format: {fmt}")
+        self.db = db
+        self.fmt = fmt
+        self.chunk_size = chunk_size
+        self.csv_header: Optional[List[str]] = None
+        # (first line number, text so far) of a CSV record whose quoted field is still open
+        self.csv_pending: Optional[Tuple[int, str]] = None
+        self.chunk: List[Tuple[int, schemas.EventImportRow]] = []
+        self.report = schemas.EventImportReport(imported=0, failed=0)
+
+    def feed(self, line_no: int, line: str) -> bool:
+        """
+        Parses one input line. Returns True when a full chunk is buffered and should be flushed.
+        """
+        if self.csv_pending is not None:
+            start, previous = self.csv_pending
+            line_no, line = start, previous + "\n" + line.rstrip("\r\n")
+            self.csv_pending = None
+        line = line.strip()
+        if not line:
+            return False
+        # Quotes come in pairs, escaped ones included, so an odd count leaves a field open.
+        if self.fmt == "csv" and line.count('"') % 2:
+            self.csv_pending = (line_no, line)
+            return False
+        try:
+            data = self._parse(line)
+            if data is None:
+                return False
+            self.chunk.append((line_no, schemas.EventImportRow.model_validate(data)))
+        except (ValueError, ValidationError) as exc:
+            self._fail(line_no, exc)
+        return len(self.chunk) >= self.chunk_size
+
+    def flush(self):
+        chunk, self.chunk = self.chunk, []
+        if not chunk:
+            return
+        try:
+            self._insert(chunk)
+            self.db.commit()
+            self.report.imported += len(chunk)
+            logger.debug("Imported %d events (through line %d)", len(chunk), chunk[-1][0])
+        except SQLAlchemyError as exc:
+            self.db.rollback()
+            if len(chunk) == 1:
+                self._fail(chunk[0][0], exc)
+                return
+            # Retry row by row so one bad row only fails itself.
+            for row in chunk:
+                try:
+                    self._insert([row])
+                    self.db.commit()
+                    self.report.imported += 1
+                except SQLAlchemyError as exc:
+                    self.db.rollback()
+                    self._fail(row[0], exc)
+
+    def finish(self):
+        """
+        Ends the input: reports a CSV record left open by an unterminated quote and
+        flushes the last chunk.
+        """
+        if self.csv_pending is not None:
+            self._fail(self.csv_pending[0], ValueError("unterminated quoted field"))
+            self.csv_pending = None
+        self.flush()
+
+    def feed_lines(self, numbered_lines: Iterable[Tuple[int, str]]):
+        for line_no, line in numbered_lines:
+            if self.feed(line_no, line):
+                self.flush()
+
+    def import_lines(self, lines: Iterable[str]) -> schemas.EventImportReport:
+        self.feed_lines(enumerate(lines, start=1))
+        self.finish()
+        return self.report
+
+    async def aimport_stream(self, stream: AsyncIterator[bytes]) -> schemas.EventImportReport:
+        """
+        Reads the stream on the event loop and hands each `chunk_size` lines to a worker
+        thread, where they are parsed, validated and written; the session is only used there.
+        """
+        line_no = 0
+        lines: List[Tuple[int, str]] = []
+        async for line in _aiter_lines(stream):
+            line_no += 1
+            lines.append((line_no, line))
+            if len(lines) >= self.chunk_size:
+                await run_in_threadpool(self.feed_lines, lines)
+                lines = []
+        await run_in_threadpool(self.feed_lines, lines)
+        await run_in_threadpool(self.finish)
+        return self.report
+
+    def _parse(self, line: str) -> Optional[dict]:
+        if self.fmt == "ndjson":
+            data = json.loads(line)
+            if not isinstance(data, dict):
+                raise ValueError("expected a JSON object")
+            return data
+
+        values = next(csv.reader([line]))
+        if self.csv_header is None:
+            self.csv_header = [v.strip() for v in values]
+            return None
+        if len(values) != len(self.csv_header):
+            raise ValueError(f"expected {len(self.csv_header)} columns, got {len(values)}")
+        data = {k: v for k, v in zip(self.csv_header, values) if v != ""}
+        if "seat_numbers" in data:
+            data["seat_numbers"] = data["seat_numbers"].split(";")
+        return data
+
+    def _insert(self, chunk: List[Tuple[int, schemas.EventImportRow]]):
+        event_ids = self.db.scalars(
+            insert(models.Event).returning(models.Event.id, sort_by_parameter_order=True),
+            [row.model_dump(include={"name", "venue", "start_time", "end_time"}) for _, row in chunk]
+        ).all()
+
+        seats = []
+        for event_id, (_, row) in zip(event_ids, chunk):
+            seat_numbers = row.seat_numbers or (f"Seat-{i+1}" for i in range(row.total_seats))
+            seats.extend(
+                {"event_id": event_id, "seat_number": number, **seat_layout(i, row.seats_per_row)}
+                for i, number in enumerate(seat_numbers)
+            )
+            if len(seats) >= SEAT_INSERT_BATCH:
+                self.db.execute(insert(models.Seat), seats)
+                seats = []
+        if seats:
+            self.db.execute(insert(models.Seat), seats)
+
+    def _fail(self, line_no: int, exc: Exception):
+        if isinstance(exc, ValidationError):
+            message = "; ".join(f"{'.'.join(map(str, e['loc'])) or 'row'}: {e['msg']}" for e in exc.errors())
+        else:
+            message = (str(exc).splitlines() or [type(exc).__name__])[0]
+        self.report.failed += 1
+        self.report.errors.append(schemas.ImportRowError(line=line_no, error=message))
+
+async def _aiter_lines(stream: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+    async for chunk in stream:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+def main():
+    from .database import SessionLocal, get_write_engine
+
+    parser = argparse.ArgumentParser(description="Bulk import events and seats from an NDJSON or CSV file.")
+    parser.add_argument("path", help="File to import, or - for stdin")
+    parser.add_argument("--format", choices=FORMATS, help="Defaults to the file extension")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    args = parser.parse_args()
+
+    fmt = args.format or ("csv" if args.path.endswith(".csv") else "ndjson")
+    logging.basicConfig(level=logging.INFO)
+    db = SessionLocal(bind=get_write_engine())
+    try:
+        source = sys.stdin if args.path == "-" else open(args.path, encoding="utf-8", newline="")
+        with source:
+            report = EventImporter(db, fmt=fmt, chunk_size=args.chunk_size).import_lines(source)
+        print(report.model_dump_json(indent=2))
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
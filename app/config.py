@@ -1,9 +1,46 @@
+from functools import lru_cache
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     DATABASE_URL: str
+    READ_REPLICA_URL: Optional[str] = None
+    READ_YOUR_WRITES_SECONDS: float = 5.0
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    SQLITE_PROFILE: str = "concurrent"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    WARMUP_ENABLED: bool = True
+    WARMUP_CONNECTIONS: int = 2
+    USER_CACHE_SIZE: int = 10000
+    USER_CACHE_TTL_SECONDS: float = 60.0
+    USER_CACHE_NEGATIVE_TTL_SECONDS: float = 1.0
+    BOOKING_STRATEGY: str = "pessimistic"
+    BOOKING_MAX_RETRIES: int = 3
+    SEAT_MAP_CACHE_SIZE: int = 256
+    SEAT_MAP_TTL_SECONDS: float = 30.0
+    TASK_MODE: str = "thread"
+    TASK_WORKERS: int = 4
+    TASK_QUEUE_SIZE: int = 1000
+    TASK_SUBMIT_TIMEOUT_SECONDS: float = 0.05
+    TASK_DRAIN_TIMEOUT_SECONDS: float = 10.0
+    INVALIDATION_BUS: str = "memory"
+    INVALIDATION_CHANNEL: str = "evently_invalidation"
+    SQL_TRACE_ENABLED: bool = False
+    SQL_TRACE_HEADER: bool = False
+    SLOW_REQUEST_MS: float = 1000.0
+    SLOW_STATEMENT_MS: float = 200.0
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_STORE: str = "memory"
+    RATE_LIMIT_REDIS_URL: Optional[str] = None
+    RATE_LIMIT_IP_FACTOR: float = 10.0
 
     class Config:
         env_file = ".env"
 
-settings = Settings()
+@lru_cache
+def get_settings() -> Settings:
+    """
+    Returns the process-wide settings, read from the environment on first use.
+    """
+    return Settings()
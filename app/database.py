@@ -1,13 +1,167 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from .config import settings
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Iterable, Optional
 
-engine = create_engine(settings.DATABASE_URL)
+from fastapi import Header
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+from .config import get_settings
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
+
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False)
+
+def configure_sqlite(engine: Engine, busy_timeout_ms: int):
+    """
+    Concurrency profile for SQLite: WAL journal so readers never block the writer,
+    busy_timeout so a writer waits for the lock instead of failing, and explicit BEGIN
+    statements. Transactions begin DEFERRED unless the connection carries the
+    `sqlite_begin="IMMEDIATE"` execution option (see get_write_engine), which takes the
+    write lock up front so check-then-insert sequences such as booking a seat are serialized.
+    """
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        # Let the "begin" listener below issue BEGIN instead of the sqlite3 module.
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(busy_timeout_ms)}")
+        cursor.close()
+
+    @event.listens_for(engine, "begin")
+    def _on_begin(connection):
+        mode = connection.get_execution_options().get("sqlite_begin", "DEFERRED")
+        connection.exec_driver_sql(f"BEGIN {mode}")
+
+def create_db_engine(url: str, **kwargs) -> Engine:
+    settings = get_settings()
+    if not url.startswith("sqlite"):
+        kwargs.setdefault("pool_size", settings.DB_POOL_SIZE)
+        kwargs.setdefault("max_overflow", settings.DB_MAX_OVERFLOW)
+    engine = create_engine(url, **kwargs)
+    if engine.dialect.name == "sqlite" and settings.SQLITE_PROFILE == "concurrent":
+        configure_sqlite(engine, settings.SQLITE_BUSY_TIMEOUT_MS)
+    return engine
+
+@lru_cache
+def get_engine() -> Engine:
+    """
+    Returns the primary engine, created on first use. No connection is opened until
+    the first query or the startup warm-up.
+    """
+    engine = create_db_engine(get_settings().DATABASE_URL)
+    SessionLocal.configure(bind=engine)
+    return engine
+
+@lru_cache
+def get_write_engine() -> Engine:
+    """
+    Returns the primary engine for read-write sessions. On SQLite its transactions
+    begin IMMEDIATE (see configure_sqlite); other databases get the primary engine itself.
+    """
+    engine = get_engine()
+    if engine.dialect.name == "sqlite":
+        return engine.execution_options(sqlite_begin="IMMEDIATE")
+    return engine
+
+@lru_cache
+def get_read_engine() -> Engine:
+    """
+    Returns the read replica engine, or the primary engine when no replica is configured.
+    """
+    replica_url = get_settings().READ_REPLICA_URL
+    engine = create_db_engine(replica_url, pool_pre_ping=True) if replica_url else get_engine()
+    ReadSessionLocal.configure(bind=engine)
+    return engine
+
+# user_id -> monotonic deadline until which the user's reads go to the primary, in the
+# order the pins were last renewed
+_primary_pins: "OrderedDict[int, float]" = OrderedDict()
+_primary_pins_lock = threading.Lock()
+
+def pin_user_to_primary(user_id: int, seconds: Optional[float] = None):
+    """
+    Routes the user's reads to the primary for a short window so they see their own writes
+    while the replica catches up. Pins are kept in this process only: with several
+    workers, read-your-writes holds for requests served by the worker that wrote, and
+    other workers may serve replica reads up to the replication lag behind.
+    """
+    window = get_settings().READ_YOUR_WRITES_SECONDS if seconds is None else seconds
+    now = time.monotonic()
+    with _primary_pins_lock:
+        _primary_pins.pop(user_id, None)
+        _primary_pins[user_id] = now + window
+        # Renewed pins move to the end, so with the usual fixed window the expired ones
+        # are at the front; dropping them here keeps the map bounded by recent writers.
+        while _primary_pins:
+            oldest = next(iter(_primary_pins))
+            if _primary_pins[oldest] > now:
+                break
+            del _primary_pins[oldest]
+
+def pin_users_after_commit(session: Session, user_ids: Iterable[int]):
+    """
+    Pins users to the primary once the session commits. The flush hook below only sees
+    ORM objects, so Core writes on behalf of users (bulk inserts, INSERT ... SELECT,
+    UPDATE ... RETURNING) must name them here.
+    """
+    session.info.setdefault("written_user_ids", set()).update(user_ids)
+
+def is_pinned_to_primary(user_id: Optional[int]) -> bool:
+    if user_id is None:
+        return False
+    with _primary_pins_lock:
+        deadline = _primary_pins.get(user_id)
+        if deadline is None:
+            return False
+        if deadline <= time.monotonic():
+            del _primary_pins[user_id]
+            return False
+        return True
+
+@event.listens_for(Session, "after_flush")
+def _collect_written_users(session, flush_context):
+    written = session.info.setdefault("written_user_ids", set())
+    for obj in itertools.chain(session.new, session.dirty, session.deleted):
+        user_id = getattr(obj, "user_id", None)
+        if user_id is not None:
+            written.add(user_id)
+
+@event.listens_for(Session, "after_commit")
+def _pin_written_users(session):
+    for user_id in session.info.pop("written_user_ids", ()):
+        pin_user_to_primary(user_id)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_written_users(session):
+    session.info.pop("written_user_ids", None)
+
+@event.listens_for(ReadSessionLocal, "before_flush")
+def _reject_replica_writes(session, flush_context, instances):
+    raise RuntimeError("Read-only session cannot flush changes")
 
 def get_db():
-    db = SessionLocal()
+    db = SessionLocal(bind=get_write_engine())
+    try:
+        yield db
+    finally:
+        db.close()
+
+def get_read_db(x_user_id: Optional[int] = Header(None)):
+    """
+    Yields a session on the read replica, or on the primary when no replica is configured
+    or the current user wrote recently.
+    """
+    engine, read_engine = get_engine(), get_read_engine()
+    if read_engine is engine or is_pinned_to_primary(x_user_id):
+        db = SessionLocal(bind=engine)
+    else:
+        db = ReadSessionLocal(bind=read_engine)
     try:
         yield db
     finally:
@@ -1,10 +1,19 @@
-from fastapi import Header, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
+from sqlalchemy.orm import Session
 from typing import Optional
 
-def get_current_user(x_user_id: Optional[int] = Header(None)):
+from .database import get_read_db
+from .identity import user_cache
+
+def get_current_user(x_user_id: Optional[int] = Header(None), db: Session = Depends(get_read_db)):
     if x_user_id is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User ID not provided in X-User-ID header"
         )
+    if user_cache.get(db, x_user_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Unknown user"
+        )
     return x_user_id
@@ -0,0 +1,94 @@
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from . import models
+from .invalidation import invalidation_bus
+
+@dataclass(frozen=True)
+class CachedUser:
+    id: int
+    role: str
+
+class UserCache:
+    """
+    Bounded LRU cache of user id -> CachedUser with a TTL, so authenticating a request
+    does not cost a `users` lookup. Unknown ids are cached too (as None) for the much
+    shorter `negative_ttl`, so that bogus X-User-ID values do not reach the database on
+    every request, while a user created on another worker or replica is not rejected for
+    long. Committed changes to a user, including its creation, invalidate the entry.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, negative_ttl: float = 1.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def configure(self, maxsize: int, ttl: float, negative_ttl: float = 1.0):
+        with self._lock:
+            self.maxsize = maxsize
+            self.ttl = ttl
+            self.negative_ttl = negative_ttl
+            self._entries.clear()
+
+    def get(self, db: Session, user_id: int) -> Optional[CachedUser]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(user_id)
+                return entry[0]
+
+        row = db.execute(select(models.User.id, models.User.role).where(models.User.id == user_id)).first()
+        user = CachedUser(id=row.id, role=row.role) if row else None
+        self.put(user_id, user, now)
+        return user
+
+    def put(self, user_id: int, user: Optional[CachedUser], now: Optional[float] = None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._entries[user_id] = (user, now + (self.ttl if user is not None else self.negative_ttl))
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+# Sized from settings by app.main.create_app.
+user_cache = UserCache(maxsize=10000, ttl=60.0, negative_ttl=1.0)
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session, flush_context):
+    changed = session.info.setdefault("changed_user_ids", set())
+    for obj in itertools.chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, models.User) and obj.id is not None:
+            changed.add(obj.id)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session):
+    changed = session.info.pop("changed_user_ids", ())
+    for user_id in changed:
+        user_cache.invalidate(user_id)
+    if changed:
+        invalidation_bus.publish(("user", user_id, None) for user_id in changed)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_users(session):
+    session.info.pop("changed_user_ids", None)
+
+invalidation_bus.subscribe("user", lambda user_id, detail: user_cache.invalidate(user_id))
+invalidation_bus.on_reset(user_cache.clear)
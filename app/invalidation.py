@@ -0,0 +1,283 @@
+import json
+import logging
+import queue
+import select
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Called with the changed key and the message detail (None or a JSON value).
+Handler = Callable[[int, Any], None]
+
+# (topic, key, detail)
+Message = Tuple[str, int, Any]
+
+# NOTIFY payloads must be shorter than 8000 bytes.
+MAX_PAYLOAD_BYTES = 7900
+
+class InMemoryBackend:
+    """
+    Delivers payloads synchronously to every bus started on this backend. Workers are
+    separate processes in production, so this only connects buses within one process:
+    it is the default for single-worker runs and lets the tests simulate several workers.
+    """
+    kind = "memory"
+
+    def __init__(self):
+        self._receivers: List[Callable[[str], None]] = []
+        self._lock = threading.Lock()
+
+    def start(self, receive: Callable[[str], None], reset: Callable[[], None]):
+        with self._lock:
+            self._receivers.append(receive)
+
+    def stop(self, receive: Callable[[str], None]):
+        with self._lock:
+            if receive in self._receivers:
+                self._receivers.remove(receive)
+
+    def publish(self, payload: str):
+        with self._lock:
+            receivers = list(self._receivers)
+        for receive in receivers:
+            receive(payload)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {}
+
+class PostgresBackend:
+    """
+    PostgreSQL LISTEN/NOTIFY on `channel`. A listener thread holds one dedicated
+    connection and a publisher thread sends queued payloads with pg_notify on another,
+    so a commit never waits on the broadcast. Notifications sent while the listener is
+    disconnected are lost, so every (re)connect calls `reset`, which clears the caches.
+    """
+    kind = "postgres"
+
+    def __init__(self, engine: Engine, channel: str, max_queue: int = 10000):
+        if engine.dialect.name != "postgresql":
+            raise RuntimeError("INVALIDATION_BUS=postgres requires a PostgreSQL DATABASE_URL")
+        self.engine = engine
+        self.channel = channel
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._stopping = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._metrics = {"connected": False, "reconnects": 0, "publish_errors": 0, "dropped": 0}
+
+    def start(self, receive: Callable[[str], None], reset: Callable[[], None]):
+        self._threads = [
+            threading.Thread(target=self._listen, args=(receive, reset), name="invalidation-listener", daemon=True),
+            threading.Thread(target=self._send, name="invalidation-publisher", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, receive: Callable[[str], None]):
+        self._stopping.set()
+        try:
+            # Lets the publisher finish what is queued before it; with a full queue it
+            # stops on _stopping instead once the queue runs empty.
+            self._queue.put_nowait(None)
+        except queue.Full:
+            pass
+        for thread in self._threads:
+            thread.join(5)
+
+    def publish(self, payload: str):
+        try:
+            self._queue.put_nowait(payload)
+        except queue.Full:
+            with self._lock:
+                self._metrics["dropped"] += 1
+            logger.warning("Invalidation publish queue full, dropping a message")
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._metrics, "queued": self._queue.qsize()}
+
+    def _connect(self):
+        # A dedicated connection taken out of the pool, in autocommit so LISTEN and
+        # pg_notify take effect immediately.
+        connection = self.engine.raw_connection()
+        connection.detach()
+        dbapi_connection = connection.driver_connection
+        dbapi_connection.autocommit = True
+        return dbapi_connection
+
+    def _listen(self, receive: Callable[[str], None], reset: Callable[[], None]):
+        delay, connected_before = 0.1, False
+        while not self._stopping.is_set():
+            connection = None
+            try:
+                connection = self._connect()
+                with connection.cursor() as cursor:
+                    cursor.execute(f'LISTEN "{self.channel}"')
+                with self._lock:
+                    self._metrics["connected"] = True
+                    if connected_before:
+                        self._metrics["reconnects"] += 1
+                connected_before, delay = True, 0.1
+                reset()
+                while not self._stopping.is_set():
+                    if select.select([connection], [], [], 1.0) == ([], [], []):
+                        continue
+                    connection.poll()
+                    while connection.notifies:
+                        receive(connection.notifies.pop(0).payload)
+            except Exception:
+                logger.exception("Invalidation listener disconnected, retrying in %.1fs", delay)
+                self._stopping.wait(delay)
+                delay = min(delay * 2, 5.0)
+            finally:
+                with self._lock:
+                    self._metrics["connected"] = False
+                if connection is not None:
+                    connection.close()
+
+    def _send(self):
+        connection = None
+        while True:
+            try:
+                payload = self._queue.get(timeout=1.0)
+            except queue.Empty:
+                if self._stopping.is_set():
+                    break
+                continue
+            if payload is None:
+                break
+            try:
+                if connection is None:
+                    connection = self._connect()
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT pg_notify(%s, %s)", (self.channel, payload))
+            except Exception:
+                logger.exception("Failed to publish an invalidation message")
+                with self._lock:
+                    self._metrics["publish_errors"] += 1
+                if connection is not None:
+                    connection.close()
+                connection = None
+        if connection is not None:
+            connection.close()
+
+def create_backend(kind: str, engine: Optional[Engine] = None, channel: str = "evently_invalidation"):
+    if kind == "memory":
+        return InMemoryBackend()
+    if kind == "postgres":
+        return PostgresBackend(engine, channel)
+    raise ValueError(f"Unknown invalidation bus: {kind}")
+
+class InvalidationBus:
+    """
+    Broadcasts "X changed" messages between workers so that each drops or updates the
+    matching entries of its in-process caches. Messages are published after commit; the
+    publishing worker has already updated its own caches, so it ignores its own messages.
+    Delivery is best effort and the cache TTLs still bound staleness when one is lost.
+    Each message carries its send time, from which the receiving worker measures the
+    delivery lag (across hosts this includes clock skew).
+    """
+
+    def __init__(self, backend=None):
+        self.origin = uuid.uuid4().hex[:12]
+        self._handlers: Dict[str, List[Handler]] = {}
+        self._reset_handlers: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+        self.backend = None
+        self.configure(backend or InMemoryBackend())
+
+    def configure(self, backend):
+        self.stop()
+        with self._lock:
+            self.backend = backend
+            self._metrics = {
+                "published": 0,
+                "received": 0,
+                "ignored_own": 0,
+                "handler_errors": 0,
+                "resets": 0,
+                "lag_seconds_last": None,
+                "lag_seconds_max": 0.0,
+                "lag_seconds_total": 0.0,
+            }
+        backend.start(self._receive, self._reset)
+
+    def stop(self):
+        if self.backend is not None:
+            self.backend.stop(self._receive)
+
+    def subscribe(self, topic: str, handler: Handler):
+        self._handlers.setdefault(topic, []).append(handler)
+
+    def on_reset(self, handler: Callable[[], None]):
+        """
+        Registers a callback run when messages may have been missed, such as after the
+        listener reconnects. It should clear the cache entirely.
+        """
+        self._reset_handlers.append(handler)
+
+    def publish(self, messages: Iterable[Message]):
+        """
+        Sends (topic, key, detail) messages to the other workers, batched into as few
+        payloads as fit the backend's size limit.
+        """
+        batch, size = [], 0
+        for message in messages:
+            encoded = json.dumps(list(message), separators=(",", ":"))
+            if batch and size + len(encoded) > MAX_PAYLOAD_BYTES:
+                self._send(batch)
+                batch, size = [], 0
+            batch.append(encoded)
+            size += len(encoded) + 1
+        if batch:
+            self._send(batch)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._metrics, "origin": self.origin, "backend": self.backend.kind, **self.backend.metrics()}
+
+    def _send(self, encoded_messages: List[str]):
+        payload = '{"o":"%s","t":%r,"m":[%s]}' % (self.origin, time.time(), ",".join(encoded_messages))
+        with self._lock:
+            self._metrics["published"] += len(encoded_messages)
+        self.backend.publish(payload)
+
+    def _receive(self, payload: str):
+        try:
+            data = json.loads(payload)
+        except ValueError:
+            logger.warning("Ignoring malformed invalidation payload")
+            return
+        if data["o"] == self.origin:
+            with self._lock:
+                self._metrics["ignored_own"] += len(data["m"])
+            return
+
+        lag = max(0.0, time.time() - data["t"])
+        with self._lock:
+            self._metrics["received"] += len(data["m"])
+            self._metrics["lag_seconds_last"] = lag
+            self._metrics["lag_seconds_max"] = max(self._metrics["lag_seconds_max"], lag)
+            self._metrics["lag_seconds_total"] += lag
+        for topic, key, detail in data["m"]:
+            for handler in self._handlers.get(topic, ()):
+                try:
+                    handler(key, detail)
+                except Exception:
+                    with self._lock:
+                        self._metrics["handler_errors"] += 1
+                    logger.exception("Invalidation handler for %r failed", topic)
+
+    def _reset(self):
+        with self._lock:
+            self._metrics["resets"] += 1
+        for handler in self._reset_handlers:
+            handler()
+
+# Backend chosen from settings by the app.main lifespan.
+invalidation_bus = InvalidationBus()
@@ -1,57 +1,240 @@
-from fastapi import FastAPI, Depends, HTTPException, status, Header
+import datetime as dt
+from contextlib import asynccontextmanager
+from fastapi import APIRouter, FastAPI, Depends, HTTPException, Query, Response, status, Header
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from typing import List, Optional
 
 from . import services, models, schemas
-from .database import get_db
+from .availability import encode_bitmap, seat_map_cache
+from .config import get_settings
+from .database import get_db, get_read_db, get_write_engine
+from .rate_limit import RateLimitMiddleware, create_store
 from .routers import admin, waitlist
 from .dependencies import get_current_user
+from .identity import user_cache
+from .invalidation import create_backend, invalidation_bus
+from .tasks import task_executor
+from .tracing import SQLTraceMiddleware
+from .warmup import warm_up
 
-app = FastAPI(
-    title="Evently API",
-    description="Backend system for an event ticketing platform.",
-    version="1.0.0"
-)
+router = APIRouter()
 
-app.include_router(admin.router)
-app.include_router(waitlist.router)
+def create_app() -> FastAPI:
+    """
+    Builds the application from get_settings(), the same settings the engines and
+    sessions of app.database are created from. Nothing touches the database here; the
+    lifespan hook warms up the pool, compiled statements and caches before the first
+    request is served.
+    """
+    settings = get_settings()
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        if settings.INVALIDATION_BUS != "memory":
+            invalidation_bus.configure(create_backend(settings.INVALIDATION_BUS, get_write_engine(), settings.INVALIDATION_CHANNEL))
+        # Warm-up and shutdown block on connections and threads, so they run off the event loop.
+        if settings.WARMUP_ENABLED:
+            app.state.warmup = await run_in_threadpool(warm_up, settings)
+        yield
+        await run_in_threadpool(task_executor.drain, settings.TASK_DRAIN_TIMEOUT_SECONDS)
+        await run_in_threadpool(invalidation_bus.stop)
+
+    app = FastAPI(
+        title="Evently API",
+        description="Backend system for an event ticketing platform.",
+        version="1.0.0",
+        lifespan=lifespan
+    )
+    app.state.settings = settings
+    app.state.warmup = {}
+
+    user_cache.configure(maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS, negative_ttl=settings.USER_CACHE_NEGATIVE_TTL_SECONDS)
+    seat_map_cache.configure(maxsize=settings.SEAT_MAP_CACHE_SIZE, ttl=settings.SEAT_MAP_TTL_SECONDS)
+    task_executor.configure(
+        workers=settings.TASK_WORKERS,
+        max_queue=settings.TASK_QUEUE_SIZE,
+        submit_timeout=settings.TASK_SUBMIT_TIMEOUT_SECONDS,
+        mode=settings.TASK_MODE
+    )
 
-@app.get("/")
+    if settings.SQL_TRACE_ENABLED:
+        # Added before rate limiting, so requests rejected with 429 are not traced.
+        app.add_middleware(
+            SQLTraceMiddleware,
+            slow_request_ms=settings.SLOW_REQUEST_MS,
+            slow_statement_ms=settings.SLOW_STATEMENT_MS,
+            expose_header=settings.SQL_TRACE_HEADER
+        )
+    app.state.rate_limit_store = create_store(settings.RATE_LIMIT_STORE, settings.RATE_LIMIT_REDIS_URL)
+    if settings.RATE_LIMIT_ENABLED:
+        app.add_middleware(RateLimitMiddleware, store=app.state.rate_limit_store, ip_factor=settings.RATE_LIMIT_IP_FACTOR)
+
+    app.include_router(router)
+    app.include_router(admin.router)
+    app.include_router(waitlist.router)
+    return app
+
+def __getattr__(name):
+    # `app.main:app` keeps working for uvicorn and tests, but the app is only built when asked for.
+    if name == "app":
+        globals()["app"] = create_app()
+        return globals()["app"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+@router.get("/")
 def read_root():
     return {"message": "Welcome to the Evently API"}
 
-@app.get("/events", response_model=List[schemas.Event])
-def list_events(db: Session = Depends(get_db)):
+@router.get("/events", response_model=List[schemas.EventSummary])
+def list_events(
+    response: Response,
+    start_from: Optional[dt.datetime] = None,
+    start_to: Optional[dt.datetime] = None,
+    end_from: Optional[dt.datetime] = None,
+    end_to: Optional[dt.datetime] = None,
+    venue: Optional[str] = None,
+    q: Optional[str] = Query(None, max_length=100),
+    available: Optional[bool] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_read_db)
+):
     """
-    Get a list of all available events.
+    Get events ordered by start time, without their seats. Filter by a `start_from`/`start_to`
+    and `end_from`/`end_to` window, exact `venue`, a name substring `q` and `available`
+    (whether any seat is free). When more events exist, the `X-Next-Cursor` response header
+    holds the `cursor` for the next page.
     """
-    return services.get_events(db=db)
+    events, next_cursor = services.get_events(
+        db=db,
+        start_from=start_from,
+        start_to=start_to,
+        end_from=end_from,
+        end_to=end_to,
+        venue=venue,
+        name=q,
+        available=available,
+        cursor=cursor,
+        limit=limit
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return events
 
-@app.get("/users/me/bookings", response_model=List[schemas.BookingDetails])
-def list_my_bookings(db: Session = Depends(get_db), current_user_id: int = Depends(get_current_user)):
+@router.get("/events/{event_id}/availability", response_model=schemas.SeatAvailability)
+def get_event_availability(
+    event_id: int,
+    response_format: str = Query("json", alias="format", pattern="^(json|binary)$"),
+    db: Session = Depends(get_read_db)
+):
     """
-    Get the booking history for the current user.
+    Get seat availability as a bitset indexed by seat ordinal, most significant bit first;
+    a set bit is a free seat. `version` identifies the seat manifest the ordinals refer to.
+    `format=binary` returns the raw bitset with the version in `X-Seat-Map-Version`.
     """
-    return services.get_user_bookings(db=db, user_id=current_user_id)
+    snapshot = seat_map_cache.snapshot(db, event_id)
+    if snapshot is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found")
+    seat_map, bitmap, available = snapshot
+    if response_format == "binary":
+        return Response(content=bitmap, media_type="application/octet-stream", headers={
+            "X-Seat-Map-Version": seat_map.version,
+            "X-Seat-Count": str(seat_map.seat_count),
+        })
+    return schemas.SeatAvailability(
+        event_id=event_id,
+        version=seat_map.version,
+        seat_count=seat_map.seat_count,
+        available=available,
+        bitmap=encode_bitmap(bitmap)
+    )
 
-@app.post("/bookings", response_model=schemas.Booking, status_code=status.HTTP_201_CREATED)
-def book_ticket(booking: schemas.BookingCreate, db: Session = Depends(get_db)):
+@router.get("/events/{event_id}/seats/manifest", response_model=schemas.SeatManifest)
+def get_event_seat_manifest(
+    event_id: int,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_read_db)
+):
     """
-    Book a ticket for an event. The user ID in the request body
-    is used to create the booking.
+    Get the seat ordinal -> seat_number list for an event. The response carries the
+    version as its ETag, so clients revalidate with If-None-Match and get 304 while
+    the seats are unchanged.
     """
+    seat_map = seat_map_cache.get(db, event_id)
+    if seat_map is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found")
+    etag = f'"{seat_map.version}"'
+    if if_none_match == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return Response(content=seat_map.manifest, media_type="application/json", headers={"ETag": etag})
+
+@router.get("/users/me/bookings", response_model=List[schemas.BookingDetails])
+def list_my_bookings(
+    response: Response,
+    booking_status: str = Query("active", alias="status", pattern="^(active|cancelled|all)$"),
+    created_from: Optional[dt.datetime] = None,
+    created_to: Optional[dt.datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_read_db),
+    current_user_id: int = Depends(get_current_user)
+):
+    """
+    Get the booking history for the current user, newest first.
+    Filter by `status` (active, cancelled or all) and a `created_from`/`created_to` window.
+    When more bookings exist, the `X-Next-Cursor` response header holds the `cursor` for the next page.
+    Bookings of finished events and cancellations older than 30 days are archived and not listed.
+    """
+    bookings, next_cursor = services.get_user_bookings(
+        db=db,
+        user_id=current_user_id,
+        booking_status=None if booking_status == "all" else booking_status,
+        created_from=created_from,
+        created_to=created_to,
+        cursor=cursor,
+        limit=limit
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return bookings
+
+@router.post("/bookings", response_model=schemas.Booking, status_code=status.HTTP_201_CREATED)
+def book_ticket(booking: schemas.BookingCreate, db: Session = Depends(get_db), current_user_id: int = Depends(get_current_user)):
+    """
+    Book a ticket for an event. The user ID in the request body must match X-User-ID.
+    """
+    if current_user_id != booking.user_id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Cannot book on behalf of another user")
     return services.create_booking(db=db, booking=booking)
 
-@app.delete("/bookings/{booking_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_booking(booking_id: int, db: Session = Depends(get_db), current_user_id: int = Depends(get_current_user)):
+@router.post("/bookings/group", response_model=List[schemas.Booking], status_code=status.HTTP_201_CREATED)
+def book_group(booking: schemas.GroupBookingCreate, db: Session = Depends(get_db), current_user_id: int = Depends(get_current_user)):
+    """
+    Book `quantity` adjacent seats (same row, consecutive positions) for a group.
+    The smallest free block that fits is chosen, keeping longer blocks for larger groups.
+    The user ID in the request body must match X-User-ID.
+    """
+    if current_user_id != booking.user_id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Cannot book on behalf of another user")
+    return services.create_group_booking(db=db, booking=booking)
+
+@router.delete("/bookings/{booking_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_booking(
+    booking_id: int,
+    event_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user_id: int = Depends(get_current_user)
+):
     """
     Cancel a booking. A user can only cancel their own bookings.
+    Passing the booking's `event_id` lets the lookup touch only that event's partition.
     """
-    services.cancel_booking(db=db, booking_id=booking_id, user_id=current_user_id)
+    services.cancel_booking(db=db, booking_id=booking_id, user_id=current_user_id, event_id=event_id)
     return None
 
-@app.get("/users/me/notifications", response_model=List[schemas.Notification])
-def list_my_notifications(db: Session = Depends(get_db), current_user_id: int = Depends(get_current_user)):
+@router.get("/users/me/notifications", response_model=List[schemas.Notification])
+def list_my_notifications(db: Session = Depends(get_read_db), current_user_id: int = Depends(get_current_user)):
     """
     Get all notifications for the current user.
     """
@@ -7,6 +7,8 @@ from sqlalchemy import (
     DateTime,
     ForeignKey,
     Boolean,
+    Index,
+    false,
 )
 from sqlalchemy.orm import relationship, declarative_base
 
@@ -24,12 +26,19 @@ class User(Base):
 
 
 class Event(Base):
+    # On PostgreSQL name also has a pg_trgm GIN index (ix_events_name_trgm, see migration
+    # e7b4a2c9d1f3) for substring search; SQLite searches it with a plain LIKE.
     __tablename__ = "events"
+    __table_args__ = (
+        Index("ix_events_venue_start_time", "venue", "start_time"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     venue = Column(String, nullable=False)
-    start_time = Column(DateTime, nullable=False)
+    start_time = Column(DateTime, nullable=False, index=True)
     end_time = Column(DateTime, nullable=False)
+    # Set by services.cancel_event; cancelled events take no new bookings.
+    is_cancelled = Column(Boolean, nullable=False, default=False, server_default=false())
 
     seats = relationship("Seat", back_populates="event", cascade="all, delete-orphan")
     bookings = relationship("Booking", back_populates="event", cascade="all, delete-orphan")
@@ -38,15 +47,28 @@ class Event(Base):
 class Seat(Base):
     __tablename__ = "seats"
     id = Column(Integer, primary_key=True, index=True)
-    event_id = Column(Integer, ForeignKey("events.id"), nullable=False)
+    event_id = Column(Integer, ForeignKey("events.id"), nullable=False, index=True)
     seat_number = Column(String, nullable=False)
+    # Layout: 1-based row and position within the row. Null for seats created without one.
+    row_number = Column(Integer, nullable=True)
+    position = Column(Integer, nullable=True)
+    # Bumped whenever the seat is claimed, for the optimistic booking strategy.
+    version = Column(Integer, nullable=False, default=0, server_default="0")
 
     event = relationship("Event", back_populates="seats")
     bookings = relationship("Booking", back_populates="seat")
 
 
 class Booking(Base):
+    # On PostgreSQL the table is hash-partitioned by event_id (see migration a3f1c9d2e4b7),
+    # with PRIMARY KEY (id, event_id). The mapper uses the same key, so the UPDATEs and
+    # DELETEs it flushes carry event_id and touch a single partition. Ids still come from
+    # one sequence; SQLite keeps the plain table keyed by id.
     __tablename__ = "bookings"
+    __table_args__ = (
+        Index("ix_bookings_event_id_status", "event_id", "status"),
+        Index("ix_bookings_user_id_status_created_at", "user_id", "status", "created_at"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     event_id = Column(Integer, ForeignKey("events.id"), nullable=False)
@@ -54,6 +76,8 @@ class Booking(Base):
     status = Column(String, default="active", nullable=False) 
     created_at = Column(DateTime, default=dt.datetime.utcnow)
 
+    __mapper_args__ = {"primary_key": [id, event_id]}
+
     user = relationship("User", back_populates="bookings")
     event = relationship("Event", back_populates="bookings")
     seat = relationship("Seat", back_populates="bookings")
@@ -66,6 +90,12 @@ class WaitlistEntry(Base):
     event_id = Column(Integer, ForeignKey("events.id"), nullable=False)
     created_at = Column(DateTime, default=dt.datetime.utcnow)
 
+    __table_args__ = (
+        # Queue order of an event's waitlist; positions are ranks over this index.
+        Index("ix_waitlist_entries_event_id_created_at_id", "event_id", "created_at", "id"),
+        Index("uq_waitlist_entries_user_id_event_id", "user_id", "event_id", unique=True),
+    )
+
     user = relationship("User")
     event = relationship("Event")
 
@@ -77,5 +107,58 @@ class Notification(Base):
     message = Column(String, nullable=False)
     is_read = Column(Boolean, default=False, nullable=False)
     created_at = Column(DateTime, default=dt.datetime.utcnow)
+    # What the notification is about, for notices that must not be sent twice. No foreign
+    # key: events are deleted and archived while their notifications are kept.
+    event_id = Column(Integer, nullable=True)
+    kind = Column(String, nullable=True)
+
+    __table_args__ = (
+        Index("ix_notifications_event_id_kind_user_id", "event_id", "kind", "user_id"),
+    )
 
     user = relationship("User")
+
+
+# Cold storage for finished events and old cancelled bookings, filled by app.archival.
+# The archive tables mirror the hot ones without foreign keys so rows can be moved in any order.
+
+class ArchivedEvent(Base):
+    __tablename__ = "events_archive"
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)
+    venue = Column(String, nullable=False)
+    start_time = Column(DateTime, nullable=False)
+    end_time = Column(DateTime, nullable=False)
+    is_cancelled = Column(Boolean, nullable=False, default=False, server_default=false())
+    archived_at = Column(DateTime, default=dt.datetime.utcnow, nullable=False)
+
+
+class ArchivedSeat(Base):
+    __tablename__ = "seats_archive"
+    id = Column(Integer, primary_key=True)
+    event_id = Column(Integer, nullable=False, index=True)
+    seat_number = Column(String, nullable=False)
+    row_number = Column(Integer, nullable=True)
+    position = Column(Integer, nullable=True)
+    version = Column(Integer, nullable=False, default=0, server_default="0")
+    archived_at = Column(DateTime, default=dt.datetime.utcnow, nullable=False)
+
+
+class ArchivedBooking(Base):
+    __tablename__ = "bookings_archive"
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False, index=True)
+    event_id = Column(Integer, nullable=False, index=True)
+    seat_id = Column(Integer, nullable=False)
+    status = Column(String, nullable=False)
+    created_at = Column(DateTime)
+    archived_at = Column(DateTime, default=dt.datetime.utcnow, nullable=False)
+
+
+class ArchivedWaitlistEntry(Base):
+    __tablename__ = "waitlist_entries_archive"
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False)
+    event_id = Column(Integer, nullable=False, index=True)
+    created_at = Column(DateTime)
+    archived_at = Column(DateTime, default=dt.datetime.utcnow, nullable=False)
@@ -0,0 +1,192 @@
+import json
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class RateLimit:
+    """
+    Token bucket parameters: `rate` tokens are added per second, up to `burst` tokens.
+    """
+    rate: float
+    burst: int
+
+# Default for RATE_LIMIT_IP_FACTOR: clients sharing an address (NAT, proxies) get this
+# many times a route's limit in total.
+IP_LIMIT_FACTOR = 10
+
+# Limits per (method, path). Only exact paths are matched, so the lookup is a single dict access.
+ROUTE_LIMITS: Dict[Tuple[str, str], RateLimit] = {
+    ("POST", "/bookings"): RateLimit(rate=2, burst=10),
+    ("POST", "/bookings/group"): RateLimit(rate=1, burst=5),
+    ("GET", "/users/me/notifications"): RateLimit(rate=1, burst=10),
+    ("GET", "/users/me/bookings"): RateLimit(rate=2, burst=20),
+    ("GET", "/events"): RateLimit(rate=5, burst=20),
+}
+
+class InMemoryBucketStore:
+    """
+    Per-process bucket store. Limits are enforced per worker, so with N workers a client
+    can get up to N times the configured rate; use RedisBucketStore to share buckets.
+    Buckets are kept in LRU order and the least recently used one is dropped once there
+    are `max_keys`, so a flood of new keys costs O(1) per request.
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, limit: RateLimit, now: Optional[float] = None) -> float:
+        """
+        Takes one token from the bucket. Returns 0 when the request is allowed, otherwise
+        the number of seconds until a token becomes available.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (limit.burst, now))
+            tokens = min(limit.burst, tokens + (now - updated) * limit.rate)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                wait = 0.0
+            else:
+                self._buckets[key] = (tokens, now)
+                wait = (1 - tokens) / limit.rate
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return wait
+
+    async def atake(self, key: str, limit: RateLimit) -> float:
+        return self.take(key, limit)
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+_REDIS_TAKE = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(bucket[1]) or burst
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + (now - updated) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(wait)
+"""
+
+class RedisBucketStore:
+    """
+    Bucket store shared by all workers. Each check is one round trip running an atomic
+    Lua script on the asyncio client, so waiting on Redis never blocks the event loop;
+    the redis server clock is used so workers agree on elapsed time. Redis errors and
+    timeouts (`timeout` seconds) fail open: the request is allowed and a warning logged,
+    so an unavailable Redis degrades rate limiting instead of the API.
+    """
+
+    def __init__(self, url: str, prefix: str = "ratelimit:", timeout: float = 0.1):
+        try:
+            import redis
+            import redis.asyncio
+        except ImportError as exc:
+            raise RuntimeError("RATE_LIMIT_STORE=redis requires the 'redis' package") from exc
+        self.prefix = prefix
+        self._error = redis.RedisError
+        self._client = redis.asyncio.Redis.from_url(url, socket_timeout=timeout, socket_connect_timeout=timeout)
+        self._take = self._client.register_script(_REDIS_TAKE)
+        self._url = url
+
+    async def atake(self, key: str, limit: RateLimit) -> float:
+        try:
+            return float(await self._take(keys=[self.prefix + key], args=[limit.rate, limit.burst]))
+        except (self._error, OSError):
+            logger.warning("Rate limit store unavailable, allowing the request", exc_info=True)
+            return 0.0
+
+    def clear(self):
+        import redis
+
+        client = redis.Redis.from_url(self._url)
+        for key in client.scan_iter(f"{self.prefix}*"):
+            client.delete(key)
+
+def create_store(kind: str, redis_url: Optional[str] = None):
+    if kind == "memory":
+        return InMemoryBucketStore()
+    if kind == "redis":
+        if not redis_url:
+            raise RuntimeError("RATE_LIMIT_STORE=redis requires RATE_LIMIT_REDIS_URL")
+        return RedisBucketStore(redis_url)
+    raise ValueError(f"Unknown rate limit store: {kind}")
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware applying ROUTE_LIMITS before the request reaches FastAPI, so a rejected
+    request never resolves dependencies or opens a database session. X-User-ID is not
+    verified at this point, so every request takes a token from two buckets: one for the
+    user id, whatever address it comes from, and one for the address alone with
+    `ip_factor` times the route limit. Spreading requests over addresses does not raise a
+    user's limit, and rotating the header cannot get around the per-address limit.
+    """
+
+    def __init__(self, app, store, limits: Dict[Tuple[str, str], RateLimit] = ROUTE_LIMITS, ip_factor: float = IP_LIMIT_FACTOR):
+        self.app = app
+        self.store = store
+        self.limits = limits
+        self.ip_limits = {
+            route: RateLimit(rate=limit.rate * ip_factor, burst=int(limit.burst * ip_factor))
+            for route, limit in limits.items()
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            route = (scope["method"], scope["path"])
+            limit = self.limits.get(route)
+            if limit is not None:
+                prefix = f"{scope['method']} {scope['path']}:"
+                address, user_id = self._client_keys(scope)
+                wait = await self.store.atake(f"{prefix}ip:{address}", self.ip_limits[route])
+                if user_id is not None:
+                    wait = max(wait, await self.store.atake(f"{prefix}user:{user_id}", limit))
+                if wait > 0:
+                    await self._reject(send, wait)
+                    return
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    def _client_keys(scope) -> Tuple[str, Optional[str]]:
+        client = scope.get("client")
+        address = client[0] if client else "unknown"
+        for name, value in scope["headers"]:
+            if name == b"x-user-id":
+                return address, value.decode("latin-1")
+        return address, None
+
+    @staticmethod
+    async def _reject(send, wait: float):
+        body = json.dumps({"detail": "Too many requests"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(math.ceil(wait)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
 from sqlalchemy.orm import Session
 from typing import List, Optional, Any
 
 from app import services, schemas
-from app.database import get_db
+from app.bulk_import import EventImporter
+from app.identity import user_cache
+from app.invalidation import invalidation_bus
+from app.tasks import task_executor
+from app.database import get_db, get_read_db
 
 router = APIRouter(
     prefix="/admin",
@@ -11,13 +15,14 @@ router = APIRouter(
     responses={403: {"description": "Admin privileges required"}},
 )
 
-def get_admin_user(x_user_role: Optional[str] = Header(None)):
-    if x_user_role != "admin":
+def get_admin_user(x_user_id: Optional[int] = Header(None), db: Session = Depends(get_read_db)):
+    user = user_cache.get(db, x_user_id) if x_user_id is not None else None
+    if user is None or user.role != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Admin privileges required"
         )
-    return x_user_role
+    return user.id
 
 @router.post("/events", response_model=schemas.Event, status_code=status.HTTP_201_CREATED, dependencies=[Depends(get_admin_user)])
 def create_new_event(event: schemas.EventCreate, db: Session = Depends(get_db)):
@@ -26,6 +31,21 @@ def create_new_event(event: schemas.EventCreate, db: Session = Depends(get_db)):
     """
     return services.create_event(db=db, event=event)
 
+@router.post("/events/import", response_model=schemas.EventImportReport, dependencies=[Depends(get_admin_user)])
+async def import_events(
+    request: Request,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    chunk_size: int = Query(500, ge=1, le=5000),
+    db: Session = Depends(get_db)
+):
+    """
+    Bulk import events from the request body, streamed as NDJSON (one record per line) or CSV.
+    Each record has name, venue, start_time, end_time and either total_seats or seat_numbers
+    (a list in NDJSON, `;`-separated in CSV), and optionally seats_per_row. Invalid rows are reported without aborting the import. (Admin only)
+    """
+    importer = EventImporter(db, fmt=format, chunk_size=chunk_size)
+    return await importer.aimport_stream(request.stream())
+
 @router.put("/events/{event_id}", response_model=schemas.Event, dependencies=[Depends(get_admin_user)])
 def update_existing_event(event_id: int, event_update: schemas.EventCreate, db: Session = Depends(get_db)):
     """
@@ -41,9 +61,36 @@ def delete_existing_event(event_id: int, db: Session = Depends(get_db)):
     services.delete_event(db=db, event_id=event_id)
     return None
 
+@router.post("/events/{event_id}/cancel", response_model=schemas.EventCancellationReport, dependencies=[Depends(get_admin_user)])
+def cancel_existing_event(event_id: int, chunk_size: int = Query(5000, ge=1, le=50000), db: Session = Depends(get_db)):
+    """
+    Cancel an event: it takes no new bookings, every active booking is cancelled, the
+    waitlist is cleared and each affected user is notified once. Bookings are processed
+    in chunks of `chunk_size`, one transaction per chunk. (Admin only)
+    """
+    return services.cancel_event(db=db, event_id=event_id, chunk_size=chunk_size)
+
 @router.get("/analytics", response_model=dict, dependencies=[Depends(get_admin_user)])
-def get_system_analytics(db: Session = Depends(get_db)):
+def get_system_analytics(include_archived: bool = False, db: Session = Depends(get_read_db)):
+    """
+    Get booking analytics, such as total bookings and capacity utilization.
+    Pass `include_archived=true` to include archived events and bookings. (Admin only)
+    """
+    return services.get_analytics(db=db, include_archived=include_archived)
+
+@router.get("/tasks", response_model=dict, dependencies=[Depends(get_admin_user)])
+def get_task_metrics():
+    """
+    Get post-commit task executor metrics: queue depth, running, completed and failed
+    tasks, tasks run inline under backpressure, and total queue wait and run time. (Admin only)
+    """
+    return task_executor.metrics()
+
+@router.get("/invalidation", response_model=dict, dependencies=[Depends(get_admin_user)])
+def get_invalidation_metrics():
     """
-    Get booking analytics, such as total bookings and capacity utilization. (Admin only)
+    Get cache invalidation bus metrics: messages published and received by this worker,
+    delivery lag (last, max and total seconds), cache resets and backend connection
+    state. (Admin only)
     """
-    return services.get_analytics(db=db)
+    return invalidation_bus.metrics()
@@ -3,7 +3,7 @@ from sqlalchemy.orm import Session
 from typing import List
 
 from app import services, schemas
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.dependencies import get_current_user
 
 router = APIRouter(
@@ -11,10 +11,10 @@ router = APIRouter(
     tags=["Waitlist"],
 )
 
-@router.get("/me", response_model=List[schemas.WaitlistEntry])
-def list_my_waitlist_entries(db: Session = Depends(get_db), current_user_id: int = Depends(get_current_user)):
+@router.get("/me", response_model=List[schemas.WaitlistPosition])
+def list_my_waitlist_entries(db: Session = Depends(get_read_db), current_user_id: int = Depends(get_current_user)):
     """
-    Get all waitlist entries for the current user.
+    Get all waitlist entries for the current user, with their position in each waitlist.
     """
     return services.get_user_waitlist_entries(db=db, user_id=current_user_id)
 
@@ -1,5 +1,5 @@
 import datetime as dt
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 from typing import List, Optional
 
 class SeatBase(BaseModel):
@@ -25,12 +25,29 @@ class UserCreate(UserBase):
 
 class EventCreate(EventBase):
     total_seats: int
+    seats_per_row: Optional[int] = Field(None, ge=1)
+
+class EventImportRow(EventBase):
+    total_seats: Optional[int] = Field(None, ge=0)
+    seat_numbers: Optional[List[str]] = None
+    seats_per_row: Optional[int] = Field(None, ge=1)
+
+    @model_validator(mode="after")
+    def check_seats(self):
+        if (self.total_seats is None) == (self.seat_numbers is None):
+            raise ValueError("exactly one of total_seats or seat_numbers is required")
+        return self
 
 class BookingCreate(BookingBase):
     seat_number: Optional[str] = None
 
+class GroupBookingCreate(BookingBase):
+    quantity: int = Field(..., ge=1, le=20)
+
 class Seat(SeatBase):
     id: int
+    row_number: Optional[int] = None
+    position: Optional[int] = None
     model_config = ConfigDict(from_attributes=True)
 
 class User(UserBase):
@@ -38,11 +55,14 @@ class User(UserBase):
     role: str
     model_config = ConfigDict(from_attributes=True)
 
-class Event(EventBase):
+class EventSummary(EventBase):
     id: int
-    seats: List[Seat] = []
+    is_cancelled: bool = False
     model_config = ConfigDict(from_attributes=True)
 
+class Event(EventSummary):
+    seats: List[Seat] = []
+
 class Booking(BaseModel):
     id: int
     user_id: int
@@ -64,6 +84,10 @@ class WaitlistEntry(BaseModel):
     created_at: dt.datetime
     model_config = ConfigDict(from_attributes=True)
 
+class WaitlistPosition(WaitlistEntry):
+    position: int
+    waitlist_length: int
+
 class Notification(BaseModel):
     id: int
     user_id: int
@@ -71,3 +95,30 @@ class Notification(BaseModel):
     is_read: bool
     created_at: dt.datetime
     model_config = ConfigDict(from_attributes=True)
+
+class ImportRowError(BaseModel):
+    line: int
+    error: str
+
+class EventImportReport(BaseModel):
+    imported: int
+    failed: int
+    errors: List[ImportRowError] = []
+
+class EventCancellationReport(BaseModel):
+    event_id: int
+    cancelled_bookings: int
+    removed_waitlist_entries: int
+    notified_users: int
+
+class SeatAvailability(BaseModel):
+    event_id: int
+    version: str
+    seat_count: int
+    available: int
+    bitmap: str
+
+class SeatManifest(BaseModel):
+    event_id: int
+    version: str
+    seat_numbers: List[str]
@@ -1,13 +1,77 @@
-from sqlalchemy.orm import Session, joinedload, subqueryload
-from sqlalchemy import func, cast, Date
-from . import models, schemas
+import base64
+import datetime as dt
+import random
+import time
+from typing import List, Optional, Tuple
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, aliased, selectinload
+from sqlalchemy import and_, func, cast, case, delete, insert, literal, select, tuple_, union_all, update, Date, Integer
+from . import archival, models, schemas
+from .availability import mark_seats_changed, seat_map_cache
+from .config import get_settings
+from .database import pin_users_after_commit
+from .tasks import after_commit
 from fastapi import HTTPException, status
 
-def get_events(db: Session):
+# Notification.kind of the notice sent to everyone affected by an event cancellation.
+EVENT_CANCELLED_NOTICE = "event_cancelled"
+
+def get_events(
+    db: Session,
+    start_from: Optional[dt.datetime] = None,
+    start_to: Optional[dt.datetime] = None,
+    end_from: Optional[dt.datetime] = None,
+    end_to: Optional[dt.datetime] = None,
+    venue: Optional[str] = None,
+    name: Optional[str] = None,
+    available: Optional[bool] = None,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+):
     """
-    Retrieves a list of all events, including their seats.
+    Retrieves one page of events, ordered by start time, without their seats. Filters on a
+    start/end time window, exact venue, a case-insensitive name substring and whether any
+    seat is free. Pages are keyed on (start_time, id).
+    Returns the events and the cursor for the next page, or None on the last page.
     """
-    return db.query(models.Event).options(subqueryload(models.Event.seats)).all()
+    query = db.query(models.Event)
+
+    if start_from is not None:
+        query = query.filter(models.Event.start_time >= start_from)
+    if start_to is not None:
+        query = query.filter(models.Event.start_time < start_to)
+    if end_from is not None:
+        query = query.filter(models.Event.end_time >= end_from)
+    if end_to is not None:
+        query = query.filter(models.Event.end_time < end_to)
+    if venue is not None:
+        query = query.filter(models.Event.venue == venue)
+    if name:
+        # ILIKE on PostgreSQL is served by the ix_events_name_trgm trigram index;
+        # SQLite falls back to lower(name) LIKE lower(:name).
+        pattern = name.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        query = query.filter(models.Event.name.ilike(f"%{pattern}%", escape="\\"))
+    if available is not None:
+        # Every active booking holds a distinct seat, so comparing the two counts (both
+        # index-only on event_id) tells whether a seat is free.
+        seat_count = select(func.count(models.Seat.id)).where(models.Seat.event_id == models.Event.id).scalar_subquery()
+        booked_count = select(func.count(models.Booking.id)).where(
+            models.Booking.event_id == models.Event.id,
+            models.Booking.status == 'active'
+        ).scalar_subquery()
+        query = query.filter(
+            and_(~models.Event.is_cancelled, seat_count > booked_count) if available
+            else models.Event.is_cancelled | (seat_count <= booked_count)
+        )
+    if cursor is not None:
+        query = query.filter(tuple_(models.Event.start_time, models.Event.id) > tuple_(*decode_cursor(cursor)))
+
+    events = query.order_by(models.Event.start_time, models.Event.id).limit(limit + 1).all()
+    next_cursor = None
+    if len(events) > limit:
+        events = events[:limit]
+        next_cursor = encode_cursor(events[-1].start_time, events[-1].id)
+    return events, next_cursor
 
 def create_event(db: Session, event: schemas.EventCreate):
     """
@@ -22,106 +86,330 @@ def create_event(db: Session, event: schemas.EventCreate):
     db.add(db_event)
     db.flush()
 
-    seats = [models.Seat(event_id=db_event.id, seat_number=f"Seat-{i+1}") for i in range(event.total_seats)]
+    seats = [
+        models.Seat(event_id=db_event.id, seat_number=f"Seat-{i+1}", **seat_layout(i, event.seats_per_row))
+        for i in range(event.total_seats)
+    ]
     db.add_all(seats)
 
     db.commit()
     db.refresh(db_event)
     return db_event
 
-def create_booking(db: Session, booking: schemas.BookingCreate):
+def seat_layout(index: int, seats_per_row: Optional[int]) -> dict:
+    """
+    Row and position of the `index`-th seat (0-based) when rows hold `seats_per_row` seats.
+    """
+    if not seats_per_row:
+        return {"row_number": None, "position": None}
+    return {"row_number": index // seats_per_row + 1, "position": index % seats_per_row + 1}
+
+def create_booking(db: Session, booking: schemas.BookingCreate, strategy: Optional[str] = None):
     """
     Creates a booking for a user for an event. If a seat_number is provided,
     it books that specific seat. If not, it attempts to find any available seat.
     If the event is full, it adds the user to the waitlist.
+
+    `strategy` (default: the BOOKING_STRATEGY setting) chooses how concurrent bookings
+    of the same seat are serialized: "pessimistic" locks the seat row for the whole
+    transaction, "optimistic" claims it with a conditional version update and retries
+    on conflict.
+    """
+    settings = get_settings()
+    if (strategy or settings.BOOKING_STRATEGY) == "optimistic":
+        return _create_booking_optimistic(db, booking, settings.BOOKING_MAX_RETRIES)
+
+    _check_event_not_cancelled(db, booking.event_id)
+    lock = db.bind.dialect.name == 'postgresql'
+    for _ in range(settings.BOOKING_MAX_RETRIES + 1):
+        seat_to_book = _find_seat(db, booking, lock=lock)
+        if booking.seat_number:
+            break
+        if lock:
+            # An auto-assigned seat was read without a lock; lock it before the final check.
+            db.refresh(seat_to_book, with_for_update=True)
+        if not _auto_assigned_seat_taken(db, booking, seat_to_book):
+            break
+    else:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Seat is in high demand, please try again")
+    _check_seat_is_free(db, booking, seat_to_book)
+    _claim_seat(db, seat_to_book)
+    return _insert_booking(db, booking, seat_to_book)
+
+def _auto_assigned_seat_taken(db: Session, booking: schemas.BookingCreate, seat: models.Seat) -> bool:
+    # Concurrent requests can be handed the same seat by the allocator, since the seat map
+    # only changes on commit. The user did not ask for that seat, so rather than failing
+    # with "Seat is already booked", mark it taken locally and let the caller allocate again.
+    if not _active_booking_seat_ids(db, booking.event_id, [seat.id]):
+        return False
+    seat_map_cache.apply(booking.event_id, seat.id, False)
+    return True
+
+def _create_booking_optimistic(db: Session, booking: schemas.BookingCreate, max_retries: int):
+    _check_event_not_cancelled(db, booking.event_id)
+    for attempt in range(max_retries + 1):
+        seat_to_book = _find_seat(db, booking, lock=False)
+        if booking.seat_number:
+            _check_seat_is_free(db, booking, seat_to_book)
+        if (booking.seat_number or not _auto_assigned_seat_taken(db, booking, seat_to_book)) and _claim_seat(
+            db, seat_to_book, expected_version=seat_to_book.version
+        ):
+            return _insert_booking(db, booking, seat_to_book)
+
+        # Another request claimed the seat after it was read: start over on fresh data,
+        # which either finds it booked or picks another free seat.
+        db.rollback()
+        if attempt < max_retries:
+            time.sleep(random.uniform(0, 0.002 * 2 ** attempt))
+    raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Seat is in high demand, please try again")
+
+def _check_event_not_cancelled(db: Session, event_id: int):
     """
+    Rejects bookings of an event already known to be cancelled, before a seat is looked
+    for or a waitlist entry added. The row is not locked: the booking INSERT checks the
+    flag again (see _insert_bookings) and cancel_event sweeps once more after it.
+    """
+    if db.scalar(select(models.Event.is_cancelled).where(models.Event.id == event_id)):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Event has been cancelled")
+
+def _find_seat(db: Session, booking: schemas.BookingCreate, lock: bool) -> models.Seat:
     seat_to_book = None
     if booking.seat_number:
         query = db.query(models.Seat).filter(
             models.Seat.event_id == booking.event_id,
             models.Seat.seat_number == booking.seat_number
         )
-        if db.bind.dialect.name == 'postgresql':
+        if lock:
             query = query.with_for_update()
         seat_to_book = query.first()
 
         if not seat_to_book:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Seat not found for this event")
     else:
-        all_seats = db.query(models.Seat).filter(models.Seat.event_id == booking.event_id).all()
-        if not all_seats:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No seats found for this event")
-
-        booked_seat_ids = db.query(models.Booking.seat_id).filter(
-            models.Booking.event_id == booking.event_id,
-            models.Booking.status == 'active'
-        ).all()
-        booked_seat_ids = {seat_id for (seat_id,) in booked_seat_ids}
-
-        seat_to_book = next((seat for seat in all_seats if seat.id not in booked_seat_ids), None)
+        seat_to_book = _allocated_seat(db, booking.event_id) or _first_free_seat(db, booking.event_id)
 
     if not seat_to_book:
-        waitlist_entry = db.query(models.WaitlistEntry).filter(
-            models.WaitlistEntry.user_id == booking.user_id,
-            models.WaitlistEntry.event_id == booking.event_id
-        ).first()
-
-        if waitlist_entry:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="You are already on the waitlist for this event.")
-
+        # The unique index on (user_id, event_id) rejects a second entry, including one
+        # added by a concurrent request.
         new_waitlist_entry = models.WaitlistEntry(user_id=booking.user_id, event_id=booking.event_id)
         db.add(new_waitlist_entry)
-        db.commit()
-        db.refresh(new_waitlist_entry)
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="You are already on the waitlist for this event.")
         raise HTTPException(status_code=status.HTTP_202_ACCEPTED, detail="Event is full. You have been added to the waitlist.")
+    return seat_to_book
+
+def _allocated_seat(db: Session, event_id: int) -> Optional[models.Seat]:
+    # Ask the allocator first: it answers from the cached seat map without loading every
+    # seat. It may be stale, so a seat that turns out to be booked falls back to the scan.
+    seat_ids = seat_map_cache.find_block(db, event_id, 1)
+    if not seat_ids:
+        return None
+    seat = db.query(models.Seat).filter(models.Seat.id == seat_ids[0], models.Seat.event_id == event_id).first()
+    if seat is None or _active_booking_seat_ids(db, event_id, [seat.id]):
+        return None
+    return seat
+
+def _first_free_seat(db: Session, event_id: int) -> Optional[models.Seat]:
+    all_seats = db.query(models.Seat).filter(models.Seat.event_id == event_id).all()
+    if not all_seats:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No seats found for this event")
+
+    booked_seat_ids = db.query(models.Booking.seat_id).filter(
+        models.Booking.event_id == event_id,
+        models.Booking.status == 'active'
+    ).all()
+    booked_seat_ids = {seat_id for (seat_id,) in booked_seat_ids}
+
+    return next((seat for seat in all_seats if seat.id not in booked_seat_ids), None)
+
+def _active_booking_seat_ids(db: Session, event_id: int, seat_ids: List[int]) -> List[int]:
+    return db.scalars(select(models.Booking.seat_id).where(
+        models.Booking.event_id == event_id,
+        models.Booking.seat_id.in_(seat_ids),
+        models.Booking.status == 'active'
+    )).all()
 
+def _check_seat_is_free(db: Session, booking: schemas.BookingCreate, seat: models.Seat):
     existing_booking = db.query(models.Booking).filter(
-        models.Booking.seat_id == seat_to_book.id,
+        models.Booking.event_id == booking.event_id,
+        models.Booking.seat_id == seat.id,
         models.Booking.status == 'active'
     ).first()
 
     if existing_booking:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Seat is already booked")
 
-    db_booking = models.Booking(
-        user_id=booking.user_id,
-        event_id=booking.event_id,
-        seat_id=seat_to_book.id
-    )
-    db.add(db_booking)
+def _claim_seat(db: Session, seat: models.Seat, expected_version: Optional[int] = None) -> bool:
+    """
+    Bumps the seat's version, only if it still equals `expected_version` when one is given.
+    Both strategies bump it, so they stay safe to mix during a switch-over.
+    """
+    query = update(models.Seat).where(models.Seat.id == seat.id)
+    if expected_version is not None:
+        query = query.where(models.Seat.version == expected_version)
+    result = db.execute(query.values(version=models.Seat.version + 1).execution_options(synchronize_session=False))
+    return result.rowcount == 1
+
+def _insert_booking(db: Session, booking: schemas.BookingCreate, seat: models.Seat) -> models.Booking:
+    return _insert_bookings(db, booking.user_id, booking.event_id, [seat])[0]
+
+def _insert_bookings(db: Session, user_id: int, event_id: int, seats: List[models.Seat]) -> List[models.Booking]:
+    """
+    Inserts one active booking per seat and commits, unless the event has been cancelled.
+    The flag is checked by the INSERT ... SELECT itself rather than under a lock on the
+    event row, so bookings of a popular event do not queue on it; a booking that commits
+    just after cancel_event set the flag is caught by its final sweep.
+    """
+    bookings, events = models.Booking.__table__, models.Event.__table__
+    not_cancelled = select(events.c.id).where(events.c.id == event_id, events.c.is_cancelled.is_(False)).exists()
+    seat_ids = [seat.id for seat in seats]
+    inserted = db.scalars(insert(bookings).from_select(
+        ["user_id", "event_id", "seat_id", "status", "created_at"],
+        select(literal(user_id), literal(event_id), models.Seat.id, literal("active"), literal(dt.datetime.utcnow()))
+        .where(models.Seat.id.in_(seat_ids), not_cancelled)
+    ).returning(bookings.c.id)).all()
+    if len(inserted) != len(seat_ids):
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Event has been cancelled")
+    for seat_id in seat_ids:
+        mark_seats_changed(db, event_id, seat_id, False)
+    pin_users_after_commit(db, [user_id])
     db.commit()
-    db.refresh(db_booking)
-    return db_booking
+    return db.query(models.Booking).filter(
+        models.Booking.id.in_(inserted), models.Booking.event_id == event_id
+    ).order_by(models.Booking.seat_id).all()
+
+def create_group_booking(db: Session, booking: schemas.GroupBookingCreate, strategy: Optional[str] = None) -> List[models.Booking]:
+    """
+    Books `quantity` adjacent seats (same row, consecutive positions) for a user. The block
+    comes from the free-interval index of the cached seat map and is verified in the
+    transaction; if another request took one of its seats, the event's seat map is reloaded
+    and allocation retried. Seats are claimed as in create_booking for the chosen strategy.
+    """
+    settings = get_settings()
+    optimistic = (strategy or settings.BOOKING_STRATEGY) == "optimistic"
+    _check_event_not_cancelled(db, booking.event_id)
+    for _ in range(settings.BOOKING_MAX_RETRIES + 1):
+        seat_ids = seat_map_cache.find_block(db, booking.event_id, booking.quantity)
+        if seat_ids is None:
+            if db.get(models.Event, booking.event_id) is None:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found")
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"No block of {booking.quantity} adjacent seats is available")
+
+        query = db.query(models.Seat).filter(
+            models.Seat.id.in_(seat_ids),
+            models.Seat.event_id == booking.event_id
+        ).order_by(models.Seat.id)
+        if not optimistic and db.bind.dialect.name == 'postgresql':
+            query = query.with_for_update()
+        seats = query.all()
+
+        if len(seats) == len(seat_ids) and not _active_booking_seat_ids(db, booking.event_id, seat_ids) and all(
+            _claim_seat(db, seat, expected_version=seat.version if optimistic else None) for seat in seats
+        ):
+            return _insert_bookings(db, booking.user_id, booking.event_id, seats)
+
+        db.rollback()
+        seat_map_cache.invalidate(booking.event_id)
+    raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Seats are in high demand, please try again")
 
-def cancel_booking(db: Session, booking_id: int, user_id: int):
+def cancel_booking(db: Session, booking_id: int, user_id: int, event_id: Optional[int] = None):
     """
     Cancels a booking by marking its status as 'cancelled'. This frees the seat implicitly.
+    With `event_id`, PostgreSQL looks the booking up in that event's partition only;
+    without it, every partition's primary key index is probed.
     """
-    db_booking = db.query(models.Booking).filter(
+    query = db.query(models.Booking).filter(
         models.Booking.id == booking_id,
         models.Booking.user_id == user_id,
         models.Booking.status == 'active'
-    ).first()
+    )
+    if event_id is not None:
+        query = query.filter(models.Booking.event_id == event_id)
+    db_booking = query.first()
 
     if not db_booking:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Active booking not found for this user")
 
     db_booking.status = 'cancelled'
+    after_commit(db, notify_next_on_waitlist, db_booking.event_id)
     db.commit()
     return {"detail": "Booking canceled successfully"}
 
-def get_user_bookings(db: Session, user_id: int):
+def notify_next_on_waitlist(db: Session, event_id: int):
     """
-    Retrieves all active bookings for a specific user, including event and seat details.
+    Post-commit task for a cancellation: tells the longest-waiting user that a spot
+    has opened up and removes their waitlist entry.
     """
-    bookings = db.query(models.Booking).options(
-        joinedload(models.Booking.event),
-        joinedload(models.Booking.seat)
-    ).filter(
-        models.Booking.user_id == user_id,
-        models.Booking.status == 'active'
-    ).all()
-    return bookings
+    query = db.query(models.WaitlistEntry).filter(
+        models.WaitlistEntry.event_id == event_id
+    ).order_by(models.WaitlistEntry.created_at, models.WaitlistEntry.id)
+    if db.bind.dialect.name == 'postgresql':
+        # Concurrent cancellations each notify a different user.
+        query = query.with_for_update(skip_locked=True)
+    waitlist_entry = query.first()
+    if not waitlist_entry:
+        return
+
+    event_name = db.query(models.Event.name).filter(models.Event.id == event_id).scalar()
+    db.add(models.Notification(
+        user_id=waitlist_entry.user_id,
+        message=f"A spot has opened up for the event: '{event_name}'. Book it before someone else does!"
+    ))
+    db.delete(waitlist_entry)
+
+def encode_cursor(timestamp: dt.datetime, row_id: int) -> str:
+    raw = f"{timestamp.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor: str):
+    try:
+        timestamp, row_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return dt.datetime.fromisoformat(timestamp), int(row_id)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+def get_user_bookings(
+    db: Session,
+    user_id: int,
+    booking_status: Optional[str] = 'active',
+    created_from: Optional[dt.datetime] = None,
+    created_to: Optional[dt.datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+):
+    """
+    Retrieves one page of a user's bookings, newest first, including event and seat details.
+    Pages are keyed on (created_at, id), so deep pages cost the same as the first one.
+    Archived bookings (finished events, old cancellations) are not part of the history.
+    Returns the bookings and the cursor for the next page, or None on the last page.
+    """
+    query = db.query(models.Booking).options(
+        selectinload(models.Booking.event),
+        selectinload(models.Booking.seat)
+    ).filter(models.Booking.user_id == user_id)
+
+    if booking_status is not None:
+        query = query.filter(models.Booking.status == booking_status)
+    if created_from is not None:
+        query = query.filter(models.Booking.created_at >= created_from)
+    if created_to is not None:
+        query = query.filter(models.Booking.created_at < created_to)
+    if cursor is not None:
+        query = query.filter(
+            tuple_(models.Booking.created_at, models.Booking.id) < tuple_(*decode_cursor(cursor))
+        )
+
+    bookings = query.order_by(models.Booking.created_at.desc(), models.Booking.id.desc()).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(bookings) > limit:
+        bookings = bookings[:limit]
+        next_cursor = encode_cursor(bookings[-1].created_at, bookings[-1].id)
+    return bookings, next_cursor
 
 def get_user_notifications(db: Session, user_id: int):
     """
@@ -131,9 +419,26 @@ def get_user_notifications(db: Session, user_id: int):
 
 def get_user_waitlist_entries(db: Session, user_id: int):
     """
-    Retrieves all waitlist entries for a specific user.
+    Retrieves all waitlist entries for a specific user, each with its 1-based position in
+    the event's waitlist and the waitlist's length. Ranks are computed over the user's
+    events only, in (created_at, id) order, which the queue index returns presorted.
     """
-    return db.query(models.WaitlistEntry).filter(models.WaitlistEntry.user_id == user_id).all()
+    user_events = select(models.WaitlistEntry.event_id).where(models.WaitlistEntry.user_id == user_id)
+    queue = models.WaitlistEntry.event_id
+    ranked = select(
+        models.WaitlistEntry.id,
+        models.WaitlistEntry.user_id,
+        models.WaitlistEntry.event_id,
+        models.WaitlistEntry.created_at,
+        func.row_number().over(
+            partition_by=queue, order_by=(models.WaitlistEntry.created_at, models.WaitlistEntry.id)
+        ).label("position"),
+        func.count().over(partition_by=queue).label("waitlist_length"),
+    ).where(queue.in_(user_events)).subquery()
+
+    return db.execute(
+        select(ranked).where(ranked.c.user_id == user_id).order_by(ranked.c.created_at, ranked.c.id)
+    ).all()
 
 def remove_from_waitlist(db: Session, waitlist_entry_id: int, user_id: int):
     """
@@ -152,18 +457,130 @@ def remove_from_waitlist(db: Session, waitlist_entry_id: int, user_id: int):
     return {"detail": "Successfully removed from waitlist"}
 
 def update_event(db: Session, event_id: int, event_update: schemas.EventCreate):
-    db_event = db.query(models.Event).filter(models.Event.id == event_id).first()
+    """
+    Updates an event's details and resizes its seat inventory to `total_seats`.
+    """
+    query = db.query(models.Event).filter(models.Event.id == event_id)
+    if db.bind.dialect.name == 'postgresql':
+        query = query.with_for_update()
+    db_event = query.first()
     if not db_event:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found")
 
-    update_data = event_update.model_dump(exclude={"total_seats"}, exclude_unset=True)
+    # Seat fields are not Event columns; they go to resize_event_seats.
+    update_data = event_update.model_dump(exclude={"total_seats", "seats_per_row"}, exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_event, key, value)
 
+    resize_event_seats(db, db_event, event_update.total_seats, event_update.seats_per_row)
+
     db.commit()
     db.refresh(db_event)
     return db_event
 
+def resize_event_seats(db: Session, db_event: models.Event, total_seats: int, seats_per_row: Optional[int] = None):
+    """
+    Grows or shrinks an event's seat inventory in place without committing.
+    Growing inserts only the new seats, continuing the existing row layout (or laying
+    them out in rows of `seats_per_row`), and books them for the oldest waitlist entries;
+    shrinking deletes seats without an active booking, newest first.
+    """
+    current_seats = db.query(func.count(models.Seat.id)).filter(models.Seat.event_id == db_event.id).scalar()
+    if total_seats != current_seats:
+        mark_seats_changed(db, db_event.id)
+    if total_seats > current_seats:
+        _grow_event_seats(db, db_event, total_seats - current_seats, seats_per_row)
+    elif total_seats < current_seats:
+        _shrink_event_seats(db, db_event, current_seats - total_seats)
+
+def _grow_event_seats(db: Session, db_event: models.Event, count: int, seats_per_row: Optional[int] = None):
+    if db.bind.dialect.name == 'postgresql':
+        seat_ordinal = cast(func.substring(models.Seat.seat_number, r'^Seat-(\d+)$'), Integer)
+    else:
+        seat_ordinal = cast(func.substr(models.Seat.seat_number, len("Seat-") + 1), Integer)
+    last_number = db.query(func.max(seat_ordinal)).filter(
+        models.Seat.event_id == db_event.id,
+        models.Seat.seat_number.like("Seat-%")
+    ).scalar() or 0
+    last_seat_id = db.query(func.max(models.Seat.id)).scalar() or 0
+
+    # New seats continue after the last laid-out seat, in rows as wide as the widest one.
+    last_laid = db.query(models.Seat.row_number, models.Seat.position).filter(
+        models.Seat.event_id == db_event.id,
+        models.Seat.row_number.isnot(None)
+    ).order_by(models.Seat.row_number.desc(), models.Seat.position.desc()).first()
+    if last_laid and not seats_per_row:
+        seats_per_row = db.query(func.max(models.Seat.position)).filter(models.Seat.event_id == db_event.id).scalar()
+    first_index = (last_laid.row_number - 1) * seats_per_row + last_laid.position if last_laid else 0
+
+    db.execute(insert(models.Seat.__table__), [
+        {
+            "event_id": db_event.id,
+            "seat_number": f"Seat-{last_number + i + 1}",
+            **seat_layout(first_index + i, seats_per_row),
+        }
+        for i in range(count)
+    ])
+
+    # Pair the oldest waitlist entries with the new seats by rank and promote them with
+    # INSERT ... SELECT, so no rows are loaded into Python.
+    waitlist = select(
+        models.WaitlistEntry.id,
+        models.WaitlistEntry.user_id,
+        func.row_number().over(order_by=(models.WaitlistEntry.created_at, models.WaitlistEntry.id)).label("rank")
+    ).where(models.WaitlistEntry.event_id == db_event.id).subquery()
+    new_seats = select(
+        models.Seat.id,
+        func.row_number().over(order_by=models.Seat.id).label("rank")
+    ).where(models.Seat.event_id == db_event.id, models.Seat.id > last_seat_id).subquery()
+
+    now = dt.datetime.utcnow()
+    bookings = models.Booking.__table__
+    promoted_users = db.scalars(insert(bookings).from_select(
+        ["user_id", "event_id", "seat_id", "status", "created_at"],
+        select(waitlist.c.user_id, literal(db_event.id), new_seats.c.id, literal("active"), literal(now))
+        .join_from(waitlist, new_seats, waitlist.c.rank == new_seats.c.rank)
+    ).returning(bookings.c.user_id)).all()
+    if not promoted_users:
+        return
+    promoted = len(promoted_users)
+    pin_users_after_commit(db, promoted_users)
+
+    message = f"You have been booked a seat from the waitlist for the event: '{db_event.name}'."
+    db.execute(insert(models.Notification.__table__).from_select(
+        ["user_id", "message", "is_read", "created_at"],
+        select(waitlist.c.user_id, literal(message), literal(False), literal(now)).where(waitlist.c.rank <= promoted)
+    ))
+    db.execute(
+        delete(models.WaitlistEntry)
+        .where(models.WaitlistEntry.id.in_(select(waitlist.c.id).where(waitlist.c.rank <= promoted)))
+        .execution_options(synchronize_session=False)
+    )
+
+def _shrink_event_seats(db: Session, db_event: models.Event, count: int):
+    active_booking = aliased(models.Booking)
+    free_seats = select(models.Seat.id).where(
+        models.Seat.event_id == db_event.id,
+        ~select(active_booking.id).where(
+            active_booking.event_id == db_event.id,
+            active_booking.seat_id == models.Seat.id,
+            active_booking.status == 'active'
+        ).exists()
+    ).order_by(models.Seat.id.desc()).limit(count).correlate(None).scalar_subquery()
+
+    # Cancelled bookings still reference their seats, so they move to the archive first.
+    archival.move_rows(
+        db, models.Booking, models.ArchivedBooking, archival.BOOKING_COLUMNS,
+        and_(models.Booking.event_id == db_event.id, models.Booking.seat_id.in_(free_seats)),
+        dt.datetime.utcnow()
+    )
+    removed = db.execute(
+        delete(models.Seat).where(models.Seat.id.in_(free_seats)).execution_options(synchronize_session=False)
+    ).rowcount
+    if removed < count:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cannot remove seats that have active bookings")
+
 def delete_event(db: Session, event_id: int):
     db_event = db.query(models.Event).filter(models.Event.id == event_id).first()
     if not db_event:
@@ -177,38 +594,169 @@ def delete_event(db: Session, event_id: int):
     if has_bookings:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cannot delete event with active bookings")
 
+    mark_seats_changed(db, event_id)
     db.query(models.Booking).filter(models.Booking.event_id == event_id).delete(synchronize_session=False)
     db.query(models.Seat).filter(models.Seat.event_id == event_id).delete(synchronize_session=False)
     db.delete(db_event)
     db.commit()
     return {"detail": "Event deleted successfully"}
 
-def get_analytics(db: Session):
-    total_bookings = db.query(models.Booking).count()
-    cancelled_bookings = db.query(models.Booking).filter(models.Booking.status == 'cancelled').count()
+def cancel_event(db: Session, event_id: int, chunk_size: int = 5000):
+    """
+    Cancels an event: flags it so that it takes no new bookings, cancels every active
+    booking and removes every waitlist entry, notifying each affected user once. The rows
+    are processed with UPDATE/DELETE ... RETURNING statements in chunks of `chunk_size`,
+    one transaction per chunk, without loading ORM objects.
+
+    Booking INSERTs only insert while the flag is unset (see _insert_bookings), without
+    locking the event row. A booking whose INSERT ran just before the flag committed can
+    still commit after it, so a last sweep after the waitlist is cleared cancels it. An
+    interrupted cancellation can be run again: it finds the event already flagged, resumes with the
+    rows still active and skips users who already got the cancellation notice.
+    """
+    db_event = db.query(models.Event).filter(models.Event.id == event_id).first()
+    if not db_event:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found")
+    event_name = db_event.name
+    db_event.is_cancelled = True
+    db.commit()
+
+    bookings = models.Booking.__table__
+    cancel_chunk = update(bookings).where(
+        bookings.c.event_id == event_id,
+        bookings.c.id.in_(
+            select(bookings.c.id).where(bookings.c.event_id == event_id, bookings.c.status == 'active').limit(chunk_size)
+        )
+    ).values(status='cancelled').returning(bookings.c.user_id)
+    entries = models.WaitlistEntry.__table__
+    remove_chunk = delete(entries).where(
+        entries.c.id.in_(select(entries.c.id).where(entries.c.event_id == event_id).limit(chunk_size))
+    ).returning(entries.c.user_id)
+
+    booker_message = f"The event '{event_name}' has been cancelled. Your booking has been cancelled."
+    cancelled_bookings, notified = _sweep_and_notify(db, event_id, cancel_chunk, booker_message)
+    removed_entries, notified_waitlisted = _sweep_and_notify(
+        db, event_id, remove_chunk, f"The event '{event_name}' you were waitlisted for has been cancelled."
+    )
+    swept_bookings, notified_late = _sweep_and_notify(db, event_id, cancel_chunk, booker_message)
+    return {
+        "event_id": event_id,
+        "cancelled_bookings": cancelled_bookings + swept_bookings,
+        "removed_waitlist_entries": removed_entries,
+        "notified_users": notified + notified_waitlisted + notified_late,
+    }
+
+def _sweep_and_notify(db: Session, event_id: int, statement, message: str) -> Tuple[int, int]:
+    # Runs a chunked statement returning user ids until it affects no rows, and returns
+    # the rows affected and users notified. In each chunk's transaction, an INSERT ...
+    # SELECT gives `message` to the chunk's users who have no cancellation notice for the
+    # event yet, which also makes a rerun skip the users notified before it was interrupted.
+    total = notified = 0
+    while True:
+        user_ids, inserted = _cancellation_chunk(db, event_id, statement, message)
+        if not user_ids:
+            db.commit()
+            return total, notified
+        pin_users_after_commit(db, user_ids)
+        mark_seats_changed(db, event_id)
+        db.commit()
+        total += len(user_ids)
+        notified += inserted
+
+def _cancellation_chunk(db: Session, event_id: int, statement, message: str) -> Tuple[List[int], int]:
+    notifications = models.Notification.__table__
+    columns = ["user_id", "event_id", "kind", "message", "is_read", "created_at"]
+
+    def notices_for(user_id):
+        already_notified = select(notifications.c.id).where(
+            notifications.c.event_id == event_id,
+            notifications.c.kind == EVENT_CANCELLED_NOTICE,
+            notifications.c.user_id == user_id
+        ).exists()
+        return select(
+            user_id, literal(event_id), literal(EVENT_CANCELLED_NOTICE), literal(message), literal(False), literal(dt.datetime.utcnow())
+        ).where(~already_notified)
+
+    if db.bind.dialect.name == 'postgresql':
+        # One statement: the chunk's UPDATE/DELETE feeds the notification INSERT through
+        # data-modifying CTEs, and only the affected user ids come back.
+        changed = statement.cte("changed")
+        inserted = insert(notifications).from_select(
+            columns, notices_for(changed.c.user_id).distinct()
+        ).returning(notifications.c.user_id).cte("inserted")
+        rows = db.execute(select(changed.c.user_id, inserted.c.user_id).select_from(
+            changed.outerjoin(inserted, inserted.c.user_id == changed.c.user_id)
+        )).all()
+        return [user_id for user_id, _ in rows], len({user_id for _, user_id in rows if user_id is not None})
+
+    user_ids = db.scalars(statement).all()
+    if not user_ids:
+        return user_ids, 0
+    users = models.User.__table__
+    result = db.execute(insert(notifications).from_select(
+        columns, notices_for(users.c.id).where(users.c.id.in_(set(user_ids)))
+    ))
+    return user_ids, result.rowcount
+
+def _analytics_sources(include_archived: bool):
+    sources = [(models.Event, models.Seat, models.Booking)]
+    if include_archived:
+        sources.append((models.ArchivedEvent, models.ArchivedSeat, models.ArchivedBooking))
+    return sources
+
+def get_analytics(db: Session, include_archived: bool = False):
+    """
+    Computes booking analytics. Archived events and bookings, including cancelled
+    bookings archived after 30 days, are only included when `include_archived` is set.
+    """
+    sources = _analytics_sources(include_archived)
+
+    total_bookings = 0
+    cancelled_bookings = 0
+    for _, _, booking_model in sources:
+        total, cancelled = db.query(
+            func.count(booking_model.id),
+            func.count(case((booking_model.status == 'cancelled', 1)))
+        ).one()
+        total_bookings += total
+        cancelled_bookings += cancelled
     cancellation_rate = (cancelled_bookings / total_bookings) if total_bookings > 0 else 0
 
+    booking_times = union_all(*[select(booking_model.created_at.label('created_at')) for _, _, booking_model in sources]).subquery()
     if db.bind.dialect.name == 'sqlite':
-        date_col = func.strftime('%Y-%m-%d', models.Booking.created_at).label('date')
+        date_col = func.strftime('%Y-%m-%d', booking_times.c.created_at).label('date')
     else:
-        date_col = cast(models.Booking.created_at, Date).label('date')
+        date_col = cast(booking_times.c.created_at, Date).label('date')
 
-    daily_bookings = db.query(date_col, func.count(models.Booking.id).label('count')).group_by(date_col).order_by(date_col).all()
+    daily_bookings = db.query(date_col, func.count().label('count')).select_from(booking_times).group_by(date_col).order_by(date_col).all()
 
-    events = db.query(models.Event).options(subqueryload(models.Event.seats)).all()
     capacity_utilization = []
-    for event in events:
-        total_seats = len(event.seats)
-        active_bookings = db.query(models.Booking).filter(models.Booking.event_id == event.id, models.Booking.status == 'active').count()
-        utilization = (active_bookings / total_seats) if total_seats > 0 else 0
-
-        capacity_utilization.append({
-            "event_id": event.id,
-            "event_name": event.name,
-            "utilization": utilization,
-            "total_seats": total_seats,
-            "booked_seats": active_bookings
-        })
+    for event_model, seat_model, booking_model in sources:
+        seat_counts = db.query(
+            seat_model.event_id, func.count(seat_model.id).label('total_seats')
+        ).group_by(seat_model.event_id).subquery()
+        active_counts = db.query(
+            booking_model.event_id, func.count(booking_model.id).label('booked_seats')
+        ).filter(booking_model.status == 'active').group_by(booking_model.event_id).subquery()
+
+        rows = db.query(
+            event_model.id,
+            event_model.name,
+            func.coalesce(seat_counts.c.total_seats, 0),
+            func.coalesce(active_counts.c.booked_seats, 0)
+        ).outerjoin(seat_counts, seat_counts.c.event_id == event_model.id
+        ).outerjoin(active_counts, active_counts.c.event_id == event_model.id
+        ).order_by(event_model.id).all()
+
+        for event_id, event_name, total_seats, active_bookings in rows:
+            utilization = (active_bookings / total_seats) if total_seats > 0 else 0
+            capacity_utilization.append({
+                "event_id": event_id,
+                "event_name": event_name,
+                "utilization": utilization,
+                "total_seats": total_seats,
+                "booked_seats": active_bookings
+            })
 
     most_popular_events = sorted(capacity_utilization, key=lambda x: x["booked_seats"], reverse=True)
 
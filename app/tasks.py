@@ -0,0 +1,158 @@
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from .database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# A task gets its own session, bound to the same database as the transaction that
+# registered it, followed by the registered arguments.
+Task = Callable[..., Any]
+
+class TaskExecutor:
+    """
+    Runs post-commit side effects off the request path on a bounded pool of worker
+    threads. When the queue stays full for `submit_timeout` seconds the task runs in the
+    submitting thread instead, which slows the producer down rather than dropping work.
+    While drain() runs, new tasks also run inline. `mode="inline"` runs every task
+    synchronously (used by the tests).
+    """
+
+    def __init__(self, workers: int, max_queue: int, submit_timeout: float, mode: str = "thread"):
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        self._queue: "queue.Queue" = queue.Queue()
+        self._draining = False
+        self.configure(workers, max_queue, submit_timeout, mode)
+
+    def configure(self, workers: int, max_queue: int, submit_timeout: float, mode: str = "thread"):
+        if mode not in ("thread", "inline"):
+            raise ValueError(f"Unknown task executor mode: {mode}")
+        self.drain()
+        with self._lock:
+            self.workers = workers
+            self.max_queue = max_queue
+            self.submit_timeout = submit_timeout
+            self.mode = mode
+            self._queue = queue.Queue(maxsize=max_queue)
+            self._draining = False
+            self._metrics = {
+                "submitted": 0,
+                "completed": 0,
+                "failed": 0,
+                "ran_inline": 0,
+                "running": 0,
+                "queue_wait_seconds_total": 0.0,
+                "run_seconds_total": 0.0,
+            }
+
+    def submit(self, bind, task: Task, *args):
+        with self._lock:
+            self._metrics["submitted"] += 1
+            inline = self.mode == "inline" or self._draining
+            if not inline and not self._threads:
+                self._start()
+        if not inline:
+            try:
+                self._queue.put((bind, task, args, time.monotonic()), timeout=self.submit_timeout)
+                return
+            except queue.Full:
+                logger.warning("Task queue full, running %s inline", getattr(task, "__name__", task))
+        with self._lock:
+            self._metrics["ran_inline"] += 1
+        self._run(bind, task, args, time.monotonic())
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """
+        Stops the workers once every queued task has run; tasks submitted meanwhile run
+        inline. Returns False if `timeout` expired first, in which case the tasks still
+        queued are lost with the process and new tasks keep running inline until
+        configure() is called. After a complete drain, the next task starts new workers.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            threads, self._threads = self._threads, []
+            self._draining = True
+        try:
+            for _ in threads:
+                self._queue.put(None, timeout=None if deadline is None else max(0.0, deadline - time.monotonic()))
+        except queue.Full:
+            pass
+        for thread in threads:
+            thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        drained = not any(thread.is_alive() for thread in threads)
+        if drained:
+            with self._lock:
+                self._draining = False
+        else:
+            logger.error("Task executor drain timed out with %d tasks queued", self._queue.qsize())
+        return drained
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._metrics,
+                "mode": self.mode,
+                "workers": len(self._threads),
+                "queued": self._queue.qsize(),
+                "max_queue": self.max_queue,
+            }
+
+    def _start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"post-commit-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            self._run(*item)
+
+    def _run(self, bind, task: Task, args, queued_at: float):
+        started = time.monotonic()
+        with self._lock:
+            self._metrics["running"] += 1
+            self._metrics["queue_wait_seconds_total"] += started - queued_at
+        failed = False
+        db = SessionLocal(bind=bind)
+        try:
+            task(db, *args)
+            db.commit()
+        except Exception:
+            failed = True
+            db.rollback()
+            logger.exception("Post-commit task %s failed", getattr(task, "__name__", task))
+        finally:
+            db.close()
+            with self._lock:
+                self._metrics["running"] -= 1
+                self._metrics["failed" if failed else "completed"] += 1
+                self._metrics["run_seconds_total"] += time.monotonic() - started
+
+# Sized from settings by app.main.create_app.
+task_executor = TaskExecutor(workers=4, max_queue=1000, submit_timeout=0.05)
+
+def after_commit(session: Session, task: Task, *args):
+    """
+    Schedules `task(db, *args)` to run once the session's current transaction commits.
+    Nothing runs if it rolls back.
+    """
+    session.info.setdefault("post_commit_tasks", []).append((session.get_bind(), task, args))
+
+@event.listens_for(Session, "after_commit")
+def _submit_post_commit_tasks(session):
+    for bind, task, args in session.info.pop("post_commit_tasks", ()):
+        task_executor.submit(bind, task, *args)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_post_commit_tasks(session):
+    session.info.pop("post_commit_tasks", None)
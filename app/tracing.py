@@ -0,0 +1,236 @@
+import contextvars
+import datetime as dt
+import decimal
+import json
+import logging
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+slow_log = logging.getLogger("app.slow_sql")
+
+# Statements kept per request; later ones still count towards the totals.
+MAX_STATEMENTS = 500
+MAX_SQL_LENGTH = 2000
+# Frames of these modules are skipped when attributing a statement to a function.
+_SKIPPED_MODULES = {__name__, "app.database"}
+_KEPT_TYPES = (decimal.Decimal, dt.date, dt.datetime, dt.time, dt.timedelta)
+
+@dataclass
+class StatementTrace:
+    sql: str
+    parameters: Any
+    duration_ms: float
+    rowcount: Optional[int]
+    caller: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "sql": self.sql,
+            "parameters": self.parameters,
+            "duration_ms": round(self.duration_ms, 3),
+            "rowcount": self.rowcount,
+            "caller": self.caller,
+        }
+
+@dataclass
+class RequestTrace:
+    """
+    SQL statements issued while serving one request, in execution order. Commits are
+    recorded as "COMMIT" statements, so the time spent committing shows up separately
+    from the statements flushed before it.
+    """
+    method: str
+    path: str
+    started: float = field(default_factory=time.perf_counter)
+    statements: List[StatementTrace] = field(default_factory=list)
+    statement_count: int = 0
+    db_ms: float = 0.0
+    status: Optional[int] = None
+    duration_ms: Optional[float] = None
+    session_committing: bool = False
+    commit_started: Optional[float] = None
+
+    def record(self, statement: StatementTrace):
+        self.statement_count += 1
+        self.db_ms += statement.duration_ms
+        if len(self.statements) < MAX_STATEMENTS:
+            self.statements.append(statement)
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Totals per calling function and the slowest statement; small enough for a header.
+        """
+        by_caller: Dict[str, Dict[str, Any]] = {}
+        for statement in self.statements:
+            totals = by_caller.setdefault(statement.caller, {"count": 0, "ms": 0.0})
+            totals["count"] += 1
+            totals["ms"] = round(totals["ms"] + statement.duration_ms, 3)
+        slowest = max(self.statements, key=lambda s: s.duration_ms, default=None)
+        return {
+            "statements": self.statement_count,
+            "db_ms": round(self.db_ms, 3),
+            "commit_ms": round(sum(s.duration_ms for s in self.statements if s.sql == "COMMIT"), 3),
+            "elapsed_ms": round((time.perf_counter() - self.started) * 1000, 3),
+            "by_caller": by_caller,
+            "slowest": None if slowest is None else {
+                "caller": slowest.caller, "ms": round(slowest.duration_ms, 3), "sql": slowest.sql[:120]
+            },
+        }
+
+_current_trace: contextvars.ContextVar[Optional[RequestTrace]] = contextvars.ContextVar("sql_trace", default=None)
+
+def current_trace() -> Optional[RequestTrace]:
+    return _current_trace.get()
+
+def redact(parameters: Any, executemany: bool = False) -> Any:
+    """
+    Keeps numbers, booleans, dates and NULLs, which identify rows without exposing user
+    data, and replaces every other value with its type name.
+    """
+    if executemany:
+        return f"<{len(parameters)} parameter sets>"
+    if isinstance(parameters, dict):
+        return {key: _redact_value(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_redact_value(value) for value in parameters]
+    return _redact_value(parameters)
+
+def _redact_value(value: Any) -> Any:
+    if value is None or isinstance(value, (int, float, bool)):
+        return value
+    if isinstance(value, _KEPT_TYPES):
+        return str(value)
+    return f"<{type(value).__name__}>"
+
+def _caller() -> str:
+    frame = sys._getframe(2)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if (module == "app" or module.startswith("app.")) and module not in _SKIPPED_MODULES:
+            return f"{module}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return "unknown"
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the execution context, which is discarded with the statement whether or
+    # not it succeeds.
+    if context is not None and _current_trace.get() is not None:
+        context._trace_started = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    trace = _current_trace.get()
+    started = getattr(context, "_trace_started", None)
+    if trace is None or started is None:
+        return
+    duration_ms = (time.perf_counter() - started) * 1000
+    rowcount = cursor.rowcount if cursor.rowcount is not None and cursor.rowcount >= 0 else None
+    trace.record(StatementTrace(statement[:MAX_SQL_LENGTH], redact(parameters, executemany), duration_ms, rowcount, _caller()))
+
+# A COMMIT is timed from the connection's commit to the Session's after_commit hook,
+# so only connection commits made while a Session commits start the clock; commits of
+# bare connections and rolled back transactions leave nothing behind.
+
+def _before_session_commit(session):
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.session_committing = True
+        trace.commit_started = None
+
+def _before_commit(conn):
+    trace = _current_trace.get()
+    if trace is not None and trace.session_committing and trace.commit_started is None:
+        trace.commit_started = time.perf_counter()
+
+def _after_rollback(conn_or_session, *args):
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.session_committing = False
+        trace.commit_started = None
+
+def _after_session_commit(session):
+    trace = _current_trace.get()
+    if trace is None:
+        return
+    trace.session_committing = False
+    if trace.commit_started is None:
+        return
+    duration_ms = (time.perf_counter() - trace.commit_started) * 1000
+    trace.commit_started = None
+    trace.record(StatementTrace("COMMIT", None, duration_ms, None, _caller()))
+
+def install():
+    """
+    Registers the statement and commit listeners. They cost a context variable lookup
+    per statement for requests that are not traced.
+    """
+    if event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "commit", _before_commit)
+    event.listen(Engine, "rollback", _after_rollback)
+    event.listen(Session, "before_commit", _before_session_commit)
+    event.listen(Session, "after_rollback", _after_rollback)
+    # First, so the time other after_commit listeners take is not counted as commit time.
+    event.listen(Session, "after_commit", _after_session_commit, insert=True)
+
+class SQLTraceMiddleware:
+    """
+    ASGI middleware that traces the SQL of every request. A request slower than
+    `slow_request_ms` is written to the `app.slow_sql` log with its statements, as is
+    each statement slower than `slow_statement_ms`, one JSON object per record. With
+    `expose_header`, a request sent with `X-Debug-SQL-Trace: 1` gets the trace summary
+    back in the `X-SQL-Trace` response header.
+    """
+
+    def __init__(self, app, slow_request_ms: float, slow_statement_ms: float, expose_header: bool = False):
+        self.app = app
+        self.slow_request_ms = slow_request_ms
+        self.slow_statement_ms = slow_statement_ms
+        self.expose_header = expose_header
+        install()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace = RequestTrace(scope["method"], scope["path"])
+        want_summary = self.expose_header and (b"x-debug-sql-trace", b"1") in scope["headers"]
+
+        async def send_with_trace(message):
+            if message["type"] == "http.response.start":
+                trace.status = message["status"]
+                if want_summary:
+                    summary = json.dumps(trace.summary(), separators=(",", ":"))
+                    message = {**message, "headers": [*message.get("headers", []), (b"x-sql-trace", summary.encode())]}
+            await send(message)
+
+        token = _current_trace.set(trace)
+        try:
+            await self.app(scope, receive, send_with_trace)
+        finally:
+            _current_trace.reset(token)
+            trace.duration_ms = (time.perf_counter() - trace.started) * 1000
+            self._log_slow(trace)
+
+    def _log_slow(self, trace: RequestTrace):
+        request = {"method": trace.method, "path": trace.path, "status": trace.status}
+        for statement in trace.statements:
+            if statement.duration_ms >= self.slow_statement_ms:
+                slow_log.warning(json.dumps({"type": "slow_statement", **request, **statement.to_dict()}, default=str))
+        if trace.duration_ms >= self.slow_request_ms:
+            slow_log.warning(json.dumps({
+                "type": "slow_request",
+                **request,
+                "duration_ms": round(trace.duration_ms, 3),
+                "db_ms": round(trace.db_ms, 3),
+                "statement_count": trace.statement_count,
+                "statements": [statement.to_dict() for statement in trace.statements],
+            }, default=str))
@@ -0,0 +1,94 @@
+import datetime as dt
+import logging
+import time
+from typing import Callable, Dict, List
+
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, configure_mappers
+
+from . import models, services
+from .config import Settings
+from .database import get_engine, get_read_engine
+from .identity import CachedUser, user_cache
+
+logger = logging.getLogger(__name__)
+
+# Id that matches no row. Running the hot queries with it compiles and caches their SQL
+# without reading or locking real data.
+SENTINEL_ID = -1
+
+def _seat_lookup(db: Session):
+    db.query(models.Seat).filter(models.Seat.event_id == SENTINEL_ID, models.Seat.seat_number == "").first()
+
+def _active_booking_lookup(db: Session):
+    db.query(models.Booking).filter(
+        models.Booking.event_id == SENTINEL_ID,
+        models.Booking.seat_id == SENTINEL_ID,
+        models.Booking.status == 'active'
+    ).first()
+
+def _user_lookup(db: Session):
+    db.execute(select(models.User.id, models.User.role).where(models.User.id == SENTINEL_ID)).first()
+
+# Statements every worker runs in its first requests: auth, event listing, booking history,
+# notifications, waitlist and the booking seat checks.
+HOT_QUERIES: List[Callable[[Session], None]] = [
+    _user_lookup,
+    lambda db: services.get_events(db, start_from=dt.datetime.max, limit=1),
+    lambda db: services.get_user_bookings(db, user_id=SENTINEL_ID, limit=1),
+    lambda db: services.get_user_notifications(db, user_id=SENTINEL_ID),
+    lambda db: services.get_user_waitlist_entries(db, user_id=SENTINEL_ID),
+    _seat_lookup,
+    _active_booking_lookup,
+]
+
+def _open_connections(engine: Engine, count: int):
+    connections = [engine.connect() for _ in range(count)]
+    for connection in connections:
+        connection.close()
+
+def _compile_hot_queries(engine: Engine):
+    with Session(bind=engine) as db:
+        for query in HOT_QUERIES:
+            query(db)
+        db.rollback()
+
+def _prime_user_cache(engine: Engine):
+    # Admins hit every admin endpoint, so their roles are worth having before the first request.
+    with Session(bind=engine) as db:
+        admins = db.execute(
+            select(models.User.id, models.User.role).where(models.User.role == "admin").limit(user_cache.maxsize)
+        ).all()
+    for admin in admins:
+        user_cache.put(admin.id, CachedUser(id=admin.id, role=admin.role))
+
+def warm_up(settings: Settings) -> Dict[str, float]:
+    """
+    Pays the first-request costs at startup: mapper configuration, pool connections,
+    SQL compilation of the hot statements and the user cache. Returns the time spent
+    per step in milliseconds. A failing step is logged and skipped so that startup is
+    never blocked by the warm-up itself.
+    """
+    engines = [get_engine()]
+    if get_read_engine() is not engines[0]:
+        engines.append(get_read_engine())
+
+    steps = [("configure_mappers", configure_mappers)]
+    for index, engine in enumerate(engines):
+        label = "primary" if index == 0 else "replica"
+        steps.append((f"open_connections[{label}]", lambda e=engine: _open_connections(e, settings.WARMUP_CONNECTIONS)))
+        # The compiled statement cache is per engine.
+        steps.append((f"compile_hot_queries[{label}]", lambda e=engine: _compile_hot_queries(e)))
+    steps.append(("prime_user_cache", lambda: _prime_user_cache(engines[-1])))
+
+    timings = {}
+    for name, step in steps:
+        started = time.perf_counter()
+        try:
+            step()
+        except Exception:
+            logger.exception("Warm-up step %s failed", name)
+        timings[name] = (time.perf_counter() - started) * 1000
+    logger.info("Warm-up finished: %s", ", ".join(f"{k}={v:.1f}ms" for k, v in timings.items()))
+    return timings
@@ -0,0 +1,63 @@
+"""
+Times the free-interval index behind group bookings (app.allocation.FreeIntervalIndex)
+on a large venue: building it, finding the best block of N adjacent seats, and the
+incremental updates applied when a seat is booked or released.
+
+    python benchmarks/bench_allocation.py --rows 200 --seats-per-row 400 --occupancy 0.7
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.allocation import FreeIntervalIndex
+
+def timed(fn, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1e6)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.99)]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200)
+    parser.add_argument("--seats-per-row", type=int, default=400)
+    parser.add_argument("--occupancy", type=float, default=0.7)
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    seat_count = args.rows * args.seats_per_row
+    seats = [
+        (i + 1, i // args.seats_per_row + 1, i % args.seats_per_row + 1, rng.random() >= args.occupancy)
+        for i in range(seat_count)
+    ]
+
+    started = time.perf_counter()
+    index = FreeIntervalIndex(seats)
+    print(f"{seat_count} seats, {args.occupancy:.0%} booked: built in {(time.perf_counter() - started) * 1000:.1f} ms\n")
+
+    print("| operation | median (µs) | p99 (µs) |")
+    print("|---|---|---|")
+    for count in (1, 2, 4, 6, 10):
+        median, p99 = timed(lambda: index.best_block(count), args.repeat)
+        print(f"| best block of {count} | {median:.1f} | {p99:.1f} |")
+
+    def book_and_release():
+        seat_id = rng.randint(1, seat_count)
+        index.occupy(seat_id)
+        index.release(seat_id)
+
+    median, p99 = timed(book_and_release, args.repeat)
+    print(f"| book + release one seat | {median:.1f} | {p99:.1f} |")
+
+if __name__ == "__main__":
+    main()
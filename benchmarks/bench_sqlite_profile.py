@@ -0,0 +1,132 @@
+"""
+Compares booking and read throughput on a file-backed SQLite database with the default
+sqlite3 settings against the concurrency profile (WAL, busy_timeout, BEGIN IMMEDIATE
+for writes; see app.database.configure_sqlite). Writers race for random seats of a few
+hot events while readers page through booking histories; the run reports throughput,
+"database is locked" errors and oversold seats (seats with more than one active booking).
+
+    python benchmarks/bench_sqlite_profile.py --writers 8 --readers 8 --seconds 10
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app import models, schemas, services
+from app.database import configure_sqlite
+from seed import DatasetConfig, generate_dataset
+
+HOT_EVENTS = 5
+
+def prepare(path: str, config: DatasetConfig):
+    engine = create_engine(f"sqlite:///{path}")
+    models.Base.metadata.create_all(engine)
+    generate_dataset(engine, config)
+    engine.dispose()
+
+def run(path: str, profile: bool, writers: int, readers: int, seconds: float, users: int):
+    engine = create_engine(f"sqlite:///{path}")
+    write_engine = engine
+    if profile:
+        configure_sqlite(engine, busy_timeout_ms=5000)
+        write_engine = engine.execution_options(sqlite_begin="IMMEDIATE")
+
+    with Session(bind=engine) as db:
+        hot_events = db.scalars(select(models.Event.id).order_by(models.Event.id).limit(HOT_EVENTS)).all()
+        seat_counts = {
+            event_id: db.query(func.count(models.Seat.id)).filter(models.Seat.event_id == event_id).scalar()
+            for event_id in hot_events
+        }
+
+    counts = {"booked": 0, "rejected": 0, "reads": 0, "locked": 0}
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+
+    def count(key):
+        with lock:
+            counts[key] += 1
+
+    def write():
+        rng = random.Random()
+        while time.monotonic() < deadline:
+            event_id = rng.choice(hot_events)
+            booking = schemas.BookingCreate(
+                user_id=rng.randint(1, users),
+                event_id=event_id,
+                seat_number=f"Seat-{rng.randint(1, seat_counts[event_id])}"
+            )
+            with Session(bind=write_engine) as db:
+                try:
+                    services.create_booking(db, booking)
+                    count("booked")
+                except HTTPException:
+                    db.rollback()
+                    count("rejected")
+                except OperationalError:
+                    db.rollback()
+                    count("locked")
+
+    def read():
+        rng = random.Random()
+        while time.monotonic() < deadline:
+            with Session(bind=engine) as db:
+                try:
+                    services.get_user_bookings(db, user_id=rng.randint(1, users), booking_status=None)
+                    count("reads")
+                except OperationalError:
+                    count("locked")
+
+    threads = [threading.Thread(target=write) for _ in range(writers)] + [threading.Thread(target=read) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with Session(bind=engine) as db:
+        per_seat = (
+            select(models.Booking.seat_id)
+            .where(models.Booking.event_id.in_(hot_events), models.Booking.status == 'active')
+            .group_by(models.Booking.seat_id)
+            .having(func.count() > 1)
+            .subquery()
+        )
+        oversold = db.scalar(select(func.count()).select_from(per_seat))
+    engine.dispose()
+    return counts, oversold
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--events", type=int, default=200)
+    args = parser.parse_args()
+
+    config = DatasetConfig(users=args.users, events=args.events, booking_ratio=0.3)
+    print("| mode | bookings/s | rejected/s | reads/s | locked errors | oversold seats |")
+    print("|---|---|---|---|---|---|")
+    for profile in (False, True):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "bench.db")
+            prepare(path, config)
+            counts, oversold = run(path, profile, args.writers, args.readers, args.seconds, args.users)
+        print(
+            f"| {'concurrent' if profile else 'default'} | {counts['booked'] / args.seconds:.0f} "
+            f"| {counts['rejected'] / args.seconds:.0f} | {counts['reads'] / args.seconds:.0f} "
+            f"| {counts['locked']} | {oversold} |"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Tracks cold-start cost: time to import app.main, time to build the app and run its
+lifespan (warm-up), and the first-request penalty of each hot endpoint (latency of the
+first request minus latency of the second), with the warm-up enabled and disabled.
+Every run is a fresh interpreter.
+
+    python benchmarks/bench_startup.py                       # temporary SQLite database
+    python benchmarks/bench_startup.py --url postgresql://... # existing, migrated database
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import json, time
+started = time.perf_counter()
+import app.main
+import_ms = (time.perf_counter() - started) * 1000
+
+from fastapi.testclient import TestClient
+started = time.perf_counter()
+application = app.main.create_app()
+with TestClient(application) as client:
+    startup_ms = (time.perf_counter() - started) * 1000
+    first, penalty = {}, {}
+    for path in ["/events", "/users/me/bookings", "/users/me/notifications", "/waitlists/me"]:
+        latencies = []
+        for _ in range(2):
+            request_started = time.perf_counter()
+            client.get(path, headers={"X-User-ID": "1"})
+            latencies.append((time.perf_counter() - request_started) * 1000)
+        first[path] = latencies[0]
+        penalty[path] = latencies[0] - latencies[1]
+print(json.dumps({"import_ms": import_ms, "startup_ms": startup_ms, "first_request_ms": first, "penalty_ms": penalty}))
+"""
+
+def prepare_sqlite(path):
+    sys.path.insert(0, ROOT)
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    from app.database import get_engine
+    from app.models import Base
+    from seed import DatasetConfig, generate_dataset
+
+    engine = get_engine()
+    Base.metadata.create_all(engine)
+    generate_dataset(engine, DatasetConfig(users=1000, events=20))
+    engine.dispose()
+
+def run(url, warmup):
+    env = dict(os.environ, DATABASE_URL=url, WARMUP_ENABLED=str(warmup).lower(), RATE_LIMIT_ENABLED="false")
+    output = subprocess.run([sys.executable, "-c", CHILD], cwd=ROOT, env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Database URL; defaults to a temporary SQLite database with synthetic data")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.url
+        if url is None:
+            path = os.path.join(tmp, "startup.db")
+            prepare_sqlite(path)
+            url = f"sqlite:///{path}"
+
+        print("| warm-up | import (ms) | startup (ms) | first-request penalty, sum over endpoints (ms) | time to first response (ms) |")
+        print("|---|---|---|---|---|")
+        for warmup in (False, True):
+            runs = [run(url, warmup) for _ in range(args.runs)]
+            import_ms = statistics.median(r["import_ms"] for r in runs)
+            startup_ms = statistics.median(r["startup_ms"] for r in runs)
+            penalty_ms = statistics.median(sum(r["penalty_ms"].values()) for r in runs)
+            ttfr_ms = statistics.median(r["import_ms"] + r["startup_ms"] + r["first_request_ms"]["/events"] for r in runs)
+            print(f"| {'on' if warmup else 'off'} | {import_ms:.1f} | {startup_ms:.1f} | {penalty_ms:.1f} | {ttfr_ms:.1f} |")
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,26 @@
+import argparse
+import csv
+import io
 import logging
+import math
+import random
+import time
 import datetime as dt
-from app.database import SessionLocal, engine
-from app.models import User, Event, Base
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, List, Optional, Sequence, Union
+
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.engine import Connection, Engine
+from app.database import SessionLocal, get_engine
+from app.models import User, Event, Seat, Booking, WaitlistEntry, Base
 from app import services, schemas
 from sqlalchemy.orm import Session
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 def seed_data():
-    db: Session = SessionLocal()
+    engine = get_engine()
+    db: Session = SessionLocal(bind=engine)
     try:
         # Create tables
         logger.info("Creating tables...")
@@ -35,11 +46,11 @@ def seed_data():
         event_schema1 = schemas.EventCreate(name="Tech Conference 2025", venue="Convention Center", start_time=dt.datetime(2025, 10, 1, 9, 0), end_time=dt.datetime(2025, 10, 1, 17, 0), total_seats=100)
         event_schema2 = schemas.EventCreate(name="Music Festival", venue="City Park", start_time=dt.datetime(2025, 11, 15, 12, 0), end_time=dt.datetime(2025, 11, 15, 23, 0), total_seats=500)
         event_schema3 = schemas.EventCreate(name="Art Exhibition", venue="Downtown Gallery", start_time=dt.datetime(2025, 12, 5, 10, 0), end_time=dt.datetime(2025, 12, 5, 18, 0), total_seats=50)
-        
+
         services.create_event(db, event_schema1)
         services.create_event(db, event_schema2)
         services.create_event(db, event_schema3)
-        
+
         logger.info("Events created.")
 
         logger.info("Database has been seeded successfully.")
@@ -47,5 +58,221 @@ def seed_data():
     finally:
         db.close()
 
+
+@dataclass
+class DatasetConfig:
+    """
+    Shape of a synthetic dataset. Ratios are relative to each event's seat count:
+    `booking_ratio` of the seats get a booking and `cancellation_ratio` of those bookings
+    are cancelled. Events left with every seat actively booked (which takes a
+    `booking_ratio` of 1) get `waitlist_ratio` of their seat count as waitlist entries,
+    from users without a booking for the event. Bookings are created up to
+    `booking_window_days` (at least 1) before the event. Bookings and waitlist entries go
+    to the generated users, so with `users=0` only events and seats are generated.
+    """
+    users: int = 1000
+    events: int = 100
+    seats_min: int = 50
+    seats_max: int = 500
+    seat_distribution: str = "uniform"
+    booking_ratio: float = 0.7
+    cancellation_ratio: float = 0.1
+    waitlist_ratio: float = 0.05
+    start_date: dt.datetime = field(default_factory=lambda: dt.datetime(2025, 1, 1))
+    days: int = 365
+    booking_window_days: int = 60
+    seed: int = 42
+    batch_size: int = 10000
+
+    def __post_init__(self):
+        if self.booking_window_days < 1:
+            raise ValueError("booking_window_days must be at least 1")
+
+VENUES = ["Convention Center", "City Park", "Downtown Gallery", "Grand Hall", "Stadium", "Opera House", "Arena", "Theatre"]
+
+class _TableWriter:
+    """
+    Writes row tuples in batches: COPY on PostgreSQL, Core executemany everywhere else.
+    """
+
+    def __init__(self, conn: Connection, batch_size: int):
+        self.conn = conn
+        self.batch_size = batch_size
+        self.use_copy = conn.dialect.name == "postgresql"
+
+    def write(self, table, columns: Sequence[str], rows: Iterable[tuple]) -> int:
+        written = 0
+        batch: List[tuple] = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                written += self._flush(table, columns, batch)
+                batch = []
+        if batch:
+            written += self._flush(table, columns, batch)
+        self.conn.commit()
+        return written
+
+    def _flush(self, table, columns, batch) -> int:
+        if self.use_copy:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerows(batch)
+            buffer.seek(0)
+            cursor = self.conn.connection.cursor()
+            try:
+                cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+            finally:
+                cursor.close()
+        else:
+            self.conn.execute(insert(table), [dict(zip(columns, row)) for row in batch])
+        return len(batch)
+
+def _next_id(conn: Connection, model) -> int:
+    return (conn.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+def _seat_counts(config: DatasetConfig, rng: random.Random) -> Iterator[int]:
+    low, high = config.seats_min, config.seats_max
+    for _ in range(config.events):
+        if config.seat_distribution == "lognormal":
+            median = math.sqrt(max(low, 1) * high)
+            yield min(high, max(low, int(rng.lognormvariate(math.log(median), 0.75))))
+        else:
+            yield rng.randint(low, high)
+
+def generate_dataset(bind: Union[Engine, Connection], config: Optional[DatasetConfig] = None) -> dict:
+    """
+    Appends a deterministic synthetic dataset (same config and seed, same rows) to the
+    database and returns the number of rows written per table. Ids are assigned up front
+    so rows can be streamed without RETURNING; PostgreSQL sequences are advanced afterwards.
+    """
+    config = config or DatasetConfig()
+    if isinstance(bind, Engine):
+        with bind.connect() as conn:
+            return generate_dataset(conn, config)
+
+    conn = bind
+    rng = random.Random(config.seed)
+    writer = _TableWriter(conn, config.batch_size)
+    counts = {}
+
+    first_user = _next_id(conn, User)
+    counts["users"] = writer.write(User.__table__, ["id", "email", "username", "role"], (
+        (first_user + i, f"user{first_user + i}@example.com", f"user{first_user + i}", "user")
+        for i in range(config.users)
+    ))
+    user_ids = range(first_user, first_user + config.users)
+
+    first_event = _next_id(conn, Event)
+    event_plans = []
+    event_rows = []
+    for i, seat_count in enumerate(_seat_counts(config, rng)):
+        start = config.start_date + dt.timedelta(seconds=rng.randrange(config.days * 86400))
+        event_rows.append((first_event + i, f"Event {first_event + i}", rng.choice(VENUES), start, start + dt.timedelta(hours=rng.randint(2, 8))))
+        event_plans.append((first_event + i, start, seat_count))
+    counts["events"] = writer.write(Event.__table__, ["id", "name", "venue", "start_time", "end_time"], event_rows)
+
+    first_seat = _next_id(conn, Seat)
+
+    def seat_rows():
+        seat_id = first_seat
+        for event_id, _, seat_count in event_plans:
+            for number in range(1, seat_count + 1):
+                yield (seat_id, event_id, f"Seat-{number}")
+                seat_id += 1
+    counts["seats"] = writer.write(Seat.__table__, ["id", "event_id", "seat_number"], seat_rows())
+
+    first_booking = _next_id(conn, Booking)
+    window = config.booking_window_days * 86400
+    # event_id -> users holding its bookings, for the events that end up with every seat
+    # actively booked; only those get a waitlist.
+    full_events = {}
+
+    def booking_rows():
+        booking_id = first_booking
+        seat_offset = first_seat
+        for event_id, start, seat_count in event_plans:
+            booked = int(seat_count * config.booking_ratio) if config.users else 0
+            bookers, full = set(), seat_count > 0 and booked == seat_count
+            for seat_index in rng.sample(range(seat_count), booked):
+                status = "cancelled" if rng.random() < config.cancellation_ratio else "active"
+                created_at = start - dt.timedelta(seconds=rng.randrange(1, window))
+                user_id = rng.choice(user_ids)
+                full = full and status == "active"
+                if full:
+                    bookers.add(user_id)
+                yield (booking_id, user_id, event_id, seat_offset + seat_index, status, created_at)
+                booking_id += 1
+            if full:
+                full_events[event_id] = bookers
+            seat_offset += seat_count
+    counts["bookings"] = writer.write(Booking.__table__, ["id", "user_id", "event_id", "seat_id", "status", "created_at"], booking_rows())
+
+    first_entry = _next_id(conn, WaitlistEntry)
+
+    def waitlist_rows():
+        entry_id = first_entry
+        for event_id, start, seat_count in event_plans:
+            if event_id not in full_events:
+                continue
+            candidates = [user_id for user_id in user_ids if user_id not in full_events[event_id]]
+            waitlisted = min(int(seat_count * config.waitlist_ratio), len(candidates))
+            for user_id in rng.sample(candidates, waitlisted):
+                yield (entry_id, user_id, event_id, start - dt.timedelta(seconds=rng.randrange(1, window)))
+                entry_id += 1
+    counts["waitlist_entries"] = writer.write(WaitlistEntry.__table__, ["id", "user_id", "event_id", "created_at"], waitlist_rows())
+
+    if conn.dialect.name == "postgresql":
+        for model in (User, Event, Seat, Booking, WaitlistEntry):
+            table = model.__tablename__
+            conn.execute(text(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), coalesce(max(id), 1)) FROM {table}"))
+        conn.commit()
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed the database with sample data, or generate a large synthetic dataset with --generate.")
+    parser.add_argument("--generate", action="store_true", help="Generate a synthetic dataset instead of the sample data")
+    defaults = DatasetConfig()
+    parser.add_argument("--users", type=int, default=defaults.users)
+    parser.add_argument("--events", type=int, default=defaults.events)
+    parser.add_argument("--seats-min", type=int, default=defaults.seats_min)
+    parser.add_argument("--seats-max", type=int, default=defaults.seats_max)
+    parser.add_argument("--seat-distribution", choices=["uniform", "lognormal"], default=defaults.seat_distribution)
+    parser.add_argument("--booking-ratio", type=float, default=defaults.booking_ratio)
+    parser.add_argument("--cancellation-ratio", type=float, default=defaults.cancellation_ratio)
+    parser.add_argument("--waitlist-ratio", type=float, default=defaults.waitlist_ratio)
+    parser.add_argument("--start-date", type=dt.datetime.fromisoformat, default=defaults.start_date)
+    parser.add_argument("--days", type=int, default=defaults.days)
+    parser.add_argument("--booking-window-days", type=int, default=defaults.booking_window_days)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--batch-size", type=int, default=defaults.batch_size)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if not args.generate:
+        seed_data()
+        return
+
+    config = DatasetConfig(
+        users=args.users,
+        events=args.events,
+        seats_min=args.seats_min,
+        seats_max=args.seats_max,
+        seat_distribution=args.seat_distribution,
+        booking_ratio=args.booking_ratio,
+        cancellation_ratio=args.cancellation_ratio,
+        waitlist_ratio=args.waitlist_ratio,
+        start_date=args.start_date,
+        days=args.days,
+        booking_window_days=args.booking_window_days,
+        seed=args.seed,
+        batch_size=args.batch_size,
+    )
+    engine = get_engine()
+    Base.metadata.create_all(bind=engine)
+    started = time.perf_counter()
+    counts = generate_dataset(engine, config)
+    logger.info("Generated %s in %.1fs", counts, time.perf_counter() - started)
+
 if __name__ == "__main__":
-    seed_data()
+    main()
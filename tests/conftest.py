@@ -1,3 +1,4 @@
+import os
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
@@ -5,11 +6,16 @@ from sqlalchemy.orm import sessionmaker, Session
 from alembic.config import Config
 from alembic import command
 
+SQLALCHEMY_DATABASE_URL = "sqlite:///file:memdb1?mode=memory&cache=shared&uri=true"
+os.environ.setdefault("DATABASE_URL", SQLALCHEMY_DATABASE_URL)
+os.environ.setdefault("TASK_MODE", "inline")
+
 from app.main import app
-from app.database import get_db
+from app.identity import user_cache
+from app.availability import seat_map_cache
+from app.database import get_db, get_read_db
 from app.models import User
-
-SQLALCHEMY_DATABASE_URL = "sqlite:///file:memdb1?mode=memory&cache=shared&uri=true"
+from seed import DatasetConfig, generate_dataset
 
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
@@ -25,6 +31,7 @@ def setup_test_database():
         alembic_cfg.attributes["connection"] = connection
 
         command.upgrade(alembic_cfg, "head")
+        seat_map_cache.clear()
 
         db_session = TestingSessionLocal(bind=connection)
         try:
@@ -47,11 +54,25 @@ def db(setup_test_database) -> Session:
         db_session.close()
 
 
+@pytest.fixture(scope="function")
+def synthetic_dataset(setup_test_database):
+    """
+    Returns a function that appends a synthetic dataset (see seed.DatasetConfig) to the test database.
+    """
+    def generate(**overrides):
+        return generate_dataset(setup_test_database, DatasetConfig(**overrides))
+    return generate
+
+
 @pytest.fixture(scope="function")
 def client(db: Session):
     def override_get_db():
         yield db
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.state.rate_limit_store.clear()
+    user_cache.clear()
+    seat_map_cache.clear()
     yield TestClient(app)
     app.dependency_overrides.clear()
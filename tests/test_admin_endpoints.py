@@ -1,15 +1,17 @@
+import pytest
+from fastapi import HTTPException
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
-from app import services, schemas
+from app import models, services, schemas
 
 def test_admin_access_denied(client: TestClient):
-    response = client.get("/admin/analytics", headers={"X-User-Role": "user"})
+    response = client.get("/admin/analytics", headers={"X-User-ID": "1"})
     assert response.status_code == 403
 
 def test_create_event_by_admin_generates_seats(client: TestClient, db: Session):
     response = client.post(
         "/admin/events",
-        headers={"X-User-Role": "admin"},
+        headers={"X-User-ID": "2"},
         json={
             "name": "Admin Created Event",
             "venue": "Admin Venue",
@@ -29,7 +31,7 @@ def test_update_event_details_by_admin(client: TestClient, db: Session):
 
     response = client.put(
         f"/admin/events/{event.id}",
-        headers={"X-User-Role": "admin"},
+        headers={"X-User-ID": "2"},
         json={
             "name": "Updated Name",
             "venue": "Updated Venue",
@@ -41,14 +43,14 @@ def test_update_event_details_by_admin(client: TestClient, db: Session):
     assert response.status_code == 200
     data = response.json()
     assert data["name"] == "Updated Name"
-    assert len(data["seats"]) == 5
+    assert len(data["seats"]) == 10
 
 def test_delete_event_with_no_bookings(client: TestClient, db: Session):
     event = services.create_event(db, schemas.EventCreate(name="To Be Deleted", venue="Nowhere", start_time="2026-01-01T10:00:00", end_time="2026-01-01T12:00:00", total_seats=1))
 
     response = client.delete(
         f"/admin/events/{event.id}",
-        headers={"X-User-Role": "admin"}
+        headers={"X-User-ID": "2"}
     )
     assert response.status_code == 200
     assert response.json()["detail"] == "Event deleted successfully"
@@ -60,7 +62,7 @@ def test_cannot_delete_event_with_active_bookings(client: TestClient, db: Sessio
 
     response = client.delete(
         f"/admin/events/{event.id}",
-        headers={"X-User-Role": "admin"}
+        headers={"X-User-ID": "2"}
     )
     assert response.status_code == 400
     assert response.json()["detail"] == "Cannot delete event with active bookings"
@@ -72,7 +74,7 @@ def test_get_analytics_with_seat_data(client: TestClient, db: Session):
 
     response = client.get(
         "/admin/analytics",
-        headers={"X-User-Role": "admin"}
+        headers={"X-User-ID": "2"}
     )
     assert response.status_code == 200
     data = response.json()
@@ -83,3 +85,192 @@ def test_get_analytics_with_seat_data(client: TestClient, db: Session):
     assert utilization_data["total_seats"] == 10
     assert utilization_data["booked_seats"] == 1
     assert utilization_data["utilization"] == 0.1
+
+def _seats(db: Session, event_name: str):
+    return db.query(models.Seat).join(models.Event).filter(models.Event.name == event_name).order_by(models.Seat.id).all()
+
+def test_bulk_import_events_reports_bad_rows(client: TestClient, db: Session):
+    body = "\n".join([
+        '{"name": "Imported 1", "venue": "Hall", "start_time": "2026-01-01T10:00:00", "end_time": "2026-01-01T12:00:00", "total_seats": 3}',
+        '{"name": "Missing seats", "venue": "Hall", "start_time": "2026-01-01T10:00:00", "end_time": "2026-01-01T12:00:00"}',
+        'not json',
+        '{"name": "Imported 2", "venue": "Hall", "start_time": "2026-01-02T10:00:00", "end_time": "2026-01-02T12:00:00", "seat_numbers": ["A1", "A2"]}',
+    ])
+    response = client.post("/admin/events/import?chunk_size=1", headers={"X-User-ID": "2"}, content=body)
+    assert response.status_code == 200
+    report = response.json()
+    assert report["imported"] == 2
+    assert report["failed"] == 2
+    assert [e["line"] for e in report["errors"]] == [2, 3]
+
+    assert len(_seats(db, "Imported 1")) == 3
+    assert [s.seat_number for s in _seats(db, "Imported 2")] == ["A1", "A2"]
+
+def test_bulk_import_events_from_csv(client: TestClient, db: Session):
+    body = (
+        "name,venue,start_time,end_time,total_seats,seat_numbers\n"
+        "CSV Event,Arena,2026-03-01T18:00:00,2026-03-01T21:00:00,4,\n"
+        "Layout Event,Arena,2026-03-02T18:00:00,2026-03-02T21:00:00,,B1;B2\n"
+        "Bad Date,Arena,tomorrow,2026-03-02T21:00:00,4,\n"
+    )
+    response = client.post("/admin/events/import?format=csv", headers={"X-User-ID": "2"}, content=body)
+    report = response.json()
+    assert report["imported"] == 2
+    assert report["errors"][0]["line"] == 4
+
+    assert len(_seats(db, "CSV Event")) == 4
+    assert len(_seats(db, "Layout Event")) == 2
+
+def test_bulk_import_lays_out_seats_in_rows(client: TestClient, db: Session):
+    body = (
+        "name,venue,start_time,end_time,total_seats,seat_numbers,seats_per_row\n"
+        "Rows Event,Arena,2026-03-01T18:00:00,2026-03-01T21:00:00,3,,2\n"
+        "Named Rows,Arena,2026-03-02T18:00:00,2026-03-02T21:00:00,,A1;A2;B1,2\n"
+    )
+    response = client.post("/admin/events/import?format=csv", headers={"X-User-ID": "2"}, content=body)
+    assert response.json()["imported"] == 2
+
+    layout = lambda name: [(s.seat_number, s.row_number, s.position) for s in _seats(db, name)]
+    assert layout("Rows Event") == [("Seat-1", 1, 1), ("Seat-2", 1, 2), ("Seat-3", 2, 1)]
+    assert layout("Named Rows") == [("A1", 1, 1), ("A2", 1, 2), ("B1", 2, 1)]
+
+def test_bulk_import_csv_quoted_fields_may_span_lines(client: TestClient, db: Session):
+    body = (
+        "name,venue,start_time,end_time,total_seats\n"
+        '"Gala ""Night""","Main Hall\n2nd floor",2026-03-01T18:00:00,2026-03-01T21:00:00,2\n'
+        "Bad Date,Arena,tomorrow,2026-03-02T21:00:00,4\n"
+        '"Unterminated,Arena,2026-03-02T18:00:00,2026-03-02T21:00:00,4\n'
+    )
+    response = client.post("/admin/events/import?format=csv", headers={"X-User-ID": "2"}, content=body)
+    report = response.json()
+    assert report["imported"] == 1
+    assert [(e["line"], e["error"]) for e in report["errors"]][1] == (5, "unterminated quoted field")
+    assert report["errors"][0]["line"] == 4
+
+    event = next(e for e in client.get("/events").json() if e["name"] == 'Gala "Night"')
+    assert event["venue"] == "Main Hall\n2nd floor"
+
+def _resize(client: TestClient, event, total_seats: int):
+    return client.put(
+        f"/admin/events/{event.id}",
+        headers={"X-User-ID": "2"},
+        json={"name": event.name, "venue": event.venue, "start_time": "2026-01-01T10:00:00", "end_time": "2026-01-01T12:00:00", "total_seats": total_seats}
+    )
+
+def test_growing_event_lays_out_new_seats_without_touching_the_event(db: Session):
+    event = services.create_event(db, schemas.EventCreate(name="Rows", venue="Venue", start_time="2026-01-01T10:00:00", end_time="2026-01-01T12:00:00", total_seats=1))
+
+    updated = services.update_event(db, event.id, schemas.EventCreate(
+        name="Rows", venue="Venue", start_time="2026-01-01T10:00:00", end_time="2026-01-01T12:00:00", total_seats=3, seats_per_row=2
+    ))
+
+    assert "seats_per_row" not in vars(updated)
+    new_seats = db.query(models.Seat).filter_by(event_id=event.id).order_by(models.Seat.id).all()[1:]
+    assert [(s.row_number, s.position) for s in new_seats] == [(1, 1), (1, 2)]
+
+def test_growing_event_promotes_waitlist(client: TestClient, db: Session):
+    db.add(models.User(id=3, email="waiting@example.com", username="waiting"))
+    db.commit()
+    event = services.create_event(db, schemas.EventCreate(name="Growing Event", venue="Venue", start_time="2026-01-01T10:00:00", end_time="2026-01-01T12:00:00", total_seats=1))
+    services.create_booking(db, schemas.BookingCreate(user_id=1, event_id=event.id))
+    for user_id in (2, 3):
+        client.post("/bookings", headers={"X-User-ID": str(user_id)}, json={"user_id": user_id, "event_id": event.id})
+    assert db.query(models.WaitlistEntry).filter_by(event_id=event.id).count() == 2
+
+    response = _resize(client, event, 2)
+    assert response.status_code == 200
+    assert [s["seat_number"] for s in response.json()["seats"]] == ["Seat-1", "Seat-2"]
+
+    promoted = db.query(models.Booking).filter_by(event_id=event.id, user_id=2, status="active").one()
+    assert promoted.seat.seat_number == "Seat-2"
+    assert [e.user_id for e in db.query(models.WaitlistEntry).filter_by(event_id=event.id)] == [3]
+    assert db.query(models.Notification).filter_by(user_id=2).count() == 1
+
+def test_shrinking_event_removes_only_free_seats(client: TestClient, db: Session):
+    event = services.create_event(db, schemas.EventCreate(name="Shrinking Event", venue="Venue", start_time="2026-01-01T10:00:00", end_time="2026-01-01T12:00:00", total_seats=4))
+    services.create_booking(db, schemas.BookingCreate(user_id=1, event_id=event.id, seat_number="Seat-4"))
+    cancelled = services.create_booking(db, schemas.BookingCreate(user_id=1, event_id=event.id, seat_number="Seat-3"))
+    cancelled_id = cancelled.id
+    services.cancel_booking(db, booking_id=cancelled_id, user_id=1)
+
+    response = _resize(client, event, 2)
+    assert response.status_code == 200
+    assert [s["seat_number"] for s in response.json()["seats"]] == ["Seat-1", "Seat-4"]
+    assert db.query(models.ArchivedBooking).filter_by(id=cancelled_id).count() == 1
+
+    response = _resize(client, event, 0)
+    assert response.status_code == 400
+    assert db.query(models.Seat).filter_by(event_id=event.id).count() == 2
+
+def test_cancel_event_cancels_bookings_and_notifies_each_user_once(client: TestClient, db: Session):
+    users = [models.User(email=f"attendee{i}@example.com", username=f"attendee{i}") for i in range(4)]
+    db.add_all(users)
+    db.commit()
+    event = services.create_event(db, schemas.EventCreate(name="Called Off", venue="Arena", start_time="2026-06-01T19:00:00", end_time="2026-06-01T22:00:00", total_seats=3))
+    for user_id in (users[0].id, users[0].id, users[1].id):
+        services.create_booking(db, schemas.BookingCreate(user_id=user_id, event_id=event.id))
+    db.add_all([models.WaitlistEntry(user_id=users[2].id, event_id=event.id), models.WaitlistEntry(user_id=users[3].id, event_id=event.id)])
+    db.commit()
+
+    response = client.post(f"/admin/events/{event.id}/cancel?chunk_size=2", headers={"X-User-ID": "2"})
+    assert response.status_code == 200
+    assert response.json() == {"event_id": event.id, "cancelled_bookings": 3, "removed_waitlist_entries": 2, "notified_users": 4}
+
+    assert db.query(models.Booking).filter_by(event_id=event.id, status="active").count() == 0
+    assert db.query(models.WaitlistEntry).filter_by(event_id=event.id).count() == 0
+    assert db.query(models.Notification).filter_by(user_id=users[0].id).count() == 1
+    notice = db.query(models.Notification).filter_by(user_id=users[3].id).one()
+    assert "has been cancelled" in notice.message
+    assert (notice.event_id, notice.kind) == (event.id, services.EVENT_CANCELLED_NOTICE)
+
+    response = client.post("/bookings", headers={"X-User-ID": str(users[0].id)}, json={"user_id": users[0].id, "event_id": event.id})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Event has been cancelled"
+
+    response = client.get("/events", params={"available": True})
+    assert event.id not in [e["id"] for e in response.json()]
+    assert client.post("/admin/events/999999/cancel", headers={"X-User-ID": "2"}).status_code == 404
+
+@pytest.mark.parametrize("strategy", ["pessimistic", "optimistic"])
+def test_booking_insert_rechecks_the_cancelled_flag(db: Session, monkeypatch, strategy):
+    event = services.create_event(db, schemas.EventCreate(name="Cancelled Meanwhile", venue="Arena", start_time="2026-06-01T19:00:00", end_time="2026-06-01T22:00:00", total_seats=2, seats_per_row=2))
+    event_id = event.id
+    # The cancellation commits after the booking's early check has passed.
+    monkeypatch.setattr(services, "_check_event_not_cancelled", lambda db, event_id: None)
+    event.is_cancelled = True
+    db.commit()
+
+    with pytest.raises(HTTPException) as exc_info:
+        services.create_booking(db, schemas.BookingCreate(user_id=1, event_id=event_id), strategy=strategy)
+    assert exc_info.value.detail == "Event has been cancelled"
+    with pytest.raises(HTTPException) as exc_info:
+        services.create_group_booking(db, schemas.GroupBookingCreate(user_id=1, event_id=event_id, quantity=2), strategy=strategy)
+    assert exc_info.value.detail == "Event has been cancelled"
+    assert db.query(models.Booking).filter_by(event_id=event_id).count() == 0
+
+def test_rerunning_an_interrupted_cancellation_does_not_notify_twice(db: Session, monkeypatch):
+    event = services.create_event(db, schemas.EventCreate(name="Interrupted", venue="Arena", start_time="2026-06-01T19:00:00", end_time="2026-06-01T22:00:00", total_seats=2))
+    for _ in range(2):
+        services.create_booking(db, schemas.BookingCreate(user_id=1, event_id=event.id))
+
+    mark_seats_changed = services.mark_seats_changed
+    chunks = []
+
+    def crash_on_second_chunk(session, event_id):
+        chunks.append(event_id)
+        if len(chunks) == 2:
+            raise RuntimeError("worker killed")
+        mark_seats_changed(session, event_id)
+
+    monkeypatch.setattr(services, "mark_seats_changed", crash_on_second_chunk)
+    try:
+        services.cancel_event(db, event.id, chunk_size=1)
+    except RuntimeError:
+        db.rollback()
+    assert db.query(models.Booking).filter_by(event_id=event.id, status="active").count() == 1
+
+    monkeypatch.setattr(services, "mark_seats_changed", mark_seats_changed)
+    report = services.cancel_event(db, event.id, chunk_size=1)
+    assert report["cancelled_bookings"] == 1
+    assert db.query(models.Booking).filter_by(event_id=event.id, status="active").count() == 0
+    assert db.query(models.Notification).filter_by(user_id=1).count() == 1
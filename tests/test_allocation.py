@@ -0,0 +1,111 @@
+import random
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app import models, schemas, services
+from app.allocation import FreeIntervalIndex
+
+def layout(rows: int, per_row: int, booked=()):
+    # seat id = (row - 1) * per_row + position
+    return [
+        ((row - 1) * per_row + position, row, position, (row - 1) * per_row + position not in booked)
+        for row in range(1, rows + 1) for position in range(1, per_row + 1)
+    ]
+
+def test_best_block_prefers_the_smallest_run_that_fits():
+    # Row 1: 1-2 free, 3 booked, 4-10 free. Row 2: 11-13 free, 14 booked, 15-20 free.
+    index = FreeIntervalIndex(layout(2, 10, booked={3, 14}))
+    assert index.best_block(2) == [1, 2]
+    assert index.best_block(3) == [11, 12, 13]
+    assert index.best_block(7) == [4, 5, 6, 7, 8, 9, 10]
+    assert index.best_block(8) is None
+
+def test_occupy_and_release_split_and_merge_runs():
+    index = FreeIntervalIndex(layout(1, 5))
+    index.occupy(3)
+    assert index.best_block(3) is None
+    assert index.best_block(2) == [1, 2]
+    index.occupy(3)
+    index.release(3)
+    index.release(3)
+    assert index.best_block(5) == [1, 2, 3, 4, 5]
+
+def test_index_matches_a_brute_force_scan():
+    rng = random.Random(7)
+    seats = layout(8, 30)
+    index = FreeIntervalIndex(seats)
+    free = {seat_id for seat_id, _, _, _ in seats}
+
+    for _ in range(2000):
+        seat_id = rng.randint(1, 240)
+        if seat_id in free:
+            index.occupy(seat_id)
+            free.discard(seat_id)
+        else:
+            index.release(seat_id)
+            free.add(seat_id)
+
+        count = rng.randint(1, 6)
+        block = index.best_block(count)
+        runs = []
+        for row in range(8):
+            run = []
+            for seat_id in range(row * 30 + 1, row * 30 + 31):
+                if seat_id in free:
+                    run.append(seat_id)
+                elif run:
+                    runs.append(run)
+                    run = []
+            if run:
+                runs.append(run)
+        fitting = [run for run in runs if len(run) >= count]
+        if not fitting:
+            assert block is None
+        else:
+            best = min(fitting, key=lambda run: (len(run), run[0]))
+            assert block == best[:count]
+
+def make_event(db: Session, total_seats: int, seats_per_row: int):
+    return services.create_event(db, schemas.EventCreate(
+        name="Theatre Night", venue="Theatre", start_time="2026-01-01T19:00:00", end_time="2026-01-01T22:00:00",
+        total_seats=total_seats, seats_per_row=seats_per_row
+    ))
+
+def test_group_booking_gets_adjacent_seats(client: TestClient, db: Session):
+    event = make_event(db, total_seats=12, seats_per_row=4)
+    services.create_booking(db, schemas.BookingCreate(user_id=1, event_id=event.id, seat_number="Seat-2"))
+
+    response = client.post("/bookings/group", headers={"X-User-ID": "2"}, json={"user_id": 2, "event_id": event.id, "quantity": 3})
+    assert response.status_code == 201
+    seats = db.query(models.Seat).filter(models.Seat.id.in_([b["seat_id"] for b in response.json()])).order_by(models.Seat.position).all()
+    # Row 1 only has a run of 2 after Seat-2, so the group goes to the start of row 2.
+    assert [(seat.row_number, seat.position) for seat in seats] == [(2, 1), (2, 2), (2, 3)]
+
+    response = client.post("/bookings/group", headers={"X-User-ID": "2"}, json={"user_id": 2, "event_id": event.id, "quantity": 5})
+    assert response.status_code == 400
+
+def test_group_booking_retries_when_the_cached_block_was_taken(client: TestClient, db: Session):
+    event = make_event(db, total_seats=4, seats_per_row=2)
+    client.get(f"/events/{event.id}/availability")
+
+    # Booked behind the cache's back, as another worker would.
+    seat = db.query(models.Seat).filter_by(event_id=event.id, seat_number="Seat-1").one()
+    db.execute(models.Booking.__table__.insert().values(user_id=1, event_id=event.id, seat_id=seat.id, status="active"))
+    db.commit()
+
+    response = client.post("/bookings/group", headers={"X-User-ID": "2"}, json={"user_id": 2, "event_id": event.id, "quantity": 2})
+    assert response.status_code == 201
+    assert len(response.json()) == 2
+    assert seat.id not in {b["seat_id"] for b in response.json()}
+
+def test_growing_an_event_continues_its_rows(client: TestClient, db: Session):
+    event = make_event(db, total_seats=6, seats_per_row=4)
+    response = client.put(
+        f"/admin/events/{event.id}",
+        headers={"X-User-ID": "2"},
+        json={"name": event.name, "venue": event.venue, "start_time": "2026-01-01T19:00:00", "end_time": "2026-01-01T22:00:00", "total_seats": 9}
+    )
+    assert response.status_code == 200
+    layout = [(s["row_number"], s["position"]) for s in sorted(response.json()["seats"], key=lambda s: s["id"])]
+    assert layout[6:] == [(2, 3), (2, 4), (3, 1)]
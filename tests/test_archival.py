@@ -0,0 +1,62 @@
+import datetime as dt
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app import archival, models, services, schemas
+
+def test_archive_finished_event_moves_seats_bookings_and_waitlist(client: TestClient, db: Session):
+    past = services.create_event(db, schemas.EventCreate(name="Past Event", venue="Venue", start_time="2020-01-01T10:00:00", end_time="2020-01-01T12:00:00", total_seats=1, seats_per_row=1))
+    upcoming = services.create_event(db, schemas.EventCreate(name="Upcoming Event", venue="Venue", start_time="2099-01-01T10:00:00", end_time="2099-01-01T12:00:00", total_seats=2))
+    services.create_booking(db, schemas.BookingCreate(user_id=1, event_id=past.id))
+    db.add(models.WaitlistEntry(user_id=2, event_id=past.id))
+    db.commit()
+    services.create_booking(db, schemas.BookingCreate(user_id=1, event_id=upcoming.id))
+    past_id, upcoming_id = past.id, upcoming.id
+
+    assert archival.archive_finished_events(db, batch_size=1) == 1
+
+    assert db.query(models.Event).filter_by(id=past_id).first() is None
+    assert db.query(models.Seat).filter_by(event_id=past_id).count() == 0
+    assert db.query(models.Booking).filter_by(event_id=past_id).count() == 0
+    assert db.query(models.WaitlistEntry).filter_by(event_id=past_id).count() == 0
+    assert db.query(models.ArchivedEvent).filter_by(id=past_id).one().name == "Past Event"
+    archived_seat = db.query(models.ArchivedSeat).filter_by(event_id=past_id).one()
+    assert (archived_seat.seat_number, archived_seat.row_number, archived_seat.position, archived_seat.version) == ("Seat-1", 1, 1, 1)
+    assert db.query(models.ArchivedBooking).filter_by(event_id=past_id).count() == 1
+    assert db.query(models.ArchivedWaitlistEntry).filter_by(event_id=past_id).count() == 1
+    assert db.query(models.Booking).filter_by(event_id=upcoming_id).count() == 1
+
+    data = client.get("/admin/analytics", headers={"X-User-ID": "2"}).json()
+    assert data["total_bookings_all_time"] == 1
+    assert [e["event_id"] for e in data["capacity_utilization_per_event"]] == [upcoming_id]
+
+    data = client.get("/admin/analytics?include_archived=true", headers={"X-User-ID": "2"}).json()
+    assert data["total_bookings_all_time"] == 2
+    archived_event = next(e for e in data["capacity_utilization_per_event"] if e["event_id"] == past_id)
+    assert archived_event["booked_seats"] == 1
+    assert archived_event["utilization"] == 1
+
+def test_archive_cancelled_bookings(db: Session):
+    event = services.create_event(db, schemas.EventCreate(name="Event", venue="Venue", start_time="2099-01-01T10:00:00", end_time="2099-01-01T12:00:00", total_seats=3))
+    kept = services.create_booking(db, schemas.BookingCreate(user_id=1, event_id=event.id))
+    cancelled = [services.create_booking(db, schemas.BookingCreate(user_id=1, event_id=event.id)) for _ in range(2)]
+    for booking in cancelled:
+        services.cancel_booking(db, booking_id=booking.id, user_id=1)
+
+    moved = archival.archive_cancelled_bookings(db, cancelled_before=dt.datetime.utcnow() + dt.timedelta(seconds=1), batch_size=1)
+
+    assert moved == 2
+    assert [b.id for b in db.query(models.Booking).all()] == [kept.id]
+    assert db.query(models.ArchivedBooking).filter_by(status='cancelled').count() == 2
+
+def test_archived_event_keeps_its_cancelled_flag(client: TestClient, db: Session):
+    event = services.create_event(db, schemas.EventCreate(name="Called Off", venue="Venue", start_time="2020-01-01T10:00:00", end_time="2020-01-01T12:00:00", total_seats=1))
+    services.create_booking(db, schemas.BookingCreate(user_id=1, event_id=event.id))
+    event_id = event.id
+    services.cancel_event(db, event_id)
+
+    assert archival.archive_finished_events(db) == 1
+
+    assert db.query(models.ArchivedEvent).filter_by(id=event_id).one().is_cancelled is True
+    assert db.query(models.ArchivedBooking).filter_by(event_id=event_id).one().status == 'cancelled'
+    assert client.get("/users/me/bookings?status=all", headers={"X-User-ID": "1"}).json() == []
@@ -0,0 +1,82 @@
+import base64
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app import availability, schemas, services
+from app.availability import SeatMapCache
+
+def free_ordinals(response) -> list:
+    data = response.json()
+    bitmap = base64.b64decode(data["bitmap"])
+    return [i for i in range(data["seat_count"]) if bitmap[i // 8] & (0x80 >> (i % 8))]
+
+def make_event(db: Session, total_seats: int):
+    return services.create_event(db, schemas.EventCreate(name="Stadium", venue="Arena", start_time="2026-01-01T19:00:00", end_time="2026-01-01T22:00:00", total_seats=total_seats))
+
+def test_availability_bitmap_follows_bookings_without_reloading(client: TestClient, db: Session, monkeypatch):
+    event = make_event(db, 10)
+    services.create_booking(db, schemas.BookingCreate(user_id=1, event_id=event.id, seat_number="Seat-3"))
+
+    loads = []
+    build = availability.build_seat_map
+    monkeypatch.setattr(availability, "build_seat_map", lambda *args: loads.append(args) or build(*args))
+
+    response = client.get(f"/events/{event.id}/availability")
+    assert response.status_code == 200
+    assert response.json()["available"] == 9
+    assert free_ordinals(response) == [0, 1, 3, 4, 5, 6, 7, 8, 9]
+
+    booked = client.post("/bookings", headers={"X-User-ID": "2"}, json={"user_id": 2, "event_id": event.id, "seat_number": "Seat-10"})
+    assert booked.status_code == 201
+    assert free_ordinals(client.get(f"/events/{event.id}/availability")) == [0, 1, 3, 4, 5, 6, 7, 8]
+
+    client.delete(f"/bookings/{booked.json()['id']}", headers={"X-User-ID": "2"})
+    response = client.get(f"/events/{event.id}/availability")
+    assert response.json()["available"] == 9
+    assert len(loads) == 1
+
+    binary = client.get(f"/events/{event.id}/availability", params={"format": "binary"})
+    assert binary.content == base64.b64decode(response.json()["bitmap"])
+    assert binary.headers["X-Seat-Map-Version"] == response.json()["version"]
+
+def test_manifest_is_versioned_and_changes_with_the_seats(client: TestClient, db: Session):
+    event = make_event(db, 3)
+
+    response = client.get(f"/events/{event.id}/seats/manifest")
+    assert response.status_code == 200
+    manifest = response.json()
+    assert manifest["seat_numbers"] == ["Seat-1", "Seat-2", "Seat-3"]
+    assert response.headers["ETag"] == f'"{manifest["version"]}"'
+    assert client.get(f"/events/{event.id}/availability").json()["version"] == manifest["version"]
+
+    cached = client.get(f"/events/{event.id}/seats/manifest", headers={"If-None-Match": response.headers["ETag"]})
+    assert cached.status_code == 304
+
+    client.put(
+        f"/admin/events/{event.id}",
+        headers={"X-User-ID": "2"},
+        json={"name": event.name, "venue": event.venue, "start_time": "2026-01-01T19:00:00", "end_time": "2026-01-01T22:00:00", "total_seats": 4}
+    )
+    resized = client.get(f"/events/{event.id}/seats/manifest", headers={"If-None-Match": response.headers["ETag"]})
+    assert resized.status_code == 200
+    assert resized.json()["seat_numbers"] == ["Seat-1", "Seat-2", "Seat-3", "Seat-4"]
+    assert resized.json()["version"] != manifest["version"]
+
+def test_availability_of_unknown_event_is_404(client: TestClient):
+    assert client.get("/events/999/availability").status_code == 404
+    assert client.get("/events/999/seats/manifest").status_code == 404
+
+def test_load_overlapping_a_change_is_not_cached(db: Session, monkeypatch):
+    event = make_event(db, 2)
+    cache = SeatMapCache(maxsize=10, ttl=60)
+    build = availability.build_seat_map
+
+    def build_during_booking(*args):
+        seat_map = build(*args)
+        cache.apply(event.id, seat_map.seat_ids[0], False)
+        return seat_map
+
+    monkeypatch.setattr(availability, "build_seat_map", build_during_booking)
+    assert cache.get(db, event.id).available == 2
+    assert event.id not in cache._entries
@@ -1,47 +1,155 @@
 import threading
-from fastapi.testclient import TestClient
+
 import pytest
-from tests.conftest import engine
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import func, insert, update
+from sqlalchemy.orm import Session
+
+from app import database, models, schemas, services
+from app.availability import seat_map_cache
+from app.config import get_settings
+from app.identity import user_cache
+from app.main import app
+
+NUM_USERS = 12
+
+@pytest.fixture(params=["pessimistic", "optimistic"])
+def booking_strategy(request, monkeypatch):
+    monkeypatch.setattr(get_settings(), "BOOKING_STRATEGY", request.param)
+    return request.param
 
-def book_seat_thread(client: TestClient, event_id: int, seat_number: str, user_id: int, results: list):
-    response = client.post(
-        "/bookings",
-        json={"user_id": user_id, "event_id": event_id, "seat_number": seat_number}
-    )
-    results.append(response.status_code)
+def _reset_engines():
+    for factory in (database.get_engine, database.get_write_engine, database.get_read_engine):
+        factory.cache_clear()
 
-@pytest.mark.skipif(engine.dialect.name == "sqlite", reason="SQLite does not support SELECT FOR UPDATE on seats")
-def test_concurrent_seat_bookings_prevent_overselling(client: TestClient):
-    event_id = 2  
-    seat_to_book = "Seat-1"
-    num_concurrent_requests = 3
+@pytest.fixture
+def concurrent_client(tmp_path, booking_strategy, monkeypatch):
+    """
+    Client on the production database wiring (get_db on the write engine, get_read_db on
+    the primary) pointed at a file-backed SQLite database, so concurrent requests really race.
+    """
+    monkeypatch.setattr(get_settings(), "DATABASE_URL", f"sqlite:///{tmp_path / 'concurrency.db'}")
+    monkeypatch.setattr(get_settings(), "SQLITE_BUSY_TIMEOUT_MS", 10000)
+    _reset_engines()
+    engine = database.get_engine()
+    models.Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(insert(models.User.__table__), [
+            {"id": i, "email": f"user{i}@example.com", "username": f"user{i}", "role": "user"} for i in range(1, NUM_USERS + 1)
+        ])
+    app.state.rate_limit_store.clear()
+    user_cache.clear()
+    seat_map_cache.clear()
+    yield TestClient(app), engine
+    engine.dispose()
+    _reset_engines()
 
+def book_concurrently(client: TestClient, event_id: int, seat_number=None) -> list:
+    barrier = threading.Barrier(NUM_USERS)
     results = []
-    threads = []
 
-    user_ids = [1, 2, 10] 
+    def book(user_id):
+        payload = {"user_id": user_id, "event_id": event_id}
+        if seat_number:
+            payload["seat_number"] = seat_number
+        barrier.wait()
+        results.append(client.post("/bookings", headers={"X-User-ID": str(user_id)}, json=payload).status_code)
 
-    for i in range(num_concurrent_requests):
-        thread = threading.Thread(
-            target=book_seat_thread,
-            args=(client, event_id, seat_to_book, user_ids[i], results)
-        )
-        threads.append(thread)
+    threads = [threading.Thread(target=book, args=(user_id,)) for user_id in range(1, NUM_USERS + 1)]
+    for thread in threads:
         thread.start()
-
     for thread in threads:
         thread.join()
+    return results
+
+def create_event(engine, total_seats: int) -> int:
+    with Session(bind=engine) as db:
+        return services.create_event(db, schemas.EventCreate(
+            name="Hot Event", venue="Arena",
+            start_time="2026-01-01T19:00:00", end_time="2026-01-01T22:00:00",
+            total_seats=total_seats
+        )).id
+
+def test_concurrent_seat_bookings_prevent_overselling(concurrent_client):
+    client, engine = concurrent_client
+    event_id = create_event(engine, total_seats=2)
+
+    results = book_concurrently(client, event_id, seat_number="Seat-1")
+
+    assert results.count(201) == 1, results
+    assert results.count(400) == NUM_USERS - 1, results
+    with Session(bind=engine) as db:
+        active = db.query(func.count(models.Booking.id)).filter(
+            models.Booking.event_id == event_id,
+            models.Booking.status == 'active'
+        ).scalar()
+    assert active == 1
+
+def test_concurrent_any_seat_bookings_fill_the_event_then_waitlist(concurrent_client):
+    client, engine = concurrent_client
+    event_id = create_event(engine, total_seats=5)
+
+    results = book_concurrently(client, event_id)
+
+    assert results.count(201) == 5, results
+    assert results.count(202) == NUM_USERS - 5, results
+    with Session(bind=engine) as db:
+        booked_seats = db.query(models.Booking.seat_id).filter(
+            models.Booking.event_id == event_id,
+            models.Booking.status == 'active'
+        ).all()
+        waitlisted = db.query(func.count(models.WaitlistEntry.id)).filter(models.WaitlistEntry.event_id == event_id).scalar()
+    assert len(set(booked_seats)) == len(booked_seats) == 5
+    assert waitlisted == NUM_USERS - 5
+
+def test_optimistic_booking_retries_after_losing_the_seat(db: Session, monkeypatch):
+    event = services.create_event(db, schemas.EventCreate(name="Contested", venue="Arena", start_time="2026-01-01T19:00:00", end_time="2026-01-01T22:00:00", total_seats=1))
+    check_seat_is_free = services._check_seat_is_free
+    checks = []
+
+    def claimed_by_someone_else_once(db, booking, seat):
+        check_seat_is_free(db, booking, seat)
+        checks.append(seat.id)
+        if len(checks) == 1:
+            db.execute(update(models.Seat).where(models.Seat.id == seat.id).values(version=models.Seat.version + 1).execution_options(synchronize_session=False))
+
+    monkeypatch.setattr(services, "_check_seat_is_free", claimed_by_someone_else_once)
+    booking = services.create_booking(db, schemas.BookingCreate(user_id=1, event_id=event.id, seat_number="Seat-1"), strategy="optimistic")
+    assert booking.status == "active"
+    assert len(checks) == 2
+
+def test_optimistic_booking_gives_up_after_max_retries(db: Session, monkeypatch):
+    event = services.create_event(db, schemas.EventCreate(name="Contested", venue="Arena", start_time="2026-01-01T19:00:00", end_time="2026-01-01T22:00:00", total_seats=1))
+    monkeypatch.setattr(get_settings(), "BOOKING_MAX_RETRIES", 2)
+    attempts = []
+
+    def always_claimed_by_someone_else(db, booking, seat):
+        attempts.append(seat.id)
+        db.execute(update(models.Seat).where(models.Seat.id == seat.id).values(version=models.Seat.version + 1).execution_options(synchronize_session=False))
+
+    monkeypatch.setattr(services, "_check_seat_is_free", always_claimed_by_someone_else)
+    with pytest.raises(HTTPException) as exc_info:
+        services.create_booking(db, schemas.BookingCreate(user_id=1, event_id=event.id, seat_number="Seat-1"), strategy="optimistic")
+    assert exc_info.value.status_code == 409
+    assert len(attempts) == 3
+    assert db.query(models.Booking).count() == 0
 
-    successful_bookings = [res for res in results if res == 201]
-    assert len(successful_bookings) == 1, f"Expected 1 successful booking, but got {len(successful_bookings)}"
+@pytest.mark.parametrize("strategy", ["pessimistic", "optimistic"])
+def test_auto_assigned_seat_taken_by_a_concurrent_booker_is_reallocated(db: Session, monkeypatch, strategy):
+    event = services.create_event(db, schemas.EventCreate(name="Contested", venue="Arena", start_time="2026-01-01T19:00:00", end_time="2026-01-01T22:00:00", total_seats=2))
+    allocated_seat = services._allocated_seat
+    handed_out = []
 
-    failed_bookings = [res for res in results if res == 400]
-    assert len(failed_bookings) == num_concurrent_requests - 1, f"Expected {num_concurrent_requests - 1} failed bookings, but got {len(failed_bookings)}"
+    def same_seat_as_the_first_booker(db, event_id):
+        # Both bookers were allocated a seat before either committed, so they got the same one.
+        seat = handed_out[0] if len(handed_out) == 1 else allocated_seat(db, event_id)
+        handed_out.append(seat)
+        return seat
 
-    response = client.get(f"/events")
-    event_data = next((e for e in response.json() if e["id"] == event_id), None)
-    assert event_data is not None
+    monkeypatch.setattr(services, "_allocated_seat", same_seat_as_the_first_booker)
+    first = services.create_booking(db, schemas.BookingCreate(user_id=1, event_id=event.id), strategy=strategy)
+    second = services.create_booking(db, schemas.BookingCreate(user_id=2, event_id=event.id), strategy=strategy)
 
-    booked_seat = next((s for s in event_data["seats"] if s["seat_number"] == seat_to_book), None)
-    assert booked_seat is not None
-    assert booked_seat["booking_id"] is not None
+    assert handed_out[1].id == first.seat_id
+    assert second.seat_id != first.seat_id
@@ -0,0 +1,57 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app import models
+from app.identity import UserCache
+
+def test_user_cache_hits_skip_the_database(db: Session):
+    cache = UserCache(maxsize=10, ttl=60)
+    statements = []
+
+    def listener(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.get_bind(), "before_cursor_execute", listener)
+    try:
+        assert cache.get(db, 2).role == "admin"
+        assert cache.get(db, 2).role == "admin"
+        assert cache.get(db, 999) is None
+        assert cache.get(db, 999) is None
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", listener)
+    assert len(statements) == 2
+
+def test_unknown_users_are_cached_briefly(db: Session):
+    cache = UserCache(maxsize=10, ttl=60, negative_ttl=0)
+    assert cache.get(db, 999) is None
+    db.add(models.User(id=999, email="late@example.com", username="late"))
+    db.flush()
+
+    assert cache.get(db, 999).id == 999
+
+def test_user_cache_is_bounded_and_expires(db: Session):
+    cache = UserCache(maxsize=1, ttl=0)
+    cache.get(db, 1)
+    cache.get(db, 2)
+    assert list(cache._entries) == [2]
+
+def test_committed_user_change_invalidates_cached_role(client: TestClient, db: Session):
+    assert client.get("/admin/analytics", headers={"X-User-ID": "1"}).status_code == 403
+
+    db.query(models.User).filter_by(id=1).one().role = "admin"
+    db.commit()
+
+    assert client.get("/admin/analytics", headers={"X-User-ID": "1"}).status_code == 200
+
+def test_unknown_user_is_rejected(client: TestClient):
+    assert client.get("/users/me/bookings", headers={"X-User-ID": "999"}).status_code == 401
+    assert client.get("/admin/analytics", headers={"X-User-Role": "admin"}).status_code == 403
+
+def test_booking_requires_the_header_user(client: TestClient):
+    response = client.post("/bookings", json={"user_id": 1, "event_id": 1})
+    assert response.status_code == 401
+    response = client.post("/bookings/group", json={"user_id": 1, "event_id": 1, "quantity": 2})
+    assert response.status_code == 401
+    response = client.post("/bookings", headers={"X-User-ID": "1"}, json={"user_id": 2, "event_id": 1})
+    assert response.status_code == 403
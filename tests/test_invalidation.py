@@ -0,0 +1,126 @@
+import os
+import threading
+import time
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from app import models, schemas, services
+from app.identity import CachedUser, UserCache
+from app.invalidation import InMemoryBackend, InvalidationBus, PostgresBackend, invalidation_bus
+
+# A PostgreSQL database for the LISTEN/NOTIFY tests, which are skipped without one.
+TEST_POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+requires_postgres = pytest.mark.skipif(not TEST_POSTGRES_URL, reason="TEST_POSTGRES_URL is not set")
+
+def test_messages_reach_other_workers_only():
+    backend = InMemoryBackend()
+    worker_a, worker_b = InvalidationBus(backend), InvalidationBus(backend)
+    cache_a, cache_b = UserCache(maxsize=10, ttl=60), UserCache(maxsize=10, ttl=60)
+    for worker, cache in ((worker_a, cache_a), (worker_b, cache_b)):
+        cache.put(7, CachedUser(id=7, role="user"))
+        worker.subscribe("user", lambda user_id, detail, cache=cache: cache.invalidate(user_id))
+
+    worker_a.publish([("user", 7, None)])
+
+    assert cache_a.get(None, 7) == CachedUser(id=7, role="user")
+    assert 7 not in cache_b._entries
+    metrics_a, metrics_b = worker_a.metrics(), worker_b.metrics()
+    assert (metrics_a["published"], metrics_a["ignored_own"], metrics_a["received"]) == (1, 1, 0)
+    assert metrics_b["received"] == 1
+    assert metrics_b["lag_seconds_last"] is not None
+
+def test_large_publishes_are_split_into_bounded_payloads():
+    backend = InMemoryBackend()
+    payloads = []
+    backend.start(payloads.append, lambda: None)
+    InvalidationBus(backend).publish(("event", event_id, [event_id, True]) for event_id in range(2000))
+
+    assert len(payloads) > 1
+    assert all(len(payload) < 8000 for payload in payloads)
+
+def test_committed_changes_are_broadcast(db: Session):
+    peer = InvalidationBus(invalidation_bus.backend)
+    received = []
+    peer.subscribe("user", lambda user_id, detail: received.append(("user", user_id, detail)))
+    peer.subscribe("event", lambda event_id, detail: received.append(("event", event_id, detail)))
+    try:
+        event = services.create_event(db, schemas.EventCreate(
+            name="Broadcast", venue="Hall", start_time="2026-01-01T19:00:00", end_time="2026-01-01T22:00:00",
+            total_seats=1
+        ))
+        received.clear()
+        booking = services.create_booking(db, schemas.BookingCreate(user_id=1, event_id=event.id))
+        assert ("event", event.id, [booking.seat_id, False]) in received
+
+        db.get(models.User, 1).role = "admin"
+        db.commit()
+        assert ("user", 1, None) in received
+    finally:
+        peer.stop()
+
+def test_postgres_backend_stops_with_a_full_queue():
+    backend = PostgresBackend(SimpleNamespace(dialect=SimpleNamespace(name="postgresql")), "unused", max_queue=1)
+    backend.publish("queued")
+    backend.publish("dropped")
+    publisher = threading.Thread(target=backend._send, daemon=True)
+
+    began = time.monotonic()
+    backend.stop(None)
+    assert time.monotonic() - began < 1
+    assert backend.metrics()["dropped"] == 1
+
+    backend._queue.get_nowait()
+    publisher.start()
+    publisher.join(5)
+    assert not publisher.is_alive()
+
+def wait_for(condition, timeout: float = 10.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return condition()
+
+@pytest.fixture
+def postgres_buses():
+    engine = create_engine(TEST_POSTGRES_URL)
+    channel = f"test_invalidation_{uuid.uuid4().hex[:8]}"
+    buses = [InvalidationBus(PostgresBackend(engine, channel)) for _ in range(2)]
+    yield engine, channel, buses
+    for bus in buses:
+        bus.stop()
+    engine.dispose()
+
+@requires_postgres
+def test_postgres_backend_delivers_to_other_workers(postgres_buses):
+    _, _, (sender, receiver) = postgres_buses
+    received = []
+    receiver.subscribe("user", lambda user_id, detail: received.append(user_id))
+    assert wait_for(lambda: sender.metrics()["connected"] and receiver.metrics()["connected"])
+
+    sender.publish([("user", 7, None)])
+
+    assert wait_for(lambda: received == [7])
+    assert wait_for(lambda: sender.metrics()["ignored_own"] == 1)
+
+@requires_postgres
+def test_postgres_listener_reconnects_and_resets(postgres_buses):
+    engine, channel, (_, receiver) = postgres_buses
+    resets = []
+    receiver.on_reset(lambda: resets.append(time.monotonic()))
+    assert wait_for(lambda: receiver.metrics()["connected"])
+    resets.clear()
+
+    with engine.connect() as connection:
+        # Drops the listener connections of both buses.
+        connection.execute(text(
+            "SELECT pg_terminate_backend(pid) FROM pg_stat_activity WHERE query = :listen"
+        ), {"listen": f'LISTEN "{channel}"'})
+
+    assert wait_for(lambda: resets and receiver.metrics()["reconnects"] == 1)
+    assert receiver.metrics()["connected"]
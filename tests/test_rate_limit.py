@@ -0,0 +1,67 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from app.rate_limit import IP_LIMIT_FACTOR, ROUTE_LIMITS, InMemoryBucketStore, RateLimit, RateLimitMiddleware
+
+def test_token_bucket_refills_at_rate():
+    store = InMemoryBucketStore()
+    limit = RateLimit(rate=2, burst=3)
+
+    assert [store.take("k", limit, now=0.0) for _ in range(3)] == [0, 0, 0]
+    assert store.take("k", limit, now=0.0) == 0.5
+    assert store.take("k", limit, now=0.5) == 0
+    assert store.take("other", limit, now=0.5) == 0
+
+def test_notifications_are_rate_limited_per_user(client: TestClient):
+    headers = {"X-User-ID": "1"}
+    statuses = [client.get("/users/me/notifications", headers=headers).status_code for _ in range(11)]
+    assert statuses[:10] == [200] * 10
+
+    response = client.get("/users/me/notifications", headers=headers)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+
+    assert client.get("/users/me/notifications", headers={"X-User-ID": "2"}).status_code == 200
+
+def test_store_evicts_least_recently_used_buckets():
+    store = InMemoryBucketStore(max_keys=2)
+    limit = RateLimit(rate=1, burst=1)
+
+    store.take("a", limit, now=0.0)
+    store.take("b", limit, now=0.0)
+    store.take("a", limit, now=0.0)
+    store.take("c", limit, now=0.0)
+
+    # "b" was least recently used, so it was dropped and starts over with a full bucket.
+    assert store.take("a", limit, now=0.0) > 0
+    assert store.take("b", limit, now=0.0) == 0
+
+def test_rotating_the_user_header_does_not_escape_the_address_limit(client: TestClient):
+    limit = ROUTE_LIMITS[("GET", "/users/me/notifications")]
+    burst = limit.burst * IP_LIMIT_FACTOR
+    # A few extra requests, since the address bucket refills while these run.
+    statuses = [
+        client.get("/users/me/notifications", headers={"X-User-ID": str(1000 + i)}).status_code
+        for i in range(burst + 20)
+    ]
+    assert 429 not in statuses[:burst]
+    assert 429 in statuses[burst:]
+
+def test_user_limit_is_shared_across_addresses():
+    async def ok(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+
+    middleware = RateLimitMiddleware(ok, InMemoryBucketStore(), limits={("GET", "/x"): RateLimit(rate=0.001, burst=2)}, ip_factor=100)
+
+    def status_from(address: str) -> int:
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {"type": "http", "method": "GET", "path": "/x", "client": (address, 1), "headers": [(b"x-user-id", b"1")]}
+        asyncio.run(middleware(scope, None, send))
+        return sent[0]["status"]
+
+    assert [status_from(f"10.0.0.{i}") for i in range(3)] == [200, 200, 429]
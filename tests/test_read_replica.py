@@ -0,0 +1,56 @@
+from collections import OrderedDict
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app import database, models, services, schemas
+
+def test_booking_pins_user_to_primary(db: Session, monkeypatch):
+    monkeypatch.setattr(database, "_primary_pins", OrderedDict())
+    event = services.create_event(db, schemas.EventCreate(name="Pinned Event", venue="Venue", start_time="2025-01-01T19:00:00", end_time="2025-01-01T22:00:00", total_seats=1))
+    assert not database.is_pinned_to_primary(2)
+
+    services.create_booking(db, schemas.BookingCreate(user_id=2, event_id=event.id))
+
+    assert database.is_pinned_to_primary(2)
+
+def test_pin_expires():
+    database.pin_user_to_primary(42, seconds=0)
+    assert not database.is_pinned_to_primary(42)
+    assert not database.is_pinned_to_primary(None)
+
+def test_expired_pins_are_pruned_when_pinning(monkeypatch):
+    monkeypatch.setattr(database, "_primary_pins", OrderedDict())
+    for user_id in range(100):
+        database.pin_user_to_primary(user_id, seconds=0)
+    database.pin_user_to_primary(100)
+
+    assert list(database._primary_pins) == [100]
+
+def test_users_promoted_through_core_inserts_are_pinned(db: Session, monkeypatch):
+    monkeypatch.setattr(database, "_primary_pins", OrderedDict())
+    event = services.create_event(db, schemas.EventCreate(name="Pinned Growth", venue="Venue", start_time="2025-01-01T19:00:00", end_time="2025-01-01T22:00:00", total_seats=1))
+    services.create_booking(db, schemas.BookingCreate(user_id=1, event_id=event.id))
+    with pytest.raises(HTTPException):
+        services.create_booking(db, schemas.BookingCreate(user_id=2, event_id=event.id))
+    assert db.query(models.WaitlistEntry).filter_by(event_id=event.id, user_id=2).count() == 1
+    database._primary_pins.clear()
+
+    services.update_event(db, event.id, schemas.EventCreate(name="Pinned Growth", venue="Venue", start_time="2025-01-01T19:00:00", end_time="2025-01-01T22:00:00", total_seats=2))
+
+    assert database.is_pinned_to_primary(2)
+
+def test_get_read_db_routes_to_replica_unless_pinned(monkeypatch):
+    replica = create_engine("sqlite://")
+    monkeypatch.setattr(database, "get_read_engine", lambda: replica)
+
+    gen = database.get_read_db(x_user_id=77)
+    assert next(gen).get_bind() is replica
+    gen.close()
+
+    database.pin_user_to_primary(77)
+    gen = database.get_read_db(x_user_id=77)
+    assert next(gen).get_bind() is database.get_engine()
+    gen.close()
@@ -0,0 +1,61 @@
+import pytest
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app import models
+
+def test_synthetic_dataset_matches_config(synthetic_dataset, db: Session):
+    counts = synthetic_dataset(users=30, events=6, seats_min=10, seats_max=40, booking_ratio=0.5, waitlist_ratio=0.2, seed=7)
+
+    assert counts["users"] == 30
+    assert db.query(models.User).count() == 32
+    assert db.query(models.Event).count() == counts["events"] == 6
+    assert db.query(models.Seat).count() == counts["seats"]
+    assert db.query(models.Booking).count() == counts["bookings"]
+    assert db.query(models.WaitlistEntry).count() == counts["waitlist_entries"]
+
+    for event in db.query(models.Event).all():
+        seat_count = db.query(models.Seat).filter_by(event_id=event.id).count()
+        assert 10 <= seat_count <= 40
+        assert db.query(models.Booking).filter_by(event_id=event.id).count() == int(seat_count * 0.5)
+
+    # Every booking points at a seat of its own event, and no seat is booked twice.
+    mismatched = db.query(models.Booking).join(models.Seat).filter(models.Seat.event_id != models.Booking.event_id).count()
+    assert mismatched == 0
+    max_per_seat = db.query(func.count(models.Booking.id)).group_by(models.Booking.seat_id).order_by(func.count(models.Booking.id).desc()).first()[0]
+    assert max_per_seat == 1
+
+def test_synthetic_dataset_is_deterministic(synthetic_dataset, db: Session):
+    synthetic_dataset(users=10, events=3, seed=3)
+    first = [(b.user_id, b.seat_id - db.query(func.min(models.Seat.id)).scalar(), b.status) for b in db.query(models.Booking).order_by(models.Booking.id)]
+    db.query(models.WaitlistEntry).delete()
+    db.query(models.Booking).delete()
+    db.query(models.Seat).delete()
+    db.query(models.Event).delete()
+    db.query(models.User).filter(models.User.id > 2).delete()
+    db.commit()
+
+    synthetic_dataset(users=10, events=3, seed=3)
+    second = [(b.user_id, b.seat_id - db.query(func.min(models.Seat.id)).scalar(), b.status) for b in db.query(models.Booking).order_by(models.Booking.id)]
+    assert first == second
+
+def test_synthetic_dataset_without_users_has_no_bookings(synthetic_dataset, db: Session):
+    counts = synthetic_dataset(users=0, events=2, seats_min=5, seats_max=5)
+
+    assert (counts["users"], counts["events"], counts["seats"]) == (0, 2, 10)
+    assert counts["bookings"] == counts["waitlist_entries"] == 0
+
+def test_synthetic_dataset_waitlists_only_full_events(synthetic_dataset, db: Session):
+    synthetic_dataset(users=40, events=4, seats_min=5, seats_max=10, booking_ratio=1.0, cancellation_ratio=0.0, waitlist_ratio=0.5, seed=11)
+    synthetic_dataset(users=0, events=2, seats_min=5, seats_max=5)
+
+    full_events = {event_id for (event_id,) in db.query(models.Booking.event_id).distinct()}
+    assert len(full_events) == 4
+    entries = db.query(models.WaitlistEntry).all()
+    assert entries and {entry.event_id for entry in entries} == full_events
+    for entry in entries:
+        assert db.query(models.Booking).filter_by(event_id=entry.event_id, user_id=entry.user_id).count() == 0
+
+def test_synthetic_dataset_rejects_an_empty_booking_window(synthetic_dataset):
+    with pytest.raises(ValueError, match="booking_window_days"):
+        synthetic_dataset(users=5, events=1, booking_window_days=0)
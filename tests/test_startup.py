@@ -0,0 +1,29 @@
+from fastapi.testclient import TestClient
+
+from app.config import get_settings
+from app.database import get_engine
+from app.identity import user_cache
+from app.main import create_app
+
+def test_lifespan_warms_up_pool_statements_and_user_cache(setup_test_database, monkeypatch):
+    user_cache.clear()
+    monkeypatch.setattr(get_settings(), "WARMUP_CONNECTIONS", 2)
+    app = create_app()
+    assert app.state.warmup == {}
+
+    with TestClient(app) as client:
+        assert list(app.state.warmup) == [
+            "configure_mappers",
+            "open_connections[primary]",
+            "compile_hot_queries[primary]",
+            "prime_user_cache",
+        ]
+        assert len(get_engine()._compiled_cache) > 0
+        assert user_cache._entries[2][0].role == "admin"
+        assert client.get("/").status_code == 200
+
+def test_warm_up_can_be_disabled(setup_test_database, monkeypatch):
+    monkeypatch.setattr(get_settings(), "WARMUP_ENABLED", False)
+    app = create_app()
+    with TestClient(app):
+        assert app.state.warmup == {}
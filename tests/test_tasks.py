@@ -0,0 +1,86 @@
+import threading
+import time
+
+from sqlalchemy.orm import Session
+
+from app import models
+from app.tasks import TaskExecutor, after_commit
+
+def test_post_commit_tasks_run_only_after_commit(db: Session):
+    calls = []
+
+    db.add(models.User(email="rolled-back@example.com", username="rolled-back"))
+    db.flush()
+    after_commit(db, lambda task_db, value: calls.append(value), "rolled back")
+    db.rollback()
+    assert calls == []
+
+    after_commit(db, lambda task_db, value: calls.append(value), "committed")
+    db.add(models.User(email="tasks@example.com", username="tasks"))
+    assert calls == []
+    db.commit()
+    assert calls == ["committed"]
+
+def test_thread_executor_drains_and_reports_metrics():
+    executor = TaskExecutor(workers=2, max_queue=10, submit_timeout=1)
+    done = []
+    for i in range(5):
+        executor.submit(None, lambda db, i: done.append(i), i)
+    executor.submit(None, lambda db: 1 / 0)
+
+    assert executor.drain(timeout=5)
+    assert sorted(done) == [0, 1, 2, 3, 4]
+    metrics = executor.metrics()
+    assert metrics["submitted"] == 6
+    assert metrics["completed"] == 5
+    assert metrics["failed"] == 1
+    assert metrics["queued"] == 0
+
+def test_full_queue_runs_tasks_in_the_caller():
+    executor = TaskExecutor(workers=1, max_queue=1, submit_timeout=0)
+    release = threading.Event()
+    started = threading.Event()
+    ran_in = []
+
+    def block(db):
+        started.set()
+        release.wait(5)
+
+    executor.submit(None, block)
+    started.wait(5)
+    executor.submit(None, lambda db: ran_in.append(threading.current_thread().name))
+    executor.submit(None, lambda db: ran_in.append(threading.current_thread().name))
+
+    assert ran_in == [threading.current_thread().name]
+    assert executor.metrics()["ran_inline"] == 1
+    release.set()
+    assert executor.drain(timeout=5)
+    assert ran_in[1].startswith("post-commit-")
+
+def test_drain_with_a_full_queue_gives_up_at_the_timeout():
+    executor = TaskExecutor(workers=1, max_queue=1, submit_timeout=1)
+    release = threading.Event()
+    started = threading.Event()
+
+    def block(db):
+        started.set()
+        release.wait(5)
+
+    executor.submit(None, block)
+    started.wait(5)
+    executor.submit(None, lambda db: None)
+
+    began = time.monotonic()
+    assert not executor.drain(timeout=0.2)
+    assert time.monotonic() - began < 2
+    release.set()
+
+def test_executor_restarts_workers_after_a_drain():
+    executor = TaskExecutor(workers=1, max_queue=10, submit_timeout=1)
+    ran_in = []
+    executor.submit(None, lambda db: None)
+    assert executor.drain(timeout=5)
+
+    executor.submit(None, lambda db: ran_in.append(threading.current_thread().name))
+    assert executor.drain(timeout=5)
+    assert ran_in[0].startswith("post-commit-")
@@ -0,0 +1,100 @@
+import json
+import logging
+import time
+
+import pytest
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app import models, schemas, services, tracing
+from app.config import get_settings
+from app.database import get_db, get_read_db
+from app.main import create_app
+from app.tracing import RequestTrace, redact
+
+def traced_client(db: Session, monkeypatch, **settings) -> TestClient:
+    for name, value in {"SQL_TRACE_ENABLED": True, "RATE_LIMIT_ENABLED": False, **settings}.items():
+        monkeypatch.setattr(get_settings(), name, value)
+    app = create_app()
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_read_db] = lambda: db
+    return TestClient(app)
+
+def make_event(db: Session):
+    return services.create_event(db, schemas.EventCreate(
+        name="Traced", venue="Hall", start_time="2026-01-01T19:00:00", end_time="2026-01-01T22:00:00", total_seats=2
+    ))
+
+def test_debug_header_returns_the_trace_summary(db: Session, monkeypatch):
+    event = make_event(db)
+    client = traced_client(db, monkeypatch, SQL_TRACE_HEADER=True)
+
+    response = client.post("/bookings", headers={"X-User-ID": "1", "X-Debug-SQL-Trace": "1"}, json={"user_id": 1, "event_id": event.id})
+    assert response.status_code == 201
+    summary = json.loads(response.headers["X-SQL-Trace"])
+    assert summary["statements"] > 0
+    assert "app.services._insert_bookings" in summary["by_caller"]
+    assert summary["commit_ms"] > 0
+
+    response = client.post("/bookings", headers={"X-User-ID": "1"}, json={"user_id": 1, "event_id": event.id})
+    assert "X-SQL-Trace" not in response.headers
+
+def test_debug_header_is_ignored_unless_enabled(db: Session, monkeypatch):
+    event = make_event(db)
+    response = traced_client(db, monkeypatch).get(f"/events/{event.id}/availability", headers={"X-Debug-SQL-Trace": "1"})
+    assert "X-SQL-Trace" not in response.headers
+
+def test_slow_requests_and_statements_are_logged_redacted(db: Session, caplog, monkeypatch):
+    # The alembic upgrade in setup_test_database disables loggers that already exist.
+    monkeypatch.setattr(logging.getLogger("app.slow_sql"), "disabled", False)
+    event = make_event(db)
+    client = traced_client(db, monkeypatch, SLOW_REQUEST_MS=0, SLOW_STATEMENT_MS=0)
+
+    with caplog.at_level(logging.WARNING, logger="app.slow_sql"):
+        client.post("/bookings", headers={"X-User-ID": "1"}, json={"user_id": 1, "event_id": event.id, "seat_number": "Seat-2"})
+
+    records = [json.loads(record.getMessage()) for record in caplog.records if record.name == "app.slow_sql"]
+    request = next(r for r in records if r["type"] == "slow_request")
+    assert (request["method"], request["path"], request["status"]) == ("POST", "/bookings", 201)
+    assert request["statement_count"] == len(request["statements"])
+    assert any(r["type"] == "slow_statement" and r["caller"] == "app.services._find_seat" for r in records)
+    assert "Seat-2" not in json.dumps(records)
+
+@pytest.fixture
+def trace():
+    tracing.install()
+    trace = RequestTrace("GET", "/traced")
+    token = tracing._current_trace.set(trace)
+    yield trace
+    tracing._current_trace.reset(token)
+
+def test_failed_statements_leave_no_state_on_the_connection(db: Session, trace):
+    connection = db.connection()
+    with pytest.raises(OperationalError):
+        connection.execute(text("SELECT * FROM no_such_table"))
+    db.rollback()
+    db.execute(text("SELECT 1"))
+
+    assert trace.statement_count == 1
+    assert not [key for key in db.connection().info if key.startswith("trace")]
+
+def test_bare_connection_commits_do_not_count_as_session_commits(db: Session, trace):
+    with db.get_bind().engine.begin() as connection:
+        connection.execute(text("SELECT 1"))
+    assert trace.commit_started is None
+    time.sleep(0.05)
+
+    db.add(models.User(email="traced@example.com", username="traced"))
+    db.commit()
+
+    commits = [statement for statement in trace.statements if statement.sql == "COMMIT"]
+    assert len(commits) == 1
+    assert commits[0].duration_ms < 50
+
+def test_redact_keeps_only_non_identifying_values():
+    assert redact((3, "secret@example.com", None, True)) == [3, "<str>", None, True]
+    assert redact({"email": "secret@example.com", "id": 1}) == {"email": "<str>", "id": 1}
+    assert redact([(1,), (2,)], executemany=True) == "<2 parameter sets>"
@@ -1,8 +1,9 @@
 from fastapi.testclient import TestClient
+from sqlalchemy import event as sa_event
 from sqlalchemy.orm import Session
 from app import services, schemas
 
-def test_list_events_with_seats(client: TestClient, db: Session):
+def test_list_events_without_seats(client: TestClient, db: Session):
     services.create_event(db, schemas.EventCreate(name="Event 1", venue="Venue 1", start_time="2025-01-01T10:00:00", end_time="2025-01-01T12:00:00", total_seats=50))
     services.create_event(db, schemas.EventCreate(name="Event 2", venue="Venue 2", start_time="2025-02-01T10:00:00", end_time="2025-02-01T12:00:00", total_seats=100))
     
@@ -10,8 +11,52 @@ def test_list_events_with_seats(client: TestClient, db: Session):
     assert response.status_code == 200
     data = response.json()
     assert len(data) == 2
-    assert "seats" in data[0]
-    assert len(data[0]["seats"]) == 50
+    assert data[0]["name"] == "Event 1"
+    assert "seats" not in data[0]
+
+def test_search_events_by_window_venue_name_and_availability(client: TestClient, db: Session):
+    concert = services.create_event(db, schemas.EventCreate(name="Jazz Night", venue="Blue Hall", start_time="2025-03-01T20:00:00", end_time="2025-03-01T23:00:00", total_seats=1))
+    services.create_event(db, schemas.EventCreate(name="Rock 100%", venue="Blue Hall", start_time="2025-04-01T20:00:00", end_time="2025-04-01T23:00:00", total_seats=1))
+    services.create_event(db, schemas.EventCreate(name="Jazz Brunch", venue="Garden", start_time="2025-05-01T11:00:00", end_time="2025-05-01T13:00:00", total_seats=1))
+    services.create_booking(db, schemas.BookingCreate(user_id=1, event_id=concert.id))
+
+    def names(**params):
+        response = client.get("/events", params=params)
+        assert response.status_code == 200
+        return [event["name"] for event in response.json()]
+
+    assert names(start_from="2025-03-15T00:00:00", start_to="2025-05-01T11:00:00") == ["Rock 100%"]
+    assert names(end_to="2025-04-01T00:00:00") == ["Jazz Night"]
+    assert names(venue="Blue Hall") == ["Jazz Night", "Rock 100%"]
+    assert names(q="jazz") == ["Jazz Night", "Jazz Brunch"]
+    assert names(q="0%") == ["Rock 100%"]
+    assert names(available=True) == ["Rock 100%", "Jazz Brunch"]
+    assert names(available=False) == ["Jazz Night"]
+    assert names(q="jazz", available=True) == ["Jazz Brunch"]
+
+def test_list_events_is_paginated_with_cursor(client: TestClient, db: Session):
+    for day in range(1, 6):
+        services.create_event(db, schemas.EventCreate(name=f"Event {day}", venue="Venue", start_time=f"2025-01-0{day}T10:00:00", end_time=f"2025-01-0{day}T12:00:00", total_seats=1))
+
+    seen = []
+    params = {"limit": 2}
+    while True:
+        response = client.get("/events", params=params)
+        assert response.status_code == 200
+        seen += [event["name"] for event in response.json()]
+        if "X-Next-Cursor" not in response.headers:
+            break
+        params["cursor"] = response.headers["X-Next-Cursor"]
+    assert seen == [f"Event {day}" for day in range(1, 6)]
+
+    for day in range(6, 56):
+        services.create_event(db, schemas.EventCreate(name=f"Event {day}", venue="Venue", start_time=f"2025-03-{day % 28 + 1:02d}T10:00:00", end_time="2025-03-28T12:00:00", total_seats=0))
+    response = client.get("/events")
+    assert len(response.json()) == 50
+    assert "X-Next-Cursor" in response.headers
+    assert client.get("/events", params={"limit": 501}).status_code == 422
+
+    assert client.get("/events", params={"cursor": "not-a-cursor"}).status_code == 400
 
 def test_successful_seat_booking(client: TestClient, db: Session):
     event = services.create_event(db, schemas.EventCreate(name="Bookable Event", venue="Venue", start_time="2025-01-01T19:00:00", end_time="2025-01-01T22:00:00", total_seats=2))
@@ -72,3 +117,49 @@ def test_cancel_booking_and_seat_becomes_available(client: TestClient, db: Sessi
     # Verify the seat can be booked again
     response = client.post("/bookings", headers={"X-User-ID": "2"}, json={"user_id": 2, "event_id": event.id, "seat_number": "Seat-1"})
     assert response.status_code == 201
+
+def test_cancel_booking_scoped_to_its_event(client: TestClient, db: Session):
+    event = services.create_event(db, schemas.EventCreate(name="Scoped Event", venue="Venue", start_time="2025-01-01T19:00:00", end_time="2025-01-01T22:00:00", total_seats=1))
+    booking = services.create_booking(db, schemas.BookingCreate(user_id=1, event_id=event.id))
+
+    response = client.delete(f"/bookings/{booking.id}?event_id={event.id + 1}", headers={"X-User-ID": "1"})
+    assert response.status_code == 404
+    response = client.delete(f"/bookings/{booking.id}?event_id={event.id}", headers={"X-User-ID": "1"})
+    assert response.status_code == 204
+
+def test_cancel_booking_update_is_keyed_by_event(db: Session):
+    event = services.create_event(db, schemas.EventCreate(name="Keyed Event", venue="Venue", start_time="2025-01-01T19:00:00", end_time="2025-01-01T22:00:00", total_seats=1))
+    booking = services.create_booking(db, schemas.BookingCreate(user_id=1, event_id=event.id))
+    statements = []
+
+    def listener(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    sa_event.listen(db.get_bind(), "before_cursor_execute", listener)
+    try:
+        services.cancel_booking(db, booking_id=booking.id, user_id=1, event_id=event.id)
+    finally:
+        sa_event.remove(db.get_bind(), "before_cursor_execute", listener)
+    update = next(s for s in statements if s.startswith("UPDATE bookings"))
+    assert "bookings.event_id = ?" in update.split("WHERE", 1)[1]
+
+def test_list_my_bookings_is_paginated_with_cursor(client: TestClient, db: Session):
+    event = services.create_event(db, schemas.EventCreate(name="Paged Event", venue="Venue", start_time="2025-01-01T19:00:00", end_time="2025-01-01T22:00:00", total_seats=5))
+    bookings = [services.create_booking(db, schemas.BookingCreate(user_id=1, event_id=event.id)) for _ in range(5)]
+    services.cancel_booking(db, booking_id=bookings[0].id, user_id=1)
+
+    response = client.get("/users/me/bookings?limit=2", headers={"X-User-ID": "1"})
+    first_page = [b["id"] for b in response.json()]
+    assert len(first_page) == 2
+    cursor = response.headers["X-Next-Cursor"]
+
+    response = client.get(f"/users/me/bookings?limit=2&cursor={cursor}", headers={"X-User-ID": "1"})
+    second_page = [b["id"] for b in response.json()]
+    assert "X-Next-Cursor" not in response.headers
+    assert first_page + second_page == sorted([b.id for b in bookings[1:]], reverse=True)
+
+    response = client.get("/users/me/bookings?status=cancelled", headers={"X-User-ID": "1"})
+    assert [b["id"] for b in response.json()] == [bookings[0].id]
+    assert len(client.get("/users/me/bookings?status=all", headers={"X-User-ID": "1"}).json()) == 5
+    assert client.get("/users/me/bookings?created_from=2099-01-01T00:00:00", headers={"X-User-ID": "1"}).json() == []
+    assert client.get("/users/me/bookings?cursor=bogus", headers={"X-User-ID": "1"}).status_code == 400
@@ -18,11 +18,11 @@ def test_add_to_waitlist_when_event_is_full(client: TestClient, db: Session):
     ))
 
     booking_data = {"user_id": user1.id, "event_id": event.id}
-    response = client.post("/bookings", json=booking_data)
+    response = client.post("/bookings", headers={"X-User-ID": str(user1.id)}, json=booking_data)
     assert response.status_code == 201
 
     booking_data_user2 = {"user_id": user2.id, "event_id": event.id}
-    response_user2 = client.post("/bookings", json=booking_data_user2)
+    response_user2 = client.post("/bookings", headers={"X-User-ID": str(user2.id)}, json=booking_data_user2)
 
     assert response_user2.status_code == 202
     assert response_user2.json()["detail"] == "Event is full. You have been added to the waitlist."
@@ -46,10 +46,10 @@ def test_cancel_booking_triggers_notification(client: TestClient, db: Session):
         total_seats=1
     ))
 
-    booking_resp = client.post("/bookings", json={"user_id": user1.id, "event_id": event.id})
+    booking_resp = client.post("/bookings", headers={"X-User-ID": str(user1.id)}, json={"user_id": user1.id, "event_id": event.id})
     booking_id = booking_resp.json()["id"]
 
-    client.post("/bookings", json={"user_id": user2.id, "event_id": event.id}) 
+    client.post("/bookings", headers={"X-User-ID": str(user2.id)}, json={"user_id": user2.id, "event_id": event.id})
 
     response = client.delete(f"/bookings/{booking_id}", headers={"X-User-ID": str(user1.id)})
     assert response.status_code == 204
@@ -86,6 +86,47 @@ def test_user_can_view_and_leave_waitlist(client: TestClient, db: Session):
     db_entry = db.query(models.WaitlistEntry).filter_by(id=waitlist_entry_id).first()
     assert db_entry is None
 
+def test_waitlist_entries_report_position_and_length(client: TestClient, db: Session):
+    users = [models.User(email=f"queue{i}@example.com", username=f"queue{i}") for i in range(3)]
+    db.add_all(users)
+    db.commit()
+    event = services.create_event(db, schemas.EventCreate(
+        name="Sold Out Gala", venue="Opera House",
+        start_time="2025-04-01T19:00:00", end_time="2025-04-01T22:00:00",
+        total_seats=1
+    ))
+    services.create_booking(db, schemas.BookingCreate(user_id=1, event_id=event.id))
+    for user in users:
+        response = client.post("/bookings", headers={"X-User-ID": str(user.id)}, json={"user_id": user.id, "event_id": event.id})
+        assert response.status_code == 202
+
+    response = client.get("/waitlists/me", headers={"X-User-ID": str(users[1].id)})
+    assert response.status_code == 200
+    entry = response.json()[0]
+    assert (entry["position"], entry["waitlist_length"]) == (2, 3)
+
+    client.delete(f"/waitlists/{response.json()[0]['id']}", headers={"X-User-ID": str(users[1].id)})
+    response = client.get("/waitlists/me", headers={"X-User-ID": str(users[2].id)})
+    assert [(e["position"], e["waitlist_length"]) for e in response.json()] == [(2, 2)]
+
+def test_joining_a_waitlist_twice_is_rejected(client: TestClient, db: Session):
+    user = models.User(email="twice@example.com", username="twice")
+    db.add(user)
+    db.commit()
+    event = services.create_event(db, schemas.EventCreate(
+        name="Sold Out Recital", venue="Chapel",
+        start_time="2025-05-01T19:00:00", end_time="2025-05-01T22:00:00",
+        total_seats=1
+    ))
+    services.create_booking(db, schemas.BookingCreate(user_id=1, event_id=event.id))
+
+    booking = {"user_id": user.id, "event_id": event.id}
+    assert client.post("/bookings", headers={"X-User-ID": str(user.id)}, json=booking).status_code == 202
+    response = client.post("/bookings", headers={"X-User-ID": str(user.id)}, json=booking)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "You are already on the waitlist for this event."
+    assert db.query(models.WaitlistEntry).filter_by(user_id=user.id, event_id=event.id).count() == 1
+
 def test_user_can_view_notifications(client: TestClient, db: Session):
     user = models.User(email="testuser6@example.com", username="testuser6")
     db.add(user)